@@ -0,0 +1,45 @@
+"""Benchmark local BRDF correction throughput.
+
+Corrects a synthetic Landsat8 scene with the sun/view geometry computed for every
+    pixel and on the default sampling grid.
+
+Usage:
+    python benchmarks/brdf.py [size]
+"""
+
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from earthlib.geelib.config import BRDF_COEFFICIENTS_L8
+from earthlib.nplib import BRDFCorrect
+from earthlib.nplib.config import GEOMETRY_STEP
+
+CORNERS = {
+    "upperLeft": (-120.5, 38.5),
+    "upperRight": (-118.0, 38.5),
+    "lowerRight": (-118.0, 36.5),
+    "lowerLeft": (-120.5, 36.5),
+}
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    band_names = list(BRDF_COEFFICIENTS_L8)
+    rng = np.random.default_rng(0)
+    img = rng.uniform(0.05, 0.4, (size, size, len(band_names))).astype(np.float32)
+    acquired = datetime(2020, 6, 21, 18, 30)
+    print(f"correcting a {img.shape} scene")
+
+    print(f"{'step':>6} {'time (s)':>9} {'Mpx/s':>8}")
+    for step in (1, GEOMETRY_STEP):
+        start = time.perf_counter()
+        BRDFCorrect.Landsat8(img, band_names, acquired, CORNERS, step=step)
+        elapsed = time.perf_counter() - start
+        print(f"{step:>6} {elapsed:>9.2f} {size * size / elapsed / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
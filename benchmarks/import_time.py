@@ -0,0 +1,44 @@
+"""Benchmark cold-import time with and without loading the package data.
+
+Each case runs in a fresh interpreter so nothing is cached between runs.
+    The `eager` case forces the spectral library, metadata and Earthlib sensor
+    to load, which is what every `import earthlib` used to pay for.
+
+Usage:
+    python benchmarks/import_time.py [n_runs]
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+CASES = {
+    "lazy": "import earthlib; earthlib.sensors.Landsat8",
+    "eager": "import earthlib; earthlib.library; earthlib.config.metadata",
+}
+
+
+def time_case(statement: str, n_runs: int) -> list:
+    """Returns wall times (in seconds) for running `statement` in a new interpreter."""
+    times = list()
+    for _ in range(n_runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main(n_runs: int = 10) -> None:
+    results = {name: time_case(statement, n_runs) for name, statement in CASES.items()}
+    for name, times in results.items():
+        print(
+            f"{name:>6}: median {statistics.median(times) * 1000:7.1f} ms"
+            f"  min {min(times) * 1000:7.1f} ms  ({n_runs} runs)"
+        )
+    saved = statistics.median(results["eager"]) - statistics.median(results["lazy"])
+    print(f"saved: {saved * 1000:7.1f} ms per cold import")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,94 @@
+"""Benchmark the tiled local pipeline against running each step on the full scene.
+
+Scales, cloud masks, BRDF-corrects and unmixes a synthetic Landsat8 DN scene, once
+    with full-scene calls to each module and once with a Pipeline, and reports the
+    run time and peak memory allocated by each, plus the pipeline stage timings.
+
+Usage:
+    python benchmarks/pipeline.py [size] [n_iterations]
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from earthlib.nplib import BRDFCorrect, CloudMask, Pipeline, Scale, Unmix
+from earthlib.sensors import get_bands, supported_sensors
+
+CORNERS = {
+    "upperLeft": (-120.5, 38.5),
+    "upperRight": (-118.0, 38.5),
+    "lowerRight": (-118.0, 36.5),
+    "lowerLeft": (-120.5, 36.5),
+}
+TIME = datetime(2020, 6, 21, 18, 30)
+
+
+def synthetic_scene(size: int, n_iterations: int, seed: int = 0) -> tuple:
+    """Builds a Landsat8 DN stack with QA bands, and random endmembers."""
+    rng = np.random.default_rng(seed)
+    sensor = supported_sensors["Landsat8"]
+    reflectance = rng.uniform(0.02, 0.5, (size, size, 6))
+    img = np.zeros((size, size, 8), dtype=np.uint16)
+    img[:, :, :6] = (reflectance - sensor.offset) / sensor.scale
+    img[:, :, 6] = np.where(rng.random((size, size)) < 0.2, 0b1000, 0)
+    band_names = get_bands("Landsat8") + ["QA_PIXEL", "QA_RADSAT"]
+    endmembers = [
+        rng.uniform(low, high, (n_iterations, 6))
+        for low, high in ((0.2, 0.4), (0.05, 0.5), (0.1, 0.3))
+    ]
+    return img, band_names, endmembers
+
+
+def fullScene(img: np.ndarray, band_names: list, endmembers: list) -> np.ndarray:
+    """Runs each step on the full scene, one after another."""
+    reflectance = Scale.bySensor("Landsat8")(img[:, :, :6])
+    mask = CloudMask.bySensor("Landsat8")(img, band_names)
+    corrected = BRDFCorrect.Landsat8(
+        reflectance, band_names[:6], TIME, CORNERS, valid=img[:, :, 0] != 0
+    )
+    unmixed = Unmix.fractionalCover(corrected, endmembers)
+    unmixed[~mask] = np.nan
+    return unmixed
+
+
+def measure(function: callable, *args) -> tuple:
+    """Returns the run time and peak traced allocation of a function call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    n_iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    img, band_names, endmembers = synthetic_scene(size, n_iterations)
+    print(f"processing a {img.shape} scene with {n_iterations} bundles")
+
+    # build the operators once so both runs only time the processing
+    Unmix.computeOperators(endmembers)
+    pipeline = Pipeline.bySensor("Landsat8", band_names, endmembers, TIME, CORNERS)
+    out = np.empty((size, size, len(endmembers)), dtype=np.float32)
+
+    print(f"{'method':>11} {'time (s)':>9} {'peak (MB)':>10}")
+    for name, function, args in (
+        ("full scene", fullScene, (img, band_names, endmembers)),
+        ("pipeline", pipeline.run, (img, out)),
+    ):
+        elapsed, peak = measure(function, *args)
+        print(f"{name:>11} {elapsed:>9.2f} {peak / 1e6:>10.1f}")
+
+    print("pipeline stage timings:")
+    for stage, seconds in pipeline.timings.items():
+        print(f"{stage:>11} {seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
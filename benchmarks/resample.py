@@ -0,0 +1,71 @@
+"""Benchmark resampling the spectral library to each supported sensor.
+
+Compares the previous per-spectrum BandResampler loop with the single
+    matrix product used by Spectra.to_sensor().
+
+Usage:
+    python benchmarks/resample.py
+"""
+
+import logging
+import time
+
+import numpy as np
+import spectral
+
+import earthlib
+from earthlib.resample import resample, response_matrix
+from earthlib.sensors import supported_sensors
+
+
+def loop_resample(spectra: earthlib.Spectra, sensor: earthlib.Sensor) -> np.ndarray:
+    """Resamples one spectrum at a time, as to_sensor() used to."""
+    resampler = spectral.BandResampler(
+        spectra.sensor.band_centers,
+        sensor.band_centers,
+        fwhm1=spectra.sensor.band_widths,
+        fwhm2=sensor.band_widths,
+    )
+    resampled = [resampler(spectra.data[i, :]) for i in range(spectra.data.shape[0])]
+    return np.array(resampled, dtype=np.float32)
+
+
+def matrix_resample(spectra: earthlib.Spectra, sensor: earthlib.Sensor) -> np.ndarray:
+    """Resamples all spectra with one matrix product."""
+    return resample(spectra.data, response_matrix(spectra.sensor, sensor))
+
+
+def best_of(function, *args, repeats: int = 3) -> float:
+    """Returns the fastest wall time (in seconds) of several calls."""
+    times = list()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    # spectral logs every target band without overlapping source bands
+    logging.getLogger("spectral").setLevel(logging.WARNING)
+
+    library = earthlib.library
+    print(f"resampling {len(library)} spectra")
+    print(
+        f"{'sensor':>12} {'loop (ms)':>10} {'matrix (ms)':>12}"
+        f" {'product (ms)':>13} {'speedup':>8}"
+    )
+    for name, sensor in supported_sensors.items():
+        loop = best_of(loop_resample, library, sensor)
+        matrix = best_of(matrix_resample, library, sensor)
+        product = best_of(
+            resample, library.data, response_matrix(library.sensor, sensor)
+        )
+        print(
+            f"{name:>12} {loop * 1000:10.1f} {matrix * 1000:12.1f}"
+            f" {product * 1000:13.1f} {loop / matrix:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
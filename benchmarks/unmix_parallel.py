@@ -0,0 +1,57 @@
+"""Benchmark parallel tile unmixing across worker counts.
+
+Unmixes a synthetic reflectance cube with fractionalCoverParallel() using
+    1 to cpu_count() workers and reports the speedup over one worker.
+
+Usage:
+    python benchmarks/unmix_parallel.py [size] [n_iterations]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from earthlib.nplib import Unmix
+
+
+def synthetic_scene(size: int, n_bands: int, n_iterations: int, seed: int = 0):
+    """Mixes random endmember spectra into a (size, size, n_bands) cube."""
+    rng = np.random.default_rng(seed)
+    endmembers = [
+        rng.uniform(low, high, (n_iterations, n_bands))
+        for low, high in ((0.2, 0.4), (0.05, 0.5), (0.1, 0.3))
+    ]
+    fractions = rng.dirichlet(np.ones(3), (size, size))
+    spectra = np.stack([bundle[0] for bundle in endmembers])
+    noise = rng.normal(0, 0.005, (size, size, n_bands))
+    img = (fractions @ spectra + noise).astype(np.float32)
+    return img, endmembers
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    n_iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    img, endmembers = synthetic_scene(size, 6, n_iterations)
+    print(f"unmixing a {img.shape} cube with {n_iterations} bundles")
+
+    # build the operators once so every run only times the unmixing
+    Unmix.computeOperators(endmembers)
+
+    print(f"{'workers':>8} {'time (s)':>9} {'speedup':>8} {'efficiency':>11}")
+    baseline = None
+    for n_workers in range(1, (os.cpu_count() or 1) + 1):
+        start = time.perf_counter()
+        Unmix.fractionalCoverParallel(img, endmembers, n_workers=n_workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        print(
+            f"{n_workers:>8} {elapsed:>9.2f} {speedup:>7.2f}x"
+            f" {speedup / n_workers:>10.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
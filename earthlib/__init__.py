@@ -1,5 +1,5 @@
-from earthlib import metadata, read, sensors
-from earthlib.endmembers import Spectra, library
+from earthlib import endmembers, metadata, profiling, read, registry, sensors
+from earthlib.endmembers import Spectra
 from earthlib.sensors import Sensor, supported_sensors
 
 try:
@@ -8,6 +8,7 @@ try:
         BrightMask,
         BurnPVSoil,
         CloudMask,
+        CombinedMask,
         NIRv,
         Scale,
         ShadeMask,
@@ -18,3 +19,10 @@ try:
     from earthlib.geelib.utils import getCollection
 except ImportError:
     pass
+
+
+def __getattr__(name: str):
+    """Defers reading the package spectral library until it is first used."""
+    if name == "library":
+        return endmembers.load_library()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
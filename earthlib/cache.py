@@ -0,0 +1,152 @@
+"""On-disk cache for spectral libraries resampled to other sensors."""
+
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from earthlib import config
+from earthlib.sensors import Sensor
+
+# subdirectory of config.cache_dir where resampled arrays are stored
+RESAMPLED_DIR = "resampled"
+
+
+def get_cache_dir() -> str:
+    """Returns the directory where resampled spectra are cached."""
+    return os.path.join(config.cache_dir, RESAMPLED_DIR)
+
+
+def resample_key(data: np.ndarray, source: Sensor, target: Sensor) -> str:
+    """Computes a content-addressed cache key for resampling spectra.
+
+    Args:
+        data: the (n_spectra, n_source_bands) array to resample.
+        source: the sensor the spectra were measured with.
+        target: the sensor to resample the spectra to.
+
+    Returns:
+        a hex digest identifying the resampled output.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(str((data.shape, data.dtype.str)).encode())
+    digest.update(np.ascontiguousarray(data).data)
+    digest.update(source.fingerprint().encode())
+    digest.update(target.fingerprint().encode())
+    return digest.hexdigest()
+
+
+def get_path(key: str) -> str:
+    """Returns the cache file path for a key."""
+    return os.path.join(get_cache_dir(), f"{key}.npy")
+
+
+def load(key: str) -> np.ndarray | None:
+    """Reads a cached array, marking it as recently used.
+
+    Args:
+        key: the cache key from resample_key().
+
+    Returns:
+        the cached array, or None if the key is not cached.
+    """
+    path = get_path(key)
+    try:
+        array = np.load(path)
+    except (FileNotFoundError, ValueError, EOFError):
+        return None
+
+    # the modification time tracks recent use for eviction. the entry may have
+    #   been evicted by another process since it was read
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+    return array
+
+
+def save(key: str, array: np.ndarray, max_bytes: int | None = None) -> None:
+    """Writes an array to the cache, then evicts old entries to stay under the size limit.
+
+    Args:
+        key: the cache key from resample_key().
+        array: the array to cache.
+        max_bytes: the maximum cache size. Defaults to config.cache_max_bytes.
+    """
+    cache_dir = get_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # write to a temporary file first so readers never see partial arrays
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, get_path(key))
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+    evict(max_bytes)
+
+
+def list_entries() -> list[tuple[str, int, float]]:
+    """Lists cached arrays from least to most recently used.
+
+    Returns:
+        (path, size in bytes, last used time) for each entry.
+    """
+    cache_dir = get_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return list()
+
+    entries = list()
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and entry.name.endswith(".npy"):
+            stat = entry.stat()
+            entries.append((entry.path, stat.st_size, stat.st_mtime))
+
+    entries.sort(key=lambda entry: entry[2])
+    return entries
+
+
+def size() -> int:
+    """Returns the total size of the cache in bytes."""
+    return sum(entry[1] for entry in list_entries())
+
+
+def evict(max_bytes: int | None = None) -> None:
+    """Deletes the least recently used entries until the cache fits in `max_bytes`.
+
+    Args:
+        max_bytes: the maximum cache size. Defaults to config.cache_max_bytes.
+    """
+    max_bytes = config.cache_max_bytes if max_bytes is None else max_bytes
+    entries = list_entries()
+    total = sum(entry[1] for entry in entries)
+    for path, nbytes, _ in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= nbytes
+
+
+def invalidate(key: str | None = None) -> None:
+    """Removes cached entries.
+
+    Args:
+        key: the cache key to remove. removes all entries if None.
+    """
+    if key is not None:
+        paths = [get_path(key)]
+    else:
+        paths = [entry[0] for entry in list_entries()]
+
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -1,6 +1,7 @@
 """Default configuration paths and parameters"""
 
 import os
+from functools import lru_cache
 
 import pandas as pd
 
@@ -11,5 +12,45 @@ metadata_path = os.path.join(package_dir, "data", "spectra.csv")
 endmember_path = os.path.join(package_dir, "data", "spectra.sli")
 header_path = endmember_path + ".hdr"
 
-# read critical data into memory
-metadata = pd.read_csv(metadata_path)
+# user cache for derived data, like spectral libraries resampled to each sensor
+cache_dir = os.environ.get(
+    "EARTHLIB_CACHE_DIR",
+    os.path.join(
+        os.environ.get(
+            "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+        ),
+        "earthlib",
+    ),
+)
+cache_max_bytes = int(os.environ.get("EARTHLIB_CACHE_MAX_BYTES", 2**30))
+
+# number of sensor-to-sensor resampling matrices to keep in memory
+matrix_cache_size = 64
+
+# number of seeded endmember bundle sets to keep resampled spectra for
+bundle_cache_size = 64
+
+# number of endmember bundle sets to keep precomputed unmixing operators for
+operator_cache_size = 16
+
+# record timings of profiled functions from import. see earthlib.profiling
+profile = os.environ.get("EARTHLIB_PROFILE", "0").lower() not in ("", "0", "false")
+
+
+@lru_cache(maxsize=None)
+def load_metadata() -> pd.DataFrame:
+    """Reads the spectral library metadata into memory.
+
+    The table is read on first call and cached for the lifetime of the process.
+
+    Returns:
+        metadata for each spectrum in the package spectral library.
+    """
+    return pd.read_csv(metadata_path)
+
+
+def __getattr__(name: str):
+    """Loads large package data on first access instead of at import time."""
+    if name == "metadata":
+        return load_metadata()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
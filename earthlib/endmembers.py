@@ -1,6 +1,7 @@
 """Endmember spectra management tools"""
 
 import os
+from functools import lru_cache
 from warnings import warn
 
 import numpy as np
@@ -8,9 +9,14 @@ import pandas as pd
 import spectral
 import spectral.io.envi as envi
 
-from earthlib.config import endmember_path, metadata
+from earthlib import config
+from earthlib.cache import load as load_cached
+from earthlib.cache import resample_key
+from earthlib.cache import save as save_cached
 from earthlib.errors import EndmemberError
-from earthlib.sensors import Earthlib, Sensor
+from earthlib.profiling import profiled
+from earthlib.resample import resample, response_matrix
+from earthlib.sensors import Sensor, get_band_indices, supported_sensors
 
 
 class Spectra:
@@ -22,6 +28,7 @@ class Spectra:
         sensor: Sensor,
         metadata: pd.DataFrame | None = None,
         names: list[str] | None = None,
+        copy: bool = True,
     ) -> None:
         """Endmember spectra initialization.
 
@@ -35,6 +42,8 @@ class Spectra:
             metadata: dataframe containing metadata for each spectrum.
                 Should have n_spectra rows.
                 See earthlib.metadata.Schema for expected columns.
+            copy: copy `data` into a new array. set to False to keep a reference
+                to the input, e.g. a read-only memory map shared across processes.
         """
         self.sensor = sensor.copy()
         self.metadata = metadata.copy() if metadata is not None else None
@@ -42,7 +51,7 @@ class Spectra:
         if data is None:
             self.data = np.zeros((1, self.sensor.band_count), dtype=np.float32)
         else:
-            self.data = data.copy()
+            self.data = data.copy() if copy else data
 
         if names is None:
             self.names = ["spectrum_{}".format(i + 1) for i in range(len(self.data))]
@@ -53,6 +62,16 @@ class Spectra:
         """Returns the number of spectra stored."""
         return len(self.data)
 
+    @property
+    def nbytes(self) -> int:
+        """The size of the spectra array in bytes."""
+        return self.data.nbytes
+
+    def _ensure_writable(self) -> None:
+        """Copies read-only (e.g. memory-mapped) data into memory before in-place edits."""
+        if not self.data.flags.writeable:
+            self.data = np.array(self.data)
+
     def remove_water_bands(self, set_nan: bool = True) -> None:
         """Masks reflectance data from water vapor absorption bands.
 
@@ -63,6 +82,7 @@ class Spectra:
             set_nan: set the water bands to NaN. False sets values to 0.
         """
         update_val = np.nan if set_nan else 0
+        self._ensure_writable()
 
         if self.sensor.wavelength_unit.lower() == "micrometers":
             water_vapor_bands = [[1.35, 1.46], [1.79, 1.96]]
@@ -104,6 +124,7 @@ class Spectra:
         # return output
         return overlap
 
+    @profiled()
     def brightness_normalize(self, inds: list = None) -> None:
         """Brightness normalizes the spectra.
 
@@ -159,7 +180,8 @@ class Spectra:
         else:
             warn("Wavelength unit already in micrometers. No conversion applied.")
 
-    def to_sensor(self, sensor: Sensor) -> "Spectra":
+    @profiled()
+    def to_sensor(self, sensor: Sensor, cache: bool = False) -> "Spectra":
         """Resamples the spectra to a different sensor's band centers.
 
         Updates self.data and self.sensor in-place.
@@ -167,34 +189,41 @@ class Spectra:
         Args:
             sensor: the sensor object defining the instrument
                 to resample the spectra to.
+            cache: read and write resampled spectra from the on-disk cache
+                in config.cache_dir. See earthlib.cache.
 
         Returns:
             a new Spectra object with the resampled spectra and new sensor info.
         """
-        # create a band resampler for this collection
-        resampler = spectral.BandResampler(
-            self.sensor.band_centers,
-            sensor.band_centers,
-            fwhm1=self.sensor.band_widths,
-            fwhm2=sensor.band_widths,
-        )
-
-        # loop through each spectrum and resample to the sensor wavelengths
-        resampled = list()
-        for i in range(self.data.shape[0]):
-            spectrum = resampler(self.data[i, :])
-            resampled.append(spectrum)
+        resampled = None
+        if cache:
+            key = resample_key(self.data, self.sensor, sensor)
+            resampled = load_cached(key)
+
+        # resample every spectrum at once with the sensor response matrix
+        if resampled is None:
+            matrix = response_matrix(self.sensor, sensor)
+            resampled = resample(self.data, matrix)
+            if cache:
+                save_cached(key, resampled)
 
         # update the data and sensor info in place
         new_spectra = Spectra(
-            data=np.array(resampled, dtype=np.float32),
+            data=resampled,
             sensor=sensor.copy(),
             names=self.names.copy(),
             metadata=self.metadata.copy() if self.metadata is not None else None,
+            copy=False,
         )
         return new_spectra
 
-    def subsample(self, n: int, by_type: str | None = None) -> "Spectra":
+    @profiled()
+    def subsample(
+        self,
+        n: int,
+        by_type: str | None = None,
+        seed: int | np.random.Generator | None = None,
+    ) -> "Spectra":
         """Subsamples n random spectra.
 
         Args:
@@ -203,6 +232,8 @@ class Spectra:
                 Uses the metadata DataFrame to filter by type.
                 If the metadata is not set, raises a ValueError.
                 Get the valid type list using earthlib.utils.listTypes().
+            seed: a seed or generator for reproducible draws.
+                draws from the global numpy random state if not set.
 
         Returns:
             subsampled Spectra data.
@@ -229,7 +260,11 @@ class Spectra:
             names = [self.names[idx] for idx in range(len(self.names)) if indices[idx]]
             metadata = self.metadata[indices].reset_index(drop=True)
 
-        random_indices = np.random.randint(0, len(spectra), size=n)
+        if seed is None:
+            random_indices = np.random.randint(0, len(spectra), size=n)
+        else:
+            rng = np.random.default_rng(seed)
+            random_indices = rng.integers(0, len(spectra), size=n)
         subsampled_spectra = spectra[random_indices, :]
         subsampled_names = [names[i] for i in random_indices]
         subsampled_metadata = (
@@ -301,6 +336,7 @@ class Spectra:
         path: str,
         sensor: Sensor | None = None,
         metadata: pd.DataFrame | None = None,
+        mmap: bool = False,
     ) -> "Spectra":
         """Reads an ENVI spectral library file.
 
@@ -310,25 +346,39 @@ class Spectra:
             sensor: an earthlib.sensors.Sensor object specifying
                 sensor information not included in the .hdr file.
             metadata: DataFrame containing metadata for each spectrum.
+            mmap: back the spectra with a read-only memory map of the file
+                instead of reading it into memory. pages are shared between
+                processes, and data are only copied when modified in-place.
 
         Returns:
             Spectra containing the spectral data, sensor information, and metadata.
         """
         hdr = cls.get_hdr_path(path)
-        sli = envi.open(hdr, path)
+        if mmap:
+            data, header = memmap_sli(hdr, path)
+            band_centers = [float(wl) for wl in header["wavelength"]]
+            band_unit = header["wavelength units"]
+            names = header["spectra names"]
+        else:
+            sli = envi.open(hdr, path)
+            data = sli.spectra
+            band_centers = sli.bands.centers
+            band_unit = sli.bands.band_unit
+            names = sli.names
 
         if sensor is None:
             sensor = Sensor(
                 name=os.path.basename(path),
-                band_centers=sli.bands.centers,
-                wavelength_unit=sli.bands.band_unit,
+                band_centers=band_centers,
+                wavelength_unit=band_unit,
             )
 
         return cls(
-            data=sli.spectra,
+            data=data,
             sensor=sensor,
-            names=sli.names,
+            names=names,
             metadata=metadata,
+            copy=not mmap,
         )
 
     def format_output_paths(self, path: str) -> tuple[str, str]:
@@ -374,6 +424,30 @@ class Spectra:
         return hdr
 
 
+def memmap_sli(hdr: str, sli: str) -> tuple[np.memmap, dict]:
+    """Opens an ENVI spectral library as a read-only memory map.
+
+    Args:
+        hdr: path to the ENVI header file.
+        sli: path to the spectral library file.
+
+    Returns:
+        (data, header) tuple with a (n_spectra, n_wavelengths) memory map
+            and the parsed header metadata.
+    """
+    header = envi.read_envi_header(hdr)
+    dtype = np.dtype(envi.envi_to_dtype[str(header["data type"])])
+    byte_order = ">" if int(header.get("byte order", 0)) == 1 else "<"
+    data = np.memmap(
+        sli,
+        dtype=dtype.newbyteorder(byte_order),
+        mode="r",
+        offset=int(header.get("header offset", 0)),
+        shape=(int(header["lines"]), int(header["samples"])),
+    )
+    return data, header
+
+
 def listTypes(level: int = 2) -> list:
     """Returns a list of the spectral classification types.
 
@@ -384,7 +458,7 @@ def listTypes(level: int = 2) -> list:
         classes: a list of spectral data types referenced throughout this package.
     """
     key = f"LEVEL_{level}"
-    types = list(metadata[key].unique())
+    types = list(config.metadata[key].unique())
     return types
 
 
@@ -406,4 +480,121 @@ def getTypeLevel(Type: str) -> int:
     return 0
 
 
-library = Spectra.from_sli(endmember_path, sensor=Earthlib, metadata=metadata)
+@lru_cache(maxsize=None)
+def load_library(mmap: bool = False) -> Spectra:
+    """Reads the package spectral library into memory.
+
+    The library is read on first call and cached for the lifetime of the process.
+
+    Args:
+        mmap: memory map the library instead of reading it into memory.
+            See Spectra.from_sli().
+
+    Returns:
+        Spectra with the earthlib endmember library and its metadata.
+    """
+    return Spectra.from_sli(
+        config.endmember_path,
+        sensor=supported_sensors["Earthlib"],
+        metadata=config.metadata,
+        mmap=mmap,
+    )
+
+
+@lru_cache(maxsize=None)
+def load_resampled_library(sensor: str) -> Spectra:
+    """Resamples the package spectral library to a sensor's bands.
+
+    The library is resampled once per sensor and cached for the lifetime of the
+        process, so bundles are drawn without resampling it again.
+
+    Args:
+        sensor: the name of the sensor (from earthlib.list_sensors()).
+
+    Returns:
+        Spectra with the endmember library resampled to the sensor.
+    """
+    resampled = load_library().to_sensor(supported_sensors[sensor])
+    resampled.data.flags.writeable = False
+    return resampled
+
+
+def selectSpectra(
+    Type: str,
+    sensor: str,
+    n: int = 20,
+    bands: list = None,
+    seed: int | np.random.Generator | None = None,
+) -> np.ndarray:
+    """Subsamples spectra of one land cover type, resampled to a sensor.
+
+    Args:
+        Type: the land cover type to select (from earthlib.listTypes()).
+        sensor: the name of the sensor (from earthlib.list_sensors()).
+        n: the number of spectra to select.
+        bands: a list of band names to subset (from earthlib.get_bands(sensor)).
+            uses all sensor bands if not set.
+        seed: a seed or generator for reproducible draws.
+
+    Returns:
+        a (n, n_bands) array of spectra.
+    """
+    spectra = load_resampled_library(sensor).subsample(n, by_type=Type, seed=seed)
+    if bands is None:
+        return spectra.data
+
+    return spectra.data[:, get_band_indices(bands, sensor)]
+
+
+def selectBundles(
+    types: list, sensor: str, n: int = 20, bands: list = None, seed: int = None
+) -> tuple:
+    """Builds endmember bundles with one spectrum of each land cover type per bundle.
+
+    Bundles drawn with a seed are memoized, keeping the config.bundle_cache_size
+        most recent sets, so unmixing many images with the same endmembers
+        resamples and subsamples the library once.
+
+    Args:
+        types: the land cover types to select (from earthlib.listTypes()).
+        sensor: the name of the sensor (from earthlib.list_sensors()).
+        n: the number of bundles.
+        bands: a list of band names to subset (from earthlib.get_bands(sensor)).
+        seed: a seed for reproducible draws. draws fresh, uncached bundles if not set.
+
+    Returns:
+        a tuple with one read-only (n, n_bands) array of spectra per type.
+    """
+    bands = tuple(bands) if bands is not None else None
+    if seed is None:
+        return _drawBundles(tuple(types), sensor, n, bands, seed)
+
+    return _cachedBundles(tuple(types), sensor, n, bands, seed)
+
+
+def _drawBundles(types: tuple, sensor: str, n: int, bands: tuple, seed) -> tuple:
+    """Draws each type's spectra from independent streams of a single seed."""
+    streams = np.random.SeedSequence(seed).spawn(len(types))
+    bundles = list()
+    for Type, stream in zip(types, streams):
+        spectra = selectSpectra(
+            Type,
+            sensor,
+            n,
+            list(bands) if bands is not None else None,
+            seed=np.random.default_rng(stream),
+        )
+        spectra.flags.writeable = False
+        bundles.append(spectra)
+
+    return tuple(bundles)
+
+
+_cachedBundles = lru_cache(maxsize=config.bundle_cache_size)(_drawBundles)
+
+
+def __getattr__(name: str):
+    """Loads the package spectral library on first access instead of at import time."""
+    if name == "library":
+        return load_library()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,33 @@
 """Routines to prepare datasets prior to unmixing"""
 
+import json
 import math
+import os
 import re
+import tempfile
+from functools import lru_cache
 from typing import Callable
+from warnings import warn
 
 import ee
 
+from earthlib import config
 from earthlib.errors import SensorError
 from earthlib.geelib.config import (
     BRDF_COEFFICIENTS_L8,
     BRDF_COEFFICIENTS_L457,
     BRDF_COEFFICIENTS_S2,
+    CORNER_TABLE,
 )
+from earthlib.nplib.SolarPosition import (
+    DECLINATION,
+    EQUATION_OF_TIME,
+    MINUTES_PER_RADIAN,
+    fourierExpression,
+)
+
+# the corner names returned by findCorners()
+CORNER_NAMES = ["upperLeft", "upperRight", "lowerRight", "lowerLeft"]
 
 
 def bySensor(sensor: str) -> Callable:
@@ -56,7 +72,8 @@ def Landsat457(
     Returns:
         a BRDF-corrected image
     """
-    return brdfCorrectWrapper(image, BRDF_COEFFICIENTS_L457, scaleFactor)
+    corners = cachedCorners(image, "WRS2")
+    return brdfCorrectWrapper(image, BRDF_COEFFICIENTS_L457, scaleFactor, corners)
 
 
 def Landsat8(
@@ -75,7 +92,8 @@ def Landsat8(
     Returns:
         a BRDF-corrected image
     """
-    return brdfCorrectWrapper(image, BRDF_COEFFICIENTS_L8, scaleFactor)
+    corners = cachedCorners(image, "WRS2")
+    return brdfCorrectWrapper(image, BRDF_COEFFICIENTS_L8, scaleFactor, corners)
 
 
 def Sentinel2(
@@ -93,28 +111,34 @@ def Sentinel2(
     Returns:
         a BRDF-corrected image
     """
-    return brdfCorrectWrapper(image, BRDF_COEFFICIENTS_S2, scaleFactor)
+    corners = cachedCorners(image, "MGRS")
+    return brdfCorrectWrapper(image, BRDF_COEFFICIENTS_S2, scaleFactor, corners)
 
 
 def brdfCorrectWrapper(
-    image: ee.Image, coefficientsByBand: dict = None, scaleFactor: float = 1
+    image: ee.Image,
+    coefficientsByBand: dict = None,
+    scaleFactor: float = 1,
+    corners: dict = None,
 ) -> ee.Image:
     """Wrapper to support keyword arguments that can't be passed during .map() calls"""
     inputBandNames = image.bandNames()
-    corners = findCorners(image)
-    image = viewAngles(image, corners)
-    image = solarPosition(image)
-    image = sunZenOut(image)
-    image = set(image, "relativeSunViewAz", "i.sunAz - i.viewAz")
-    image = rossThick(image, "kvol", "i.sunZen", "i.viewZen", "i.relativeSunViewAz")
-    image = rossThick(image, "kvol0", "i.sunZenOut", 0, 0)
-    image = liThin(image, "kgeo", "i.sunZen", "i.viewZen", "i.relativeSunViewAz")
-    image = liThin(image, "kgeo0", "i.sunZenOut", 0, 0)
-    image = adjustBands(image, coefficientsByBand, scaleFactor)
-    return image.select(inputBandNames).toInt16()
-
-
-def viewAngles(image: ee.Image, corners: dict) -> ee.Image:
+    corners = corners or findCorners(image)
+    viewZen, viewAz = viewAngles(image, corners)
+    sunZen, sunAz = solarPosition(image)
+
+    # stack the observed and nadir-normalized geometry to compute both kernels at once
+    nadir = ee.Image.constant(0)
+    kvol, kgeo = brdfKernels(
+        sunZen.addBands(ee.Image.constant(sunZenOut(image))),
+        viewZen.addBands(nadir),
+        sunAz.subtract(ee.Image.constant(viewAz)).addBands(nadir),
+    )
+    corrected = adjustBands(image, kvol, kgeo, coefficientsByBand, scaleFactor)
+    return image.addBands(corrected, None, True).select(inputBandNames).toInt16()
+
+
+def viewAngles(image: ee.Image, corners: dict) -> tuple:
     """Compute sensor view angles
 
     Args:
@@ -122,7 +146,8 @@ def viewAngles(image: ee.Image, corners: dict) -> ee.Image:
         corners: a dictionary with corner coords. get from findCorners()
 
     Returns:
-        adds 'viewAz' and 'viewZen' bands to `image`
+        (viewZen, viewAz) tuple with a view zenith image and the scene view
+            azimuth ee.Number, both in radians.
     """
     maxDistanceToSceneEdge = 1000000
     maxSatelliteZenith = 7.5
@@ -130,23 +155,22 @@ def viewAngles(image: ee.Image, corners: dict) -> ee.Image:
     lowerCenter = pointBetween(corners["lowerLeft"], corners["lowerRight"])
     slope = slopeBetween(lowerCenter, upperCenter)
     slopePerp = ee.Number(-1).divide(slope)
-    image = set(
-        image, "viewAz", ee.Image(ee.Number(math.pi / 2).subtract((slopePerp).atan()))
-    )
+    viewAz = ee.Number(math.pi / 2).subtract((slopePerp).atan())
     leftLine = toLine(corners["upperLeft"], corners["lowerLeft"])
     rightLine = toLine(corners["upperRight"], corners["lowerRight"])
     leftDistance = ee.FeatureCollection(leftLine).distance(maxDistanceToSceneEdge)
     rightDistance = ee.FeatureCollection(rightLine).distance(maxDistanceToSceneEdge)
-    viewZenith = (
-        rightDistance.multiply(maxSatelliteZenith * 2)
-        .divide(rightDistance.add(leftDistance))
-        .subtract(maxSatelliteZenith)
+    viewZen = image.expression(
+        format(
+            "(right * {zenith} * 2 / (right + left) - {zenith}) * {pi} / 180",
+            {"zenith": maxSatelliteZenith},
+        ),
+        {"left": leftDistance, "right": rightDistance},
     )
-    image = set(image, "viewZen", viewZenith.multiply(math.pi).divide(180))
-    return image
+    return viewZen, viewAz
 
 
-def solarPosition(image: ee.Image) -> ee.Image:
+def solarPosition(image: ee.Image) -> tuple:
     """Compute solar position from the time of collection
 
     From https://www.pythonfmask.org/en/latest/_modules/fmask/landsatangles.html
@@ -155,72 +179,58 @@ def solarPosition(image: ee.Image) -> ee.Image:
         image: an ee.Image with a "system:time_start" attribute
 
     Returns:
-        adds a series of solar geometry bands to `image`
+        (sunZen, sunAz) tuple of images with the solar zenith and azimuth in radians
     """
     date = ee.Date(ee.Number(image.get("system:time_start")))
     secondsInHour = 3600
-    image = set(image, "longDeg", ee.Image.pixelLonLat().select("longitude"))
-    image = set(
-        image,
-        "latRad",
-        ee.Image.pixelLonLat().select("latitude").multiply(math.pi).divide(180),
-    )
-    image = set(
-        image,
-        "hourGMT",
-        ee.Number(date.getRelative("second", "day")).divide(secondsInHour),
+
+    # the date terms are computed once per scene, only the hour angle varies by pixel
+    jdpr = ee.Number(date.getFraction("year")).multiply(2 * math.pi)
+    hourGMT = ee.Number(date.getRelative("second", "day")).divide(secondsInHour)
+    localSolarDiff = ee.Number.expression(
+        f"({fourierExpression(EQUATION_OF_TIME)}) * {MINUTES_PER_RADIAN!r}",
+        {"jdpr": jdpr},
     )
-    image = set(image, "jdp", date.getFraction("year"))  # Julian Date Proportion
-    image = set(image, "jdpr", "i.jdp * 2 * {pi}")  # Julian Date Proportion in Radians
-    image = set(image, "meanSolarTime", "i.hourGMT + i.longDeg / 15")
-    image = set(
-        image,
-        "localSolarDiff",
-        "(0.000075 + 0.001868 * cos(i.jdpr) - 0.032077 * sin(i.jdpr)"
-        + "- 0.014615 * cos(2 * i.jdpr) - 0.040849 * sin(2 * i.jdpr))"
-        + "* 12 * 60 / {pi}",
+    delta = ee.Number.expression(fourierExpression(DECLINATION), {"jdpr": jdpr})
+    hourOffset = hourGMT.add(localSolarDiff.divide(60)).subtract(12)
+
+    lonLat = ee.Image.pixelLonLat().multiply(math.pi / 180)
+    terms = {
+        "lon": lonLat.select("longitude"),
+        "lat": lonLat.select("latitude"),
+        "sinDelta": ee.Image.constant(delta.sin()),
+        "cosDelta": ee.Image.constant(delta.cos()),
+        "hourOffset": ee.Image.constant(hourOffset),
+    }
+    terms["angleHour"] = image.expression(
+        format("lon + hourOffset * 15 * {pi} / 180", None), terms
     )
-    image = set(image, "TrueSolarTime", "i.meanSolarTime + i.localSolarDiff / 60 - 12")
-    image = set(image, "angleHour", "i.TrueSolarTime * 15 * {pi} / 180")
-    image = set(
-        image,
-        "delta",
-        "0.006918 - 0.399912 * cos(i.jdpr) + 0.070257 * sin(i.jdpr) - 0.006758 * cos(2 * i.jdpr)"
-        + "+ 0.000907 * sin(2 * i.jdpr) - 0.002697 * cos(3 * i.jdpr) + 0.001480 * sin(3 * i.jdpr)",
+    terms["sunZen"] = image.expression(
+        "acos(sin(lat) * sinDelta + cos(lat) * cosDelta * cos(angleHour))", terms
     )
-    image = set(
-        image,
-        "cosSunZen",
-        "sin(i.latRad) * sin(i.delta) "
-        + "+ cos(i.latRad) * cos(i.delta) * cos(i.angleHour)",
+    terms["sinSunAzSW"] = image.expression(
+        "min(max(cosDelta * sin(angleHour) / sin(sunZen), -1), 1)", terms
     )
-    image = set(image, "sunZen", "acos(i.cosSunZen)")
-    image = set(
-        image,
-        "sinSunAzSW",
-        toImage(image, "cos(i.delta) * sin(i.angleHour) / sin(i.sunZen)").clamp(-1, 1),
+    terms["cosSunAzSW"] = image.expression(
+        "(-cos(lat) * sinDelta + sin(lat) * cosDelta * cos(angleHour)) / sin(sunZen)",
+        terms,
     )
-    image = set(
-        image,
-        "cosSunAzSW",
-        "(-cos(i.latRad) * sin(i.delta)"
-        + "+ sin(i.latRad) * cos(i.delta) * cos(i.angleHour)) / sin(i.sunZen)",
+    sunAz = image.expression(
+        format(
+            "(cosSunAzSW <= 0 ? {pi} - asin(sinSunAzSW)"
+            + ": sinSunAzSW <= 0 ? {pi} + {pi} + asin(sinSunAzSW)"
+            + ": asin(sinSunAzSW)) + {pi}",
+            None,
+        ),
+        terms,
     )
-    image = set(image, "sunAzSW", "asin(i.sinSunAzSW)")
-    image = setIf(image, "sunAzSW", "i.cosSunAzSW <= 0", "{pi} - i.sunAzSW", "sunAzSW")
-    image = setIf(
-        image,
-        "sunAzSW",
-        "i.cosSunAzSW > 0 and i.sinSunAzSW <= 0",
-        "2 * {pi} + i.sunAzSW",
-        "sunAzSW",
+    sunAz = image.expression(
+        format("sunAz > 2 * {pi} ? sunAz - 2 * {pi} : sunAz", None), {"sunAz": sunAz}
     )
-    image = set(image, "sunAz", "i.sunAzSW + {pi}")
-    image = setIf(image, "sunAz", "i.sunAz > 2 * {pi}", "i.sunAz - 2 * {pi}", "sunAz")
-    return image
+    return terms["sunZen"], sunAz
 
 
-def sunZenOut(image: ee.Image) -> ee.Image:
+def sunZenOut(image: ee.Image) -> ee.Number:
     """Compute the solar zenith angle from an image center
 
     From https://hls.gsfc.nasa.gov/wp-content/uploads/2016/08/HLS.v1.0.UserGuide.pdf
@@ -229,176 +239,136 @@ def sunZenOut(image: ee.Image) -> ee.Image:
         image: an ee.Image with a "system:footprint" attribute
 
     Returns:
-        adds a "sunZenOut" band to `image`
+        the normalized solar zenith angle in radians for the scene center latitude
     """
-    image = set(
-        image,
-        "centerLat",
-        ee.Number(
-            ee.Geometry(image.get("system:footprint"))
-            .bounds()
-            .centroid(30)
-            .coordinates()
-            .get(0)
-        )
-        .multiply(math.pi)
-        .divide(180),
+    centerLat = ee.Number(
+        ee.Geometry(image.get("system:footprint"))
+        .bounds()
+        .centroid(30)
+        .coordinates()
+        .get(1)
     )
-    image = set(
-        image,
-        "sunZenOut",
+    return ee.Number.expression(
         "(31.0076"
-        + "- 0.1272 * i.centerLat"
-        + "+ 0.01187 * pow(i.centerLat, 2)"
-        + "+ 2.40E-05 * pow(i.centerLat, 3)"
-        + "- 9.48E-07 * pow(i.centerLat, 4)"
-        + "- 1.95E-09 * pow(i.centerLat, 5)"
-        + "+ 6.15E-11 * pow(i.centerLat, 6)) * {pi}/180",
+        + "- 0.1272 * centerLat"
+        + "+ 0.01187 * pow(centerLat, 2)"
+        + "+ 2.40E-05 * pow(centerLat, 3)"
+        + "- 9.48E-07 * pow(centerLat, 4)"
+        + "- 1.95E-09 * pow(centerLat, 5)"
+        + format("+ 6.15E-11 * pow(centerLat, 6)) * {pi} / 180", None),
+        {"centerLat": centerLat},
     )
-    return image
 
 
-def rossThick(
-    image: ee.Image, bandName: str, sunZen: str, viewZen: str, relativeSunViewAz: str
-) -> ee.Image:
-    """From https://modis.gsfc.nasa.gov/data/atbd/atbd_mod09.pdf"""
-    args = {
-        "sunZen": sunZen,
-        "viewZen": viewZen,
-        "relativeSunViewAz": relativeSunViewAz,
-    }
-    image = cosPhaseAngle(image, "cosPhaseAngle", sunZen, viewZen, relativeSunViewAz)
-    image = set(image, "phaseAngle", "acos(i.cosPhaseAngle)")
-    image = set(
-        image,
-        bandName,
-        "(({pi}/2 - i.phaseAngle) * i.cosPhaseAngle + sin(i.phaseAngle)) "
-        + "/ (cos({sunZen}) + cos({viewZen})) - {pi}/4",
-        args,
-    )
-    return image
+def brdfKernels(
+    sunZen: ee.Image, viewZen: ee.Image, relativeSunViewAz: ee.Image
+) -> tuple:
+    """Evaluates the Ross-Thick and Li-Sparse kernels, sharing trigonometric terms.
 
+    From https://modis.gsfc.nasa.gov/data/atbd/atbd_mod09.pdf. Inputs may have
+        several bands, e.g. observed and normalized geometry, evaluated band-wise.
 
-def liThin(
-    image: ee.Image, bandName: str, sunZen: str, viewZen: str, relativeSunViewAz: str
-) -> ee.Image:
-    """From https://modis.gsfc.nasa.gov/data/atbd/atbd_mod09.pdf"""
-    args = {
-        "sunZen": sunZen,
-        "viewZen": viewZen,
-        "relativeSunViewAz": relativeSunViewAz,
-        "hb": 2,
+    Args:
+        sunZen: the solar zenith angle in radians.
+        viewZen: the sensor view zenith angle in radians.
+        relativeSunViewAz: the relative sun/sensor azimuth angle in radians.
+
+    Returns:
+        (kvol, kgeo) tuple of the volumetric and geometric kernel images.
+    """
+    # prime angles use b/r = 1, so only negative tangents are clamped
+    tanSunZen = sunZen.tan().max(0)
+    tanViewZen = viewZen.tan().max(0)
+    terms = {
+        "cosSunZen": sunZen.cos(),
+        "cosViewZen": viewZen.cos(),
+        "sinSunZen": sunZen.sin(),
+        "sinViewZen": viewZen.sin(),
+        "cosAz": relativeSunViewAz.cos(),
+        "sinAz": relativeSunViewAz.sin(),
+        "tanSunZen": tanSunZen,
+        "tanViewZen": tanViewZen,
+        "secSunZen": tanSunZen.pow(2).add(1).sqrt(),
+        "secViewZen": tanViewZen.pow(2).add(1).sqrt(),
     }
-    image = anglePrime(image, "sunZenPrime", sunZen)
-    image = anglePrime(image, "viewZenPrime", viewZen)
-    image = cosPhaseAngle(
-        image,
-        "cosPhaseAnglePrime",
-        "i.sunZenPrime",
-        "i.viewZenPrime",
-        relativeSunViewAz,
+    terms["cosPhase"] = sunZen.expression(
+        "min(max(cosSunZen * cosViewZen + sinSunZen * sinViewZen * cosAz, -1), 1)",
+        terms,
     )
-    image = set(
-        image,
-        "distance",
-        "sqrt(pow(tan(i.sunZenPrime), 2) + pow(tan(i.viewZenPrime), 2)"
-        + "- 2 * tan(i.sunZenPrime) * tan(i.viewZenPrime) * cos({relativeSunViewAz}))",
-        args,
-    )
-    image = set(image, "temp", "1/cos(i.sunZenPrime) + 1/cos(i.viewZenPrime)")
-    image = set(
-        image,
-        "cosT",
-        toImage(
-            image,
-            "{hb} * sqrt(pow(i.distance, 2) + pow(tan(i.sunZenPrime) * tan(i.viewZenPrime) * sin({relativeSunViewAz}), 2))"
-            + "/ i.temp",
-            args,
-        ).clamp(-1, 1),
+    kvol = sunZen.expression(
+        format(
+            "(({pi} / 2 - acos(cosPhase)) * cosPhase + sqrt(1 - cosPhase * cosPhase))"
+            + "/ (cosSunZen + cosViewZen) - {pi} / 4",
+            None,
+        ),
+        terms,
     )
-    image = set(image, "t", "acos(i.cosT)")
-    image = set(image, "overlap", "(1/{pi}) * (i.t - sin(i.t) * i.cosT) * (i.temp)")
-    image = setIf(image, "overlap", "i.overlap > 0", 0)
-    image = set(
-        image,
-        bandName,
-        "i.overlap - i.temp"
-        + "+ (1/2) * (1 + i.cosPhaseAnglePrime) * (1/cos(i.sunZenPrime)) * (1/cos(i.viewZenPrime))",
-    )
-    return image
-
 
-def anglePrime(image: ee.Image, name: str, angle: str) -> ee.Image:
-    """Prime angle is computed from sun/sensor zenith and used to estimate phase angle"""
-    args = {"br": 1, "angle": angle}
-    image = set(image, "tanAnglePrime", "{br} * tan({angle})", args)
-    image = setIf(image, "tanAnglePrime", "i.tanAnglePrime < 0", 0)
-    image = set(image, name, "atan(i.tanAnglePrime)")
-    return image
-
-
-def cosPhaseAngle(
-    image: ee.Image, name: str, sunZen: str, viewZen: str, relativeSunViewAz: str
-) -> ee.Image:
-    """Phase angle estimates the relative deviation between sun/sensor geometry"""
-    args = {
-        "sunZen": sunZen,
-        "viewZen": viewZen,
-        "relativeSunViewAz": relativeSunViewAz,
-    }
-    image = set(
-        image,
-        name,
-        toImage(
-            image,
-            "cos({sunZen}) * cos({viewZen})"
-            + "+ sin({sunZen}) * sin({viewZen}) * cos({relativeSunViewAz})",
-            args,
-        ).clamp(-1, 1),
+    # li-sparse, with cos(phase') = (1 + tan tan cos) / (sec sec)
+    terms["cosT"] = sunZen.expression(
+        format(
+            "min(max({hb} * sqrt(pow(tanSunZen, 2) + pow(tanViewZen, 2)"
+            + "- 2 * tanSunZen * tanViewZen * cosAz"
+            + "+ pow(tanSunZen * tanViewZen * sinAz, 2))"
+            + "/ (secSunZen + secViewZen), -1), 1)",
+            {"hb": 2},
+        ),
+        terms,
+    )
+    kgeo = sunZen.expression(
+        format(
+            "max((acos(cosT) - sqrt(1 - cosT * cosT) * cosT)"
+            + "* (secSunZen + secViewZen) / {pi}, 0)"
+            + "- (secSunZen + secViewZen)"
+            + "+ 0.5 * (secSunZen * secViewZen + 1 + tanSunZen * tanViewZen * cosAz)",
+            None,
+        ),
+        terms,
     )
-    return image
+    return kvol, kgeo
 
 
 def adjustBands(
-    image: ee.Image, coefficientsByBand: dict, scaleFactor: float = 1
+    image: ee.Image,
+    kvol: ee.Image,
+    kgeo: ee.Image,
+    coefficientsByBand: dict,
+    scaleFactor: float = 1,
 ) -> ee.Image:
-    """Apply estimated BRDF adjustments band-by-band"""
-    for bandName in coefficientsByBand:
-        image = applyCFactor(image, bandName, coefficientsByBand[bandName], scaleFactor)
-    return image
+    """Apply BRDF c-factor adjustments to every band in one expression
 
+    Args:
+        image: the ee.Image to adjust.
+        kvol: a 2-band image with the observed and normalized volumetric kernels.
+        kgeo: a 2-band image with the observed and normalized geometric kernels.
+        coefficientsByBand: {band name: {"fiso", "fgeo", "fvol"}} kernel weights.
+        scaleFactor: a scaling factor to tune the volumetric scattering adjustment.
 
-def applyCFactor(
-    image: ee.Image, bandName: str, coefficients: dict, scaleFactor: float
-) -> ee.Image:
-    """Apply BRDF C-factor adjustments to a single band"""
-    image = brdf(image, "brdf", "kvol", "kgeo", coefficients, scaleFactor)
-    image = brdf(image, "brdf0", "kvol0", "kgeo0", coefficients, scaleFactor)
-    image = set(image, "cFactor", "i.brdf0 / i.brdf", coefficients)
-    image = set(
-        image, bandName, "{bandName} * i.cFactor", {"bandName": "i." + bandName}
-    )
-    return image
+    Returns:
+        an image with the adjusted bands in `coefficientsByBand`.
+    """
+    bandNames = list(coefficientsByBand)
 
+    def constant(key: str, scale: float = 1) -> ee.Image:
+        return ee.Image.constant(
+            [coefficientsByBand[band][key] * scale for band in bandNames]
+        )
 
-def brdf(
-    image: ee.Image,
-    bandName: str,
-    kvolBand: str,
-    kgeoBand: str,
-    coefficients: dict,
-    scaleFactor: float,
-) -> ee.Image:
-    """Apply the BRDF volumetric scattering adjustment"""
-    args = merge_dicts(
-        coefficients,
+    corrected = image.expression(
+        "reflectance * (fiso + fvol * kvol0 + fgeo * kgeo0)"
+        + "/ (fiso + fvol * kvol + fgeo * kgeo)",
         {
-            "kvol": f"{scaleFactor} * i." + kvolBand,
-            "kgeo": "i." + kgeoBand,
+            "reflectance": image.select(bandNames),
+            "fiso": constant("fiso"),
+            "fvol": constant("fvol", scaleFactor),
+            "fgeo": constant("fgeo"),
+            "kvol": kvol.select([0]),
+            "kvol0": kvol.select([1]),
+            "kgeo": kgeo.select([0]),
+            "kgeo0": kgeo.select([1]),
         },
     )
-    image = set(image, bandName, "{fiso} + {fvol} * {kvol} + {fgeo} * {kvol}", args)
-    return image
+    return corrected.rename(bandNames)
 
 
 def x(point: ee.Geometry.Point):
@@ -446,6 +416,148 @@ def findCorners(image: ee.Image) -> dict:
     }
 
 
+def wrsSceneId(image: ee.Image) -> ee.String:
+    """Get a Landsat image's WRS-2 path/row as a string, e.g. '044034'"""
+    path = ee.Number(image.get("WRS_PATH")).format("%03d")
+    row = ee.Number(image.get("WRS_ROW")).format("%03d")
+    return path.cat(row)
+
+
+def mgrsSceneId(image: ee.Image) -> ee.String:
+    """Get a Sentinel-2 image's MGRS tile ID, e.g. '10SEG'"""
+    return ee.String(image.get("MGRS_TILE"))
+
+
+# functions returning the key for each tiling grid in the corner table
+SCENE_IDS = {
+    "WRS2": wrsSceneId,
+    "MGRS": mgrsSceneId,
+}
+
+
+def cachedCorners(image: ee.Image, grid: str) -> dict:
+    """Get corner coordinates from the corner table, if the scene has an entry
+
+    Scenes on the same path/row or tile share a footprint, so the table skips
+        the footprint reductions in findCorners(). Scenes without an entry fall
+        back to findCorners().
+
+    Args:
+        image: an ee.Image with a "system:footprint" attribute
+        grid: the tiling grid used to key the table ("WRS2" or "MGRS")
+
+    Returns:
+        a dictionary with corner coords, like findCorners()
+    """
+    table = loadCornerTable().get(grid)
+    if not table:
+        return findCorners(image)
+
+    lookup = ee.Dictionary(table)
+    sceneId = SCENE_IDS[grid](image)
+    corners = ee.Dictionary(
+        ee.Algorithms.If(
+            lookup.contains(sceneId),
+            lookup.get(sceneId),
+            ee.Dictionary(findCorners(image)),
+        )
+    )
+    return {name: ee.List(corners.get(name)) for name in CORNER_NAMES}
+
+
+def getCornerTablePaths() -> list:
+    """Get the package data and user cache paths for the corner table"""
+    return [
+        os.path.join(config.package_dir, "data", CORNER_TABLE),
+        os.path.join(config.cache_dir, CORNER_TABLE),
+    ]
+
+
+@lru_cache(maxsize=None)
+def loadCornerTable() -> dict:
+    """Read the cached scene corners, with user entries overriding package data
+
+    Returns:
+        {grid: {scene id: {corner name: [x, y]}}} for each cached scene
+    """
+    table = {grid: {} for grid in SCENE_IDS}
+    for path in getCornerTablePaths():
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            continue
+        for grid, corners in entries.items():
+            table.setdefault(grid, {}).update(corners)
+
+    return table
+
+
+def saveCornerTable(table: dict) -> None:
+    """Add scene corners to the user cache, e.g. from buildCornerTable()
+
+    Args:
+        table: {grid: {scene id: {corner name: [x, y]}}} entries to cache
+    """
+    path = getCornerTablePaths()[-1]
+    entries = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            entries = json.load(f)
+    for grid, corners in table.items():
+        entries.setdefault(grid, {}).update(corners)
+
+    # write to a temporary file first so readers never see a partial table
+    os.makedirs(config.cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=config.cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+    loadCornerTable.cache_clear()
+
+
+def buildCornerTable(collection: ee.ImageCollection, grid: str) -> dict:
+    """Compute scene corners once per path/row or tile in a collection
+
+    Runs findCorners() on the first image of each path/row or tile and fetches
+        the results with a single getInfo() call. Save the output with
+        saveCornerTable() to use it in later BRDF corrections.
+
+    Args:
+        collection: Landsat or Sentinel-2 images covering the area of interest
+        grid: the tiling grid used to key the table ("WRS2" or "MGRS")
+
+    Returns:
+        {grid: {scene id: {corner name: [x, y]}}} for each scene in the collection
+    """
+    try:
+        sceneId = SCENE_IDS[grid]
+    except KeyError:
+        supported = ", ".join(SCENE_IDS.keys())
+        raise ValueError(f"Unsupported grid '{grid}'. Supported: {supported}")
+
+    properties = ["WRS_PATH", "WRS_ROW"] if grid == "WRS2" else ["MGRS_TILE"]
+
+    def toFeature(image):
+        corners = findCorners(image)
+        return ee.Feature(None, corners).set("sceneId", sceneId(image))
+
+    features = ee.FeatureCollection(collection.distinct(properties).map(toFeature))
+    corners = {}
+    for feature in features.getInfo()["features"]:
+        attributes = feature["properties"]
+        corners[attributes["sceneId"]] = {
+            name: attributes[name] for name in CORNER_NAMES
+        }
+
+    return {grid: corners}
+
+
 def pointBetween(
     pointA: ee.Geometry.Point, pointB: ee.Geometry.Point
 ) -> ee.Geometry.Point:
@@ -467,18 +579,150 @@ def toLine(
     return ee.Geometry.LineString([pointA, pointB])
 
 
+def format(s: str, args: dict, constants: dict = {"pi": f"{math.pi:0.8f}"}) -> str:
+    """Format a string to strip out {} values"""
+    args = args or {}
+    allArgs = merge_dicts(constants, args)
+    vars = re.findall(r"\{([A-Za-z0-9_]+)\}", s)
+    for var in vars:
+        replacement_var = str(allArgs[var])
+        s = s.replace("{" + f"{var}" + "}", replacement_var)
+    return s
+
+
+def merge_dicts(d1: dict, d2: dict) -> dict:
+    """Create one dictionary from two"""
+    return {**d1, **d2}
+
+
+# band-wise helpers from before the kernels were fused. each call adds a band to the
+# image, so they are kept only for backwards compatibility.
+
+
 def set(
     image: ee.Image,
     name: str,
     toAdd: str,
     args: dict = None,
 ) -> ee.Image:
+    """Append the value of `toAdd` as a band `name` to `image`. Deprecated"""
+    _deprecated("set", "ee.Image.addBands")
+    return _set(image, name, toAdd, args)
+
+
+def setIf(
+    image: ee.Image, name: str, condition: str, TrueValue: float, FalseValue: float = 0
+) -> ee.Image:
+    """Create a conditional mask and add it as a band to `image`. Deprecated"""
+    _deprecated("setIf", "ee.Image.where")
+    return _setIf(image, name, condition, TrueValue, FalseValue)
+
+
+def toImage(image: ee.Image, band: str, args: dict = None) -> ee.Image:
+    """Convert scalars or expressions to new bands. Deprecated"""
+    _deprecated("toImage", "ee.Image.expression")
+    return _toImage(image, band, args)
+
+
+def rossThick(
+    image: ee.Image, bandName: str, sunZen: str, viewZen: str, relativeSunViewAz: str
+) -> ee.Image:
+    """Add a Ross-Thick volumetric kernel band. Deprecated, see brdfKernels()"""
+    _deprecated("rossThick", "brdfKernels")
+    angles = [_toImage(image, angle) for angle in (sunZen, viewZen, relativeSunViewAz)]
+    kvol, _ = brdfKernels(*angles)
+    return _set(image, bandName, kvol)
+
+
+def liThin(
+    image: ee.Image, bandName: str, sunZen: str, viewZen: str, relativeSunViewAz: str
+) -> ee.Image:
+    """Add a Li-Sparse geometric kernel band. Deprecated, see brdfKernels()"""
+    _deprecated("liThin", "brdfKernels")
+    angles = [_toImage(image, angle) for angle in (sunZen, viewZen, relativeSunViewAz)]
+    _, kgeo = brdfKernels(*angles)
+    return _set(image, bandName, kgeo)
+
+
+def anglePrime(image: ee.Image, name: str, angle: str) -> ee.Image:
+    """Add a prime angle band, with b/r = 1. Deprecated, see brdfKernels()"""
+    _deprecated("anglePrime", "brdfKernels")
+    return _set(image, name, _toImage(image, angle).tan().max(0).atan())
+
+
+def cosPhaseAngle(
+    image: ee.Image, name: str, sunZen: str, viewZen: str, relativeSunViewAz: str
+) -> ee.Image:
+    """Add a phase angle cosine band. Deprecated, see brdfKernels()"""
+    _deprecated("cosPhaseAngle", "brdfKernels")
+    args = {
+        "sunZen": sunZen,
+        "viewZen": viewZen,
+        "relativeSunViewAz": relativeSunViewAz,
+    }
+    cosPhase = _toImage(
+        image,
+        "cos({sunZen}) * cos({viewZen})"
+        + "+ sin({sunZen}) * sin({viewZen}) * cos({relativeSunViewAz})",
+        args,
+    )
+    return _set(image, name, cosPhase.clamp(-1, 1))
+
+
+def applyCFactor(
+    image: ee.Image, bandName: str, coefficients: dict, scaleFactor: float
+) -> ee.Image:
+    """Apply BRDF c-factor adjustments to a single band. Deprecated, see adjustBands()
+
+    Reads the kernels from the "kvol", "kvol0", "kgeo" and "kgeo0" bands of `image`.
+    """
+    _deprecated("applyCFactor", "adjustBands")
+    corrected = adjustBands(
+        image,
+        image.select(["kvol", "kvol0"]),
+        image.select(["kgeo", "kgeo0"]),
+        {bandName: coefficients},
+        scaleFactor,
+    )
+    return image.addBands(corrected, None, True)
+
+
+def brdf(
+    image: ee.Image,
+    bandName: str,
+    kvolBand: str,
+    kgeoBand: str,
+    coefficients: dict,
+    scaleFactor: float,
+) -> ee.Image:
+    """Add a BRDF model band from kernel bands. Deprecated, see adjustBands()"""
+    _deprecated("brdf", "adjustBands")
+    args = merge_dicts(
+        coefficients,
+        {
+            "kvol": f"{scaleFactor} * i." + kvolBand,
+            "kgeo": "i." + kgeoBand,
+        },
+    )
+    return _set(image, bandName, "{fiso} + {fvol} * {kvol} + {fgeo} * {kgeo}", args)
+
+
+def _deprecated(name: str, replacement: str) -> None:
+    """Warn that a band-wise helper is deprecated"""
+    warn(
+        f"{name}() is deprecated and will be removed, use {replacement}() instead",
+        DeprecationWarning,
+        stacklevel=3,
+    )
+
+
+def _set(image: ee.Image, name: str, toAdd: str, args: dict = None) -> ee.Image:
     """Append the value of `toAdd` as a band `name` to `image`"""
-    toAdd = toImage(image, toAdd, args)
+    toAdd = _toImage(image, toAdd, args)
     return image.addBands(toAdd.rename(name), None, True)
 
 
-def setIf(
+def _setIf(
     image: ee.Image, name: str, condition: str, TrueValue: float, FalseValue: float = 0
 ) -> ee.Image:
     """Create a conditional mask and add it as a band to `image`"""
@@ -486,15 +730,14 @@ def setIf(
     def invertMask(mask):
         return mask.multiply(-1).add(1)
 
-    condition = toImage(image, condition)
-    TrueMasked = toImage(image, TrueValue).mask(toImage(image, condition))
-    FalseMasked = toImage(image, FalseValue).mask(invertMask(condition))
+    condition = _toImage(image, condition)
+    TrueMasked = _toImage(image, TrueValue).mask(_toImage(image, condition))
+    FalseMasked = _toImage(image, FalseValue).mask(invertMask(condition))
     value = TrueMasked.unmask(FalseMasked)
-    image = set(image, name, value)
-    return image
+    return _set(image, name, value)
 
 
-def toImage(image: ee.Image, band: str, args: dict = None) -> ee.Image:
+def _toImage(image: ee.Image, band: str, args: dict = None) -> ee.Image:
     """Convenience function to convert scalars or expressions to new bands"""
     if type(band) is str:
         if "." in band or " " in band or "{" in band:
@@ -502,19 +745,3 @@ def toImage(image: ee.Image, band: str, args: dict = None) -> ee.Image:
         else:
             band = image.select(band)
     return ee.Image(band)
-
-
-def format(s: str, args: dict, constants: dict = {"pi": f"{math.pi:0.8f}"}) -> str:
-    """Format a string to strip out {} values"""
-    args = args or {}
-    allArgs = merge_dicts(constants, args)
-    vars = re.findall(r"\{([A-Za-z0-9_]+)\}", s)
-    for var in vars:
-        replacement_var = str(allArgs[var])
-        s = s.replace("{" + f"{var}" + "}", replacement_var)
-    return s
-
-
-def merge_dicts(d1: dict, d2: dict) -> dict:
-    """Create one dictionary from two"""
-    return {**d1, **d2}
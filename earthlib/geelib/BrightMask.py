@@ -5,7 +5,7 @@ from typing import Callable
 import ee
 
 from earthlib.errors import SensorError
-from earthlib.utils import getBands
+from earthlib.sensors import get_bands
 
 
 def bySensor(sensor: str) -> Callable:
@@ -60,7 +60,7 @@ def Landsat457(img: ee.Image, threshold: float = 0.4) -> ee.Image:
     Returns:
         the same input image with an updated mask.
     """
-    subset = img.select(getBands("Landsat7"))
+    subset = img.select(get_bands("Landsat7"))
     shade = brightMask(subset, threshold)
     return img.updateMask(shade)
 
@@ -76,6 +76,6 @@ def Landsat8(img: ee.Image, threshold: float = 0.4) -> ee.Image:
     Returns:
         the same input image with an updated mask.
     """
-    subset = img.select(getBands("Landsat8"))
+    subset = img.select(get_bands("Landsat8"))
     shade = brightMask(subset, threshold)
     return img.updateMask(shade)
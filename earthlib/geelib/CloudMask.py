@@ -64,6 +64,18 @@ def Landsat4578(img: ee.Image) -> ee.Image:
     Returns:
         the same input image with an updated mask.
     """
+    return img.updateMask(landsatQAMask(img))
+
+
+def landsatQAMask(img: ee.Image) -> ee.Image:
+    """Computes a Landsat cloud mask without applying it.
+
+    Args:
+        img: the ee.Image to mask. Must have "QA_PIXEL" and "QA_RADSAT" bands.
+
+    Returns:
+        a pixel byte map with 0 for cloudy or saturated pixels, 1 for clear pixels.
+    """
     qa = img.select("QA_PIXEL")
     sat = img.select("QA_RADSAT")
 
@@ -75,9 +87,7 @@ def Landsat4578(img: ee.Image) -> ee.Image:
     qaMask = dilatedCloud.And(cirrus).And(cloud).And(cloudShadow).And(snow)
 
     satMask = sat.eq(0)
-    jointMask = qaMask.And(satMask)
-
-    return img.updateMask(jointMask)
+    return qaMask.And(satMask)
 
 
 def Sentinel2QA(img: ee.Image) -> ee.Image:
@@ -0,0 +1,101 @@
+"""Functions for cloud, shade and brightness masking earth engine images at once."""
+
+from typing import Callable
+
+import ee
+
+from earthlib.errors import SensorError
+from earthlib.geelib.CloudMask import landsatQAMask
+from earthlib.sensors import get_bands
+
+
+def bySensor(sensor: str) -> Callable:
+    """Returns the appropriate combined mask function to use by sensor type.
+
+    Args:
+        sensor: string with the sensor name to return (e.g. "Landsat8").
+
+    Returns:
+        the mask function associated with a sensor to pass to an ee .map() call
+    """
+    lookup = {
+        "Landsat4": Landsat457,
+        "Landsat5": Landsat457,
+        "Landsat7": Landsat457,
+        "Landsat8": Landsat8,
+    }
+    try:
+        function = lookup[sensor]
+        return function
+    except KeyError:
+        supported = ", ".join(lookup.keys())
+        raise SensorError(
+            f"Combined masking not supported for '{sensor}'. Supported: {supported}"
+        )
+
+
+def combinedMask(
+    img: ee.Image,
+    cloudMask: ee.Image,
+    shadeThreshold: float = 0.03,
+    brightThreshold: float = 0.4,
+) -> ee.Image:
+    """Combine a cloud mask with shade and bright pixel masks.
+
+    The mean brightness is computed once and shared by both thresholds.
+
+    Args:
+        img: the reflectance bands to compute brightness from.
+        cloudMask: a pixel byte map with 0 for cloudy pixels, 1 for clear pixels.
+        shadeThreshold: pixels with mean brightness below this value are masked.
+        brightThreshold: pixels with mean brightness above this value are masked.
+
+    Returns:
+        a pixel byte map with 0 for masked pixels, 1 for valid pixels.
+    """
+    brightness = img.reduce(ee.Reducer.mean())
+    notShade = brightness.gt(shadeThreshold)
+    notBright = brightness.lt(brightThreshold)
+    return cloudMask.And(notShade).And(notBright)
+
+
+def Landsat457(
+    img: ee.Image, shadeThreshold: float = 0.03, brightThreshold: float = 0.4
+) -> ee.Image:
+    """Apply cloud, shade and bright pixel masking to a Landsat 4/5/7 image.
+
+    Equivalent to CloudMask.Landsat4578, ShadeMask.Landsat457 and
+        BrightMask.Landsat457 in sequence, with a single updateMask() call.
+
+    Args:
+        img: the ee.Image to mask. Must have "QA_PIXEL" and "QA_RADSAT" bands.
+        shadeThreshold: pixels with mean brightness below this value are masked.
+        brightThreshold: pixels with mean brightness above this value are masked.
+
+    Returns:
+        the same input image with an updated mask.
+    """
+    subset = img.select(get_bands("Landsat7"))
+    mask = combinedMask(subset, landsatQAMask(img), shadeThreshold, brightThreshold)
+    return img.updateMask(mask)
+
+
+def Landsat8(
+    img: ee.Image, shadeThreshold: float = 0.03, brightThreshold: float = 0.4
+) -> ee.Image:
+    """Apply cloud, shade and bright pixel masking to a Landsat 8 image.
+
+    Equivalent to CloudMask.Landsat4578, ShadeMask.Landsat8 and
+        BrightMask.Landsat8 in sequence, with a single updateMask() call.
+
+    Args:
+        img: the ee.Image to mask. Must have "QA_PIXEL" and "QA_RADSAT" bands.
+        shadeThreshold: pixels with mean brightness below this value are masked.
+        brightThreshold: pixels with mean brightness above this value are masked.
+
+    Returns:
+        the same input image with an updated mask.
+    """
+    subset = img.select(get_bands("Landsat8"))
+    mask = combinedMask(subset, landsatQAMask(img), shadeThreshold, brightThreshold)
+    return img.updateMask(mask)
@@ -4,7 +4,9 @@ from typing import Callable
 
 import ee
 
-from earthlib.utils import getBandDescriptions, getBands
+from earthlib.errors import SensorError
+from earthlib.registry import get_operation
+from earthlib.sensors import get_band_descriptions, get_bands
 
 
 def bySensor(sensor: str) -> Callable:
@@ -16,29 +18,34 @@ def bySensor(sensor: str) -> Callable:
     Returns:
         the NIRv function associated with a sensor to pass to an ee .map() call
     """
-    lookup = {
-        "ASTER": ASTER,
-        "AVNIR2": AVNIR2,
-        "DoveR": DoveR,
-        "Landsat4": Landsat4,
-        "Landsat5": Landsat5,
-        "Landsat7": Landsat7,
-        "Landsat8": Landsat8,
-        "MODIS": MODIS,
-        "PlanetScope": PlanetScope,
-        "Sentinel2": Sentinel2,
-        "SuperDove": SuperDove,
-        "VIIRS": VIIRS,
-    }
+    return get_operation("NIRv", sensor)
+
+
+def forSensor(sensor: str) -> Callable:
+    """Builds a NIRv function with a sensor's red and near infrared bands resolved.
+
+    Use `bySensor()` or earthlib.registry.get_operation("NIRv", sensor) to reuse
+        the function built for each sensor.
+
+    Args:
+        sensor: string with the sensor name (e.g. "Landsat8", "Sentinel2").
+
+    Returns:
+        the NIRv function for the sensor to pass to an ee .map() call
+    """
     try:
-        function = lookup[sensor]
-        return function
-    except KeyError:
-        supported = ", ".join(lookup.keys())
+        red, nir = getNIRvBands(sensor)
+    except ValueError:
         raise SensorError(
-            f"NIRv calculation not supported for '{sensor}'. Supported: {supported}"
+            f"NIRv calculation not supported for '{sensor}': no red and NIR bands"
         )
 
+    def NIRv(image: ee.Image) -> ee.Image:
+        return NIRvWrapper(image, red, nir)
+
+    NIRv.__doc__ = f"Compute NIRv for a {sensor} image"
+    return NIRv
+
 
 def ASTER(image: ee.Image) -> ee.Image:
     """Transform ASTER image data to scaled reflectance values"""
@@ -126,8 +133,8 @@ def VIIRS(image: ee.Image) -> ee.Image:
 
 def getNIRvBands(sensor: str) -> tuple:
     """Look-up the red and near infrared bands for NIRv calculation"""
-    bnames = getBands(sensor)
-    descriptions = getBandDescriptions(sensor)
+    bnames = get_bands(sensor)
+    descriptions = get_band_descriptions(sensor) or []
     idx_red = descriptions.index("red")
     idx_nir = descriptions.index("near infrared")
     red = bnames[idx_red]
@@ -4,7 +4,7 @@ from typing import Callable
 
 import ee
 
-from earthlib.errors import SensorError
+from earthlib.registry import get_operation
 from earthlib.sensors import supported_sensors
 
 
@@ -17,29 +17,28 @@ def bySensor(sensor: str) -> Callable:
     Returns:
         the scale function associated with a sensor to pass to an ee .map() call
     """
-    lookup = {
-        "ASTER": ASTER,
-        "AVNIR2": AVNIR2,
-        "DoveR": DoveR,
-        "Landsat4": Landsat4,
-        "Landsat5": Landsat5,
-        "Landsat7": Landsat7,
-        "Landsat8": Landsat8,
-        "MODIS": MODIS,
-        "NEON": NEON,
-        "PlanetScope": PlanetScope,
-        "Sentinel2": Sentinel2,
-        "SuperDove": SuperDove,
-        "VIIRS": VIIRS,
-    }
-    try:
-        function = lookup[sensor]
-        return function
-    except KeyError:
-        supported = ", ".join(lookup.keys())
-        raise SensorError(
-            f"Scaling adjustment not supported for '{sensor}'. Supported: {supported}"
-        )
+    return get_operation("Scale", sensor)
+
+
+def forSensor(sensor: str) -> Callable:
+    """Builds a scaling function with a sensor's scale and offset resolved.
+
+    Use `bySensor()` or earthlib.registry.get_operation("Scale", sensor) to reuse
+        the function built for each sensor.
+
+    Args:
+        sensor: string with the sensor name (e.g. "Landsat8", "Sentinel2").
+
+    Returns:
+        the scale function for the sensor to pass to an ee .map() call
+    """
+    scale, offset = getScaleParams(sensor)
+
+    def Scale(image: ee.Image) -> ee.Image:
+        return scaleWrapper(image, scale, offset)
+
+    Scale.__doc__ = f"Transform {sensor} image data to scaled reflectance values"
+    return Scale
 
 
 def Landsat4(image: ee.Image) -> ee.Image:
@@ -4,63 +4,104 @@ from typing import Callable, Tuple
 
 import ee
 
-from earthlib.errors import SensorError
-from earthlib.geelib.config import N_ITERATIONS, SHADE_NORMALIZE
+from earthlib.endmembers import selectBundles
+from earthlib.geelib.config import N_ITERATIONS, SEED, SHADE_NORMALIZE
 from earthlib.geelib.Unmix import fractionalCover
-from earthlib.utils import getBands, selectSpectra
+from earthlib.profiling import profiled
+from earthlib.registry import get_operation
+from earthlib.sensors import get_bands
 
 # default band names
 ENDMEMBER_NAMES = ["Soil", "PV", "NPV"]
 
 
 def bySensor(sensor: str) -> Callable:
-    """Returns the appropriate scaling function to use by sensor type.
+    """Returns the appropriate unmixing function to use by sensor type.
 
     Args:
         sensor: string with the sensor name to return (e.g. "Landsat8", "Sentinel2").
 
     Returns:
-        the scale function associated with a sensor to pass to an ee .map() call
+        the unmixing function associated with a sensor to pass to an ee .map() call.
+            see forSensor().
     """
-    lookup = {
-        "ASTER": ASTER,
-        "AVNIR2": AVNIR2,
-        "DoveR": DoveR,
-        "Landsat4": Landsat457,
-        "Landsat5": Landsat457,
-        "Landsat7": Landsat457,
-        "Landsat8": Landsat8,
-        "MODIS": MODIS,
-        "NEON": NEON,
-        "PlanetScope": PlanetScope,
-        "Sentinel2": Sentinel2,
-        "SuperDove": SuperDove,
-        "VIIRS": VIIRS,
-    }
-    try:
-        function = lookup[sensor]
-        return function
-    except KeyError:
-        supported = ", ".join(lookup.keys())
-        raise SensorError(
-            f"Scaling adjustment not supported for '{sensor}'. Supported: {supported}"
+    return get_operation("SoilPVNPV", sensor)
+
+
+def forSensor(
+    sensor: str,
+    bands: list = None,
+    n: int = N_ITERATIONS,
+    shade_normalize: bool = SHADE_NORMALIZE,
+    seed: int = SEED,
+) -> Callable:
+    """Builds an unmixing function with a sensor's bands and endmembers resolved.
+
+    The endmembers are selected and converted to ee.List objects once, then shared
+        by every image the function is mapped over. Use `bySensor()` or
+        earthlib.registry.get_operation("SoilPVNPV", sensor) to reuse the function built
+        for each sensor and set of parameters.
+
+    Args:
+        sensor: the name of the sensor (from earthlib.listSensors()).
+        bands: a list of bands to select. defaults to earthlib.getBands(sensor).
+        n: the number of iterations for unmixing.
+        shade_normalize: apply shade normalization during unmixing.
+        seed: seed for reproducible endmember selection.
+
+    Returns:
+        a function that unmixes an ee.Image to a 3-band image with bands
+            (%soil, %pv, %npv), to pass to an ee .map() call.
+            `bands`, `n`, `shade_normalize` and `seed` may be overridden per call.
+    """
+    bands = list(bands or get_bands(sensor))
+    n_bands = len(bands)
+    endmembers = getEndmembers(sensor, bands, n, seed)
+
+    def unmix(img: ee.Image, **params) -> ee.Image:
+        # keyword arguments, as the per-sensor functions take, use the function
+        # built for those parameters
+        if params:
+            params = {
+                "bands": bands,
+                "n": n,
+                "shade_normalize": shade_normalize,
+                "seed": seed,
+                **params,
+            }
+            return get_operation("SoilPVNPV", sensor, **params)(img)
+
+        return fractionalCover(
+            img,
+            endmembers,
+            endmember_names=ENDMEMBER_NAMES,
+            shade_normalize=shade_normalize,
+            n_bands=n_bands,
         )
 
+    unmix.__doc__ = f"Unmix a {sensor} image with soil, pv, npv endmembers."
+    return unmix
 
-def getEndmembers(sensor: str, bands: list, n: int = N_ITERATIONS) -> Tuple[list]:
+
+@profiled()
+def getEndmembers(
+    sensor: str, bands: list, n: int = N_ITERATIONS, seed: int = SEED
+) -> Tuple[list]:
     """Get a series of ee.List objects with the SoilPVNPV endmembers.
 
     Args:
         sensor: the name of the sensor (from earthlib.listSensors()).
         bands: a list of bands to select (from earthlib.getBands(sensor)).
         n: the number of iterations for unmixing.
+        seed: seed for reproducible endmember selection. endmembers selected
+            with a seed are drawn and resampled once, then reused.
 
     Returns:
         (soil, pv, npv) endmembers
     """
-    soil_list = selectSpectra("bare", sensor, n, bands)
-    pv_list = selectSpectra("vegetation", sensor, n, bands)
-    npv_list = selectSpectra("npv", sensor, n, bands)
+    soil_list, pv_list, npv_list = selectBundles(
+        ("bare", "vegetation", "npv"), sensor, n, bands, seed
+    )
     soil = [ee.List(soil_spectra.tolist()) for soil_spectra in soil_list]
     pv = [ee.List(pv_spectra.tolist()) for pv_spectra in pv_list]
     npv = [ee.List(npv_spectra.tolist()) for npv_spectra in npv_list]
@@ -70,7 +111,7 @@ def getEndmembers(sensor: str, bands: list, n: int = N_ITERATIONS) -> Tuple[list
 
 def ASTER(
     img: ee.Image,
-    bands: list = getBands("ASTER"),
+    bands: list = get_bands("ASTER"),
     n: int = N_ITERATIONS,
     shade_normalize: bool = SHADE_NORMALIZE,
 ) -> ee.Image:
@@ -102,7 +143,7 @@ def ASTER(
 
 def AVNIR2(
     img: ee.Image,
-    bands: list = getBands("AVNIR2"),
+    bands: list = get_bands("AVNIR2"),
     n: int = N_ITERATIONS,
     shade_normalize: bool = SHADE_NORMALIZE,
 ) -> ee.Image:
@@ -134,7 +175,7 @@ def AVNIR2(
 
 def DoveR(
     img: ee.Image,
-    bands: list = getBands("DoveR"),
+    bands: list = get_bands("DoveR"),
     n: int = N_ITERATIONS,
     shade_normalize: bool = SHADE_NORMALIZE,
 ) -> ee.Image:
@@ -166,7 +207,7 @@ def DoveR(
 
 def Landsat457(
     img: ee.Image,
-    bands: list = getBands("Landsat7"),
+    bands: list = get_bands("Landsat7"),
     n: int = N_ITERATIONS,
     shade_normalize: bool = SHADE_NORMALIZE,
 ) -> ee.Image:
@@ -198,7 +239,7 @@ def Landsat457(
 
 def Landsat8(
     img: ee.Image,
-    bands: list = getBands("Landsat8"),
+    bands: list = get_bands("Landsat8"),
     n: int = N_ITERATIONS,
     shade_normalize: bool = SHADE_NORMALIZE,
 ) -> ee.Image:
@@ -230,7 +271,7 @@ def Landsat8(
 
 def MODIS(
     img: ee.Image,
-    bands: list = getBands("MODIS"),
+    bands: list = get_bands("MODIS"),
     n: int = N_ITERATIONS,
     shade_normalize: bool = SHADE_NORMALIZE,
 ) -> ee.Image:
@@ -262,7 +303,7 @@ def MODIS(
 
 def NEON(
     img: ee.Image,
-    bands: list = getBands("NEON"),
+    bands: list = get_bands("NEON"),
     n: int = N_ITERATIONS,
     shade_normalize: bool = SHADE_NORMALIZE,
 ) -> ee.Image:
@@ -294,7 +335,7 @@ def NEON(
 
 def PlanetScope(
     img: ee.Image,
-    bands: list = getBands("PlanetScope"),
+    bands: list = get_bands("PlanetScope"),
     n: int = N_ITERATIONS,
     shade_normalize: bool = SHADE_NORMALIZE,
 ) -> ee.Image:
@@ -326,7 +367,7 @@ def PlanetScope(
 
 def Sentinel2(
     img: ee.Image,
-    bands: list = getBands("Sentinel2"),
+    bands: list = get_bands("Sentinel2"),
     n: int = N_ITERATIONS,
     shade_normalize: bool = SHADE_NORMALIZE,
 ) -> ee.Image:
@@ -358,7 +399,7 @@ def Sentinel2(
 
 def SuperDove(
     img: ee.Image,
-    bands: list = getBands("SuperDove"),
+    bands: list = get_bands("SuperDove"),
     n: int = N_ITERATIONS,
     shade_normalize: bool = SHADE_NORMALIZE,
 ) -> ee.Image:
@@ -390,7 +431,7 @@ def SuperDove(
 
 def VIIRS(
     img: ee.Image,
-    bands: list = getBands("VIIRS"),
+    bands: list = get_bands("VIIRS"),
     n: int = N_ITERATIONS,
     shade_normalize: bool = SHADE_NORMALIZE,
 ) -> ee.Image:
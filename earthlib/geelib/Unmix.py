@@ -1,16 +1,22 @@
 """Routines for performing spectral unmixing on earth engine images."""
 
+from warnings import warn
+
 import ee
 
 from earthlib.geelib.config import RMSE, WEIGHT
+from earthlib.profiling import profiled
+from earthlib.sensors import supported_sensors, validate_sensor
 
 
+@profiled()
 def fractionalCover(
     img: ee.Image,
     endmembers: list,
     endmember_names: list,
     n_bands: int = None,
     shade_normalize: bool = True,
+    sensor: str = None,
 ) -> ee.Image:
     """Computes the percent cover of each endmember spectra.
 
@@ -18,14 +24,18 @@ def fractionalCover(
         img: the ee.Image to unmix.
         endmembers: lists of ee.List objects, each element corresponding to a subType.
         endmember_names: list of names for each endmember. must match the number of lists passed.
-        n_bands: number of reflectance bands used for unmixing.
+        n_bands: number of reflectance bands used for unmixing. defaults to the
+            length of the endmember spectra, if they were built from client-side
+            lists, or else to the sensor's band count. see getBandCount().
         shade_normalize: flag to apply shade normalization during unmixing.
+        sensor: the name of the sensor (from earthlib.list_sensors()). used to set
+            `n_bands` without querying the image if the endmembers can't.
 
     Returns:
         unmixed: a 3-band image file in order of (soil-veg-impervious).
     """
     if n_bands is None:
-        n_bands = len(list(img.bandNames().getInfo()))
+        n_bands = getBandCount(sensor, endmembers)
     n_classes = len(endmembers)
     band_numbers = list(range(n_classes))
     shade = ee.List([0] * n_bands)
@@ -55,27 +65,59 @@ def fractionalCover(
             unmixed_iter.select(band_numbers, endmember_names).addBands(rmse)
         )
 
-    # use the sum of rmse to weight each estimate
-    rmse_sum = ee.Image(
-        ee.ImageCollection.fromImages(unmixed).select([RMSE]).sum().select([0], ["SUM"])
-    )
-    unscaled = [computeWeight(fractions, rmse_sum) for fractions in unmixed]
-
-    # use these weights to scale each unmixing estimate
-    weight_sum = ee.Image(
-        ee.ImageCollection.fromImages(unscaled).select([WEIGHT]).sum()
-    )
-    scaled = [
-        weightedAverage(fractions, weight_sum, endmember_names)
-        for fractions in unscaled
-    ]
-
     # reduce it to a single image and return
-    unmixed = ee.ImageCollection.fromImages(scaled).sum().toFloat()
+    unmixed = combineEstimates(unmixed, endmember_names).toFloat()
 
     return unmixed
 
 
+def getBandCount(sensor: str = None, endmembers: list = None) -> int:
+    """Returns the number of bands to unmix from client-side information.
+
+    Avoids a blocking getInfo() call, which also fails inside .map() calls. The
+        endmember spectra are used first, since they set the bands .unmix() reads,
+        then the sensor's band count.
+
+    Args:
+        sensor: the name of the sensor (from earthlib.list_sensors()).
+        endmembers: lists of spectra, each element corresponding to a subType.
+            spectra may be ee.List objects built from python lists, or sequences.
+
+    Returns:
+        the number of bands for the endmembers or sensor.
+    """
+    if endmembers:
+        n_bands = spectraLength(endmembers[0][0])
+        if n_bands is not None:
+            return n_bands
+
+    if sensor is None:
+        raise ValueError(
+            "Set `n_bands` or `sensor`, or pass client-side endmember spectra, "
+            + "to unmix an image."
+        )
+
+    validate_sensor(sensor)
+    return supported_sensors[sensor].band_count
+
+
+def spectraLength(spectra) -> int:
+    """Returns the length of a spectrum if it is known without querying ee.
+
+    Args:
+        spectra: an ee.List, or a list, tuple or array of reflectance values.
+
+    Returns:
+        the number of values, or None for server-side lists.
+    """
+    # ee.List keeps the python list it was constructed from
+    values = getattr(spectra, "_list", spectra)
+    try:
+        return len(values)
+    except TypeError:
+        return None
+
+
 def computeModeledSpectra(
     endmembers: list, fractions: ee.Image, n_bands: int
 ) -> ee.Image:
@@ -89,30 +131,16 @@ def computeModeledSpectra(
     Returns:
         an ee.Image with n_bands equal to the number of endmember bands.
     """
-    # compute the number of endmember bands
-    band_range = list(range(n_bands))
-    band_names = [f"M{band:02d}" for band in band_range]
+    band_names = [f"M{band:02d}" for band in range(n_bands)]
 
-    # create a list to store each reflectance fraction
-    refl_fraction_images = list()
-
-    # loop through each endmember and mulitply the fraction estimated by the reflectance value
-    for i, endmember in enumerate(endmembers):
-        fraction = fractions.select([i])
-        refl_fraction_list = [
-            fraction.multiply(ee.Number(endmember.get(band))) for band in band_range
-        ]
-        refl_fraction_images.append(
-            ee.ImageCollection.fromImages(refl_fraction_list)
-            .toBands()
-            .select(band_range, band_names)
-        )
-
-    # convert these images to an image collection and sum them together to reconstruct the spectrum
+    # multiply the (n_bands, n_endmembers) spectra by each pixel's fraction vector
+    spectra = ee.Array(list(endmembers)).slice(1, 0, n_bands).transpose()
+    fraction_vector = fractions.toArray().toArray(1)
     modeled_reflectance = (
-        ee.ImageCollection.fromImages(refl_fraction_images)
-        .sum()
-        .select(band_range, band_names)
+        ee.Image(spectra)
+        .matrixMultiply(fraction_vector)
+        .arrayProject([0])
+        .arrayFlatten([band_names])
     )
 
     return modeled_reflectance
@@ -148,9 +176,48 @@ def computeSpectralRMSE(
     return rmse
 
 
+def combineEstimates(estimates: list, endmember_names: list) -> ee.Image:
+    """Reduces unmixing estimates to their RMSE-weighted average in a single pass.
+
+    Stacks each estimate's fractions with its rmse-scaled fractions so one
+        ImageCollection sum yields all the terms of the weighted average.
+
+    Args:
+        estimates: ee.Image objects with `endmember_names` bands and an 'RMSE' band.
+        endmember_names: list of names for each endmember.
+
+    Returns:
+        the weighted average fractional cover image.
+    """
+    band_range = list(range(len(endmember_names)))
+    weighted_names = [f"{name}_{WEIGHT}" for name in endmember_names]
+
+    stacked = list()
+    for estimate in estimates:
+        rmse = estimate.select([RMSE])
+        weighted = (
+            estimate.select(endmember_names)
+            .multiply(rmse)
+            .select(band_range, weighted_names)
+        )
+        stacked.append(estimate.addBands(weighted))
+
+    summed = ee.ImageCollection.fromImages(stacked).sum()
+    combined = _weightedAverage(
+        summed.select(endmember_names),
+        summed.select(weighted_names),
+        summed.select([RMSE]),
+        len(estimates),
+    )
+
+    return combined
+
+
 def computeWeight(fractions: ee.Image, rmse_sum: ee.Image) -> ee.Image:
     """Computes the relative weight for an image's RMSE based on the sum of the global RMSE.
 
+    Deprecated: fractionalCover() weights the estimates with combineEstimates().
+
     Args:
         fractions: a multi-band ee.Image object with an 'RMSE' band.
         rmse_sum: a single-band ee.Image object with the global RMSE value.
@@ -158,6 +225,11 @@ def computeWeight(fractions: ee.Image, rmse_sum: ee.Image) -> ee.Image:
     Returns:
         the input `fractions` image with a 'weight' band added.
     """
+    warn(
+        "computeWeight() is deprecated, use combineEstimates() instead",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     rmse = fractions.select([RMSE])
     ratio = rmse.divide(rmse_sum).select([0], ["ratio"])
     weight = ee.Image(1).subtract(ratio).select([0], [WEIGHT])
@@ -171,6 +243,8 @@ def weightedAverage(
 ) -> ee.Image:
     """Computes an RMSE-weighted fractional cover image.
 
+    Deprecated: fractionalCover() weights the estimates with combineEstimates().
+
     Args:
         fractions: a multi-band ee.Image object with a 'weight' band.
         weight_sum: a single-band ee.Image object with the global weight sum.
@@ -179,6 +253,11 @@ def weightedAverage(
     Returns:
         a scaled fractional cover image.
     """
+    warn(
+        "weightedAverage() is deprecated, use combineEstimates() instead",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     # harmonize band info
     band_range = list(range(len(band_names)))
 
@@ -186,3 +265,30 @@ def weightedAverage(
     weighted = fractions.select(band_range, band_names).multiply(scaler)
 
     return weighted
+
+
+def _weightedAverage(
+    fraction_sum: ee.Image,
+    weighted_sum: ee.Image,
+    rmse_sum: ee.Image,
+    n_estimates: int,
+) -> ee.Image:
+    """Computes an RMSE-weighted fractional cover image from summed estimates.
+
+    Each estimate is weighted by w = 1 - rmse / sum(rmse). Expanding sum(w * f) / sum(w)
+        gives an expression of three sums, computed from one collection reduction.
+
+    Args:
+        fraction_sum: a multi-band ee.Image with the sum of the fractions.
+        weighted_sum: a multi-band ee.Image with the sum of fractions * rmse.
+        rmse_sum: a single-band ee.Image with the sum of the rmse values.
+        n_estimates: the number of estimates summed.
+
+    Returns:
+        a scaled fractional cover image.
+    """
+    scaled = weighted_sum.divide(rmse_sum)
+    weight_sum = ee.Image(n_estimates).subtract(rmse_sum.divide(rmse_sum))
+    weighted = fraction_sum.subtract(scaled).divide(weight_sum)
+
+    return weighted
@@ -35,8 +35,13 @@ BRDF_COEFFICIENTS_S2 = {
     "B12": {"fiso": 0.2658, "fgeo": 0.0387, "fvol": 0.0639},
 }
 
+# file name for footprint corners cached per WRS-2 path/row and MGRS tile.
+# read from the package data directory and from the earthlib cache directory
+CORNER_TABLE = "corners.json"
+
 # spectral mixture analysis defaults
 N_ITERATIONS = 30
 SHADE_NORMALIZE = True
+SEED = 0
 RMSE = "RMSE"
 WEIGHT = "WEIGHT"
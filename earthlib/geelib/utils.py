@@ -2,7 +2,7 @@
 
 import ee
 
-from earthlib.utils import getCollectionName
+from earthlib.sensors import get_collection_name
 
 
 def getCollection(sensor: str) -> ee.ImageCollection:
@@ -14,4 +14,4 @@ def getCollection(sensor: str) -> ee.ImageCollection:
     Returns:
         that sensor's ee image collection.
     """
-    return ee.ImageCollection(getCollectionName(sensor))
+    return ee.ImageCollection(get_collection_name(sensor))
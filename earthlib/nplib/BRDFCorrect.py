@@ -0,0 +1,515 @@
+"""Routines to BRDF-correct local reflectance arrays prior to unmixing.
+
+These mirror earthlib.geelib.BRDFCorrect for (rows, cols, bands) arrays. Scene-level
+    terms are computed once per scene, the sun and view geometry once per grid
+    point, and the Ross-Thick/Li-Sparse kernels are shared across bands.
+"""
+
+import math
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+
+from earthlib.errors import SensorError
+from earthlib.geelib.config import (
+    BRDF_COEFFICIENTS_L8,
+    BRDF_COEFFICIENTS_L457,
+    BRDF_COEFFICIENTS_S2,
+)
+from earthlib.nplib.config import GEOMETRY_STEP
+from earthlib.nplib.SolarPosition import solarPosition, solarTerms
+from earthlib.nplib.utils import gridIndex, upsample
+from earthlib.profiling import profiled
+
+# sensor view geometry limits, as in earthlib.geelib.BRDFCorrect.viewAngles
+MAX_SATELLITE_ZENITH = 7.5
+
+# c-factor kernel weights by sensor
+BRDF_COEFFICIENTS = {
+    "Landsat4": BRDF_COEFFICIENTS_L457,
+    "Landsat5": BRDF_COEFFICIENTS_L457,
+    "Landsat7": BRDF_COEFFICIENTS_L457,
+    "Landsat8": BRDF_COEFFICIENTS_L8,
+    "Sentinel2": BRDF_COEFFICIENTS_S2,
+}
+
+
+def bySensor(sensor: str) -> Callable:
+    """Get the appropriate BRDF correction function by sensor type.
+
+    Args:
+        sensor: sensor name to return (e.g. "Landsat8", "Sentinel2").
+
+    Returns:
+        the BRDF correction function associated with a sensor.
+    """
+    lookup = {
+        "Landsat4": Landsat457,
+        "Landsat5": Landsat457,
+        "Landsat7": Landsat457,
+        "Landsat8": Landsat8,
+        "Sentinel2": Sentinel2,
+    }
+    getCoefficients(sensor)
+    return lookup[sensor]
+
+
+def getCoefficients(sensor: str) -> dict:
+    """Look-up the BRDF kernel weights for a sensor.
+
+    Args:
+        sensor: sensor name (e.g. "Landsat8", "Sentinel2").
+
+    Returns:
+        {band name: {"fiso", "fgeo", "fvol"}} kernel weights.
+    """
+    try:
+        return BRDF_COEFFICIENTS[sensor]
+    except KeyError:
+        supported = ", ".join(BRDF_COEFFICIENTS.keys())
+        raise SensorError(
+            f"BRDF adjustment not supported for '{sensor}'. Supported: {supported}"
+        )
+
+
+def Landsat457(
+    img: np.ndarray,
+    band_names: list,
+    time: datetime | float,
+    corners: dict,
+    scaleFactor: float = 1,
+    valid: np.ndarray = None,
+    step: int = GEOMETRY_STEP,
+) -> np.ndarray:
+    """Apply BRDF adjustments to a Landsat ETM+ array.
+
+    Args:
+        img: Landsat 4/5/7 (rows, cols, bands) surface reflectance array.
+        band_names: the band name of each band in `img` (e.g. "SR_B1").
+        time: the acquisition time. see brdfCorrect().
+        corners: the (lon, lat) coordinates of the array corners. see brdfCorrect().
+        scaleFactor: a scaling factor to tune the volumetric scattering adjustment.
+        valid: a (rows, cols) mask of pixels inside the scene footprint.
+        step: the pixel spacing of the grid to compute the sun/view geometry on.
+
+    Returns:
+        a BRDF-corrected array.
+    """
+    return brdfCorrect(
+        img,
+        band_names,
+        BRDF_COEFFICIENTS["Landsat7"],
+        time,
+        corners,
+        scaleFactor,
+        valid,
+        step,
+    )
+
+
+def Landsat8(
+    img: np.ndarray,
+    band_names: list,
+    time: datetime | float,
+    corners: dict,
+    scaleFactor: float = 1,
+    valid: np.ndarray = None,
+    step: int = GEOMETRY_STEP,
+) -> np.ndarray:
+    """Apply BRDF adjustments to a Landsat8 array.
+
+    Args:
+        img: Landsat8 (rows, cols, bands) surface reflectance array.
+        band_names: the band name of each band in `img` (e.g. "SR_B2").
+        time: the acquisition time. see brdfCorrect().
+        corners: the (lon, lat) coordinates of the array corners. see brdfCorrect().
+        scaleFactor: a scaling factor to tune the volumetric scattering adjustment.
+        valid: a (rows, cols) mask of pixels inside the scene footprint.
+        step: the pixel spacing of the grid to compute the sun/view geometry on.
+
+    Returns:
+        a BRDF-corrected array.
+    """
+    return brdfCorrect(
+        img,
+        band_names,
+        BRDF_COEFFICIENTS["Landsat8"],
+        time,
+        corners,
+        scaleFactor,
+        valid,
+        step,
+    )
+
+
+def Sentinel2(
+    img: np.ndarray,
+    band_names: list,
+    time: datetime | float,
+    corners: dict,
+    scaleFactor: float = 1,
+    valid: np.ndarray = None,
+    step: int = GEOMETRY_STEP,
+) -> np.ndarray:
+    """Apply BRDF adjustments to a Sentinel2 array.
+
+    Args:
+        img: Sentinel-2 (rows, cols, bands) surface reflectance array.
+        band_names: the band name of each band in `img` (e.g. "B2").
+        time: the acquisition time. see brdfCorrect().
+        corners: the (lon, lat) coordinates of the array corners. see brdfCorrect().
+        scaleFactor: a scaling factor to tune the volumetric scattering adjustment.
+        valid: a (rows, cols) mask of pixels inside the scene footprint.
+        step: the pixel spacing of the grid to compute the sun/view geometry on.
+
+    Returns:
+        a BRDF-corrected array.
+    """
+    return brdfCorrect(
+        img,
+        band_names,
+        BRDF_COEFFICIENTS["Sentinel2"],
+        time,
+        corners,
+        scaleFactor,
+        valid,
+        step,
+    )
+
+
+@profiled()
+def brdfCorrect(
+    img: np.ndarray,
+    band_names: list,
+    coefficientsByBand: dict,
+    time: datetime | float,
+    corners: dict,
+    scaleFactor: float = 1,
+    valid: np.ndarray = None,
+    step: int = GEOMETRY_STEP,
+) -> np.ndarray:
+    """Apply c-factor BRDF adjustments to the bands with coefficients.
+
+    Reflectance is normalized to nadir view and the solar zenith angle modeled at
+        the scene center latitude, as described in the HLS user guide. The sun and
+        view geometry vary smoothly across a scene, so the c-factors are computed
+        on a grid sampled every `step` pixels and bilinearly interpolated.
+
+    Args:
+        img: a (rows, cols, bands) surface reflectance array.
+        band_names: the band name of each band in `img`.
+        coefficientsByBand: {band name: {"fiso", "fgeo", "fvol"}} kernel weights.
+            bands without coefficients are returned unchanged.
+        time: the acquisition time, as a datetime (naive times are read as UTC)
+            or as milliseconds since the unix epoch, like "system:time_start".
+        corners: {"upperLeft", "upperRight", "lowerRight", "lowerLeft"} dictionary
+            with the (lon, lat) coordinates of the corner pixels of `img`.
+        scaleFactor: a scaling factor to tune the volumetric scattering adjustment.
+        valid: a (rows, cols) mask of pixels inside the scene footprint, used to
+            find the edges of the sensor swath. defaults to pixels with a
+            non-zero, finite value in the first band.
+        step: the pixel spacing of the grid to compute the sun/view geometry on.
+            set to 1 to compute it for every pixel.
+
+    Returns:
+        a BRDF-corrected array with the dtype of `img`.
+    """
+    rows, cols = img.shape[:2]
+    if valid is None:
+        first = img[:, :, 0]
+        valid = (first != 0) & np.isfinite(first)
+
+    cFactors, rowIdx, colIdx, bands = cFactorGrid(
+        (rows, cols),
+        band_names,
+        coefficientsByBand,
+        time,
+        corners,
+        valid,
+        scaleFactor,
+        step,
+    )
+
+    # scale the bands with coefficients by the interpolated c-factors
+    cFactors = upsample(cFactors, rowIdx, colIdx, (rows, cols))
+    if len(bands) == img.shape[-1]:
+        cFactors *= img
+        return cFactors.astype(img.dtype, copy=False)
+
+    corrected = img.copy()
+    corrected[:, :, bands] = img[:, :, bands] * cFactors
+    return corrected
+
+
+def cFactorGrid(
+    shape: tuple,
+    band_names: list,
+    coefficientsByBand: dict,
+    time: datetime | float,
+    corners: dict,
+    valid: np.ndarray,
+    scaleFactor: float = 1,
+    step: int = GEOMETRY_STEP,
+) -> tuple:
+    """Computes the BRDF c-factors for a scene on a grid sampled every `step` pixels.
+
+    Interpolate the grid to a block of pixels with upsampleWindow() to correct a
+        scene one tile at a time.
+
+    Args:
+        shape: the (rows, cols) shape of the scene.
+        band_names: the band name of each band in the scene.
+        coefficientsByBand: {band name: {"fiso", "fgeo", "fvol"}} kernel weights.
+        time: the acquisition time. see brdfCorrect().
+        corners: the (lon, lat) coordinates of the array corners. see brdfCorrect().
+        valid: a (rows, cols) mask of pixels inside the scene footprint.
+        scaleFactor: a scaling factor to tune the volumetric scattering adjustment.
+        step: the pixel spacing of the grid.
+
+    Returns:
+        (cFactors, rowIdx, colIdx, bands) tuple, with a (len(rowIdx), len(colIdx),
+            len(bands)) float32 c-factor grid, the grid's pixel positions, and the
+            indices of the bands with coefficients.
+    """
+    rows, cols = shape[:2]
+    rowIdx = gridIndex(rows, step)
+    colIdx = gridIndex(cols, step)
+
+    lon, lat = cornerGrid(corners, (rows, cols), rowIdx, colIdx)
+    sunZen, sunAz = solarPosition(lon, lat, time)
+    footprint = findCorners(valid)
+    viewZen, viewAz = viewAngles(footprint, rowIdx, colIdx)
+
+    # the kernels are shared across bands
+    relativeSunViewAz = sunAz - viewAz
+    kvol = scaleFactor * rossThick(sunZen, viewZen, relativeSunViewAz)
+    kgeo = liThin(sunZen, viewZen, relativeSunViewAz)
+
+    # normalize to nadir view at the scene center solar zenith
+    zenith = sunZenOut(float(np.mean(lat)))
+    kvol0 = scaleFactor * rossThick(zenith, 0.0, 0.0)
+    kgeo0 = liThin(zenith, 0.0, 0.0)
+
+    bands = [idx for idx, name in enumerate(band_names) if name in coefficientsByBand]
+    cFactors = np.empty((len(rowIdx), len(colIdx), len(bands)), dtype=np.float32)
+    for cIdx, bandIdx in enumerate(bands):
+        c = coefficientsByBand[band_names[bandIdx]]
+        brdf0 = c["fiso"] + c["fvol"] * kvol0 + c["fgeo"] * kgeo0
+        brdf = c["fiso"] + c["fvol"] * kvol + c["fgeo"] * kgeo
+        cFactors[:, :, cIdx] = brdf0 / brdf
+
+    return cFactors, rowIdx, colIdx, bands
+
+
+def cornerGrid(
+    corners: dict, shape: tuple, rowIdx: np.ndarray = None, colIdx: np.ndarray = None
+) -> tuple:
+    """Bilinearly interpolates pixel coordinates from the array corners.
+
+    Args:
+        corners: {"upperLeft", "upperRight", "lowerRight", "lowerLeft"} dictionary
+            with the (lon, lat) coordinates of the corner pixels.
+        shape: the (rows, cols) shape of the array.
+        rowIdx: the row positions to compute coordinates for. defaults to all rows.
+        colIdx: the column positions to compute coordinates for. defaults to all.
+
+    Returns:
+        (lon, lat) tuple of float32 (len(rowIdx), len(colIdx)) arrays in degrees.
+    """
+    rows, cols = shape[:2]
+    rowIdx = np.arange(rows) if rowIdx is None else rowIdx
+    colIdx = np.arange(cols) if colIdx is None else colIdx
+    v = (rowIdx / max(rows - 1, 1)).astype(np.float32)[:, np.newaxis]
+    u = (colIdx / max(cols - 1, 1)).astype(np.float32)[np.newaxis, :]
+
+    grids = list()
+    for axis in range(2):
+        ul = corners["upperLeft"][axis]
+        ur = corners["upperRight"][axis]
+        ll = corners["lowerLeft"][axis]
+        lr = corners["lowerRight"][axis]
+        upper = ul + (ur - ul) * u
+        lower = ll + (lr - ll) * u
+        grids.append((upper + (lower - upper) * v).astype(np.float32))
+
+    return tuple(grids)
+
+
+def sunZenOut(centerLat: float) -> float:
+    """Compute the normalized solar zenith angle for a scene center latitude.
+
+    From https://hls.gsfc.nasa.gov/wp-content/uploads/2016/08/HLS.v1.0.UserGuide.pdf
+
+    Args:
+        centerLat: the scene center latitude in degrees.
+
+    Returns:
+        the solar zenith angle in radians.
+    """
+    degrees = (
+        31.0076
+        - 0.1272 * centerLat
+        + 0.01187 * centerLat**2
+        + 2.40e-05 * centerLat**3
+        - 9.48e-07 * centerLat**4
+        - 1.95e-09 * centerLat**5
+        + 6.15e-11 * centerLat**6
+    )
+    return math.radians(degrees)
+
+
+def findCorners(valid: np.ndarray) -> dict:
+    """Finds the corners of the valid data footprint in an array.
+
+    Corners are the footprint's north-, east-, south- and west-most pixels, as in
+        earthlib.geelib.BRDFCorrect.findCorners.
+
+    Args:
+        valid: a (rows, cols) mask of pixels inside the scene footprint.
+
+    Returns:
+        {"upperLeft", "upperRight", "lowerRight", "lowerLeft"} dictionary with
+            (x, y) pixel coordinates, with x increasing east and y north.
+    """
+    validRows = np.flatnonzero(valid.any(axis=1))
+    validCols = np.flatnonzero(valid.any(axis=0))
+    if len(validRows) == 0:
+        raise ValueError("No valid pixels to find the scene footprint from.")
+
+    def rowPoint(row: int) -> tuple:
+        return float(np.argmax(valid[row])), -float(row)
+
+    def colPoint(col: int) -> tuple:
+        return float(col), -float(np.argmax(valid[:, col]))
+
+    return {
+        "upperLeft": rowPoint(validRows[0]),
+        "upperRight": colPoint(validCols[-1]),
+        "lowerRight": rowPoint(validRows[-1]),
+        "lowerLeft": colPoint(validCols[0]),
+    }
+
+
+def viewAngles(corners: dict, rowIdx: np.ndarray, colIdx: np.ndarray) -> tuple:
+    """Compute sensor view angles from the footprint corners.
+
+    The view zenith varies linearly across the swath, from -7.5 degrees at the
+        left edge to 7.5 degrees at the right edge.
+
+    Args:
+        corners: footprint corners in pixel coordinates. get from findCorners().
+        rowIdx: the row positions to compute view angles for.
+        colIdx: the column positions to compute view angles for.
+
+    Returns:
+        (viewZen, viewAz) tuple with a float32 (len(rowIdx), len(colIdx)) array
+            of view zenith angles and the scene view azimuth, both in radians.
+    """
+    upperCenter = np.mean([corners["upperLeft"], corners["upperRight"]], axis=0)
+    lowerCenter = np.mean([corners["lowerLeft"], corners["lowerRight"]], axis=0)
+    dx, dy = lowerCenter - upperCenter
+    viewAz = math.pi / 2 - math.atan(-dx / dy) if dy else math.pi
+
+    x = colIdx.astype(np.float32)[np.newaxis, :]
+    y = -rowIdx.astype(np.float32)[:, np.newaxis]
+    leftDistance = segmentDistance(x, y, corners["upperLeft"], corners["lowerLeft"])
+    rightDistance = segmentDistance(x, y, corners["upperRight"], corners["lowerRight"])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        viewZen = (
+            rightDistance * (MAX_SATELLITE_ZENITH * 2) / (rightDistance + leftDistance)
+            - MAX_SATELLITE_ZENITH
+        )
+    viewZen = np.radians(np.nan_to_num(viewZen), dtype=np.float32)
+
+    return viewZen, viewAz
+
+
+def segmentDistance(x: np.ndarray, y: np.ndarray, a: tuple, b: tuple) -> np.ndarray:
+    """Computes the distance from each (x, y) point to the segment from a to b."""
+    ax, ay = a
+    bx, by = b
+    dx, dy = bx - ax, by - ay
+    length = dx * dx + dy * dy
+    if length == 0:
+        return np.hypot(x - ax, y - ay)
+
+    t = np.clip(((x - ax) * dx + (y - ay) * dy) / np.float32(length), 0, 1)
+    return np.hypot(x - (ax + t * dx), y - (ay + t * dy))
+
+
+def rossThick(
+    sunZen: np.ndarray, viewZen: np.ndarray, relativeSunViewAz: np.ndarray
+) -> np.ndarray:
+    """Ross-Thick volumetric scattering kernel.
+
+    From https://modis.gsfc.nasa.gov/data/atbd/atbd_mod09.pdf
+    """
+    cosSunZen = np.cos(sunZen)
+    cosViewZen = np.cos(viewZen)
+    cosPhase = cosPhaseAngle(
+        cosSunZen, cosViewZen, np.sin(sunZen), np.sin(viewZen), relativeSunViewAz
+    )
+    phase = np.arccos(cosPhase)
+    return ((np.pi / 2 - phase) * cosPhase + np.sin(phase)) / (
+        cosSunZen + cosViewZen
+    ) - np.pi / 4
+
+
+def liThin(
+    sunZen: np.ndarray,
+    viewZen: np.ndarray,
+    relativeSunViewAz: np.ndarray,
+    hb: float = 2,
+    br: float = 1,
+) -> np.ndarray:
+    """Li-Sparse geometric scattering kernel.
+
+    From https://modis.gsfc.nasa.gov/data/atbd/atbd_mod09.pdf
+    """
+    tanSunPrime = np.maximum(br * np.tan(sunZen), 0)
+    tanViewPrime = np.maximum(br * np.tan(viewZen), 0)
+
+    # sec and cos of the prime angles from their tangents, without arctan
+    secSunPrime = np.sqrt(1 + tanSunPrime * tanSunPrime)
+    secViewPrime = np.sqrt(1 + tanViewPrime * tanViewPrime)
+    cosPhasePrime = cosPhaseAngle(
+        1 / secSunPrime,
+        1 / secViewPrime,
+        tanSunPrime / secSunPrime,
+        tanViewPrime / secViewPrime,
+        relativeSunViewAz,
+    )
+
+    cosAz = np.cos(relativeSunViewAz)
+    sinAz = np.sin(relativeSunViewAz)
+    tanProduct = tanSunPrime * tanViewPrime
+    distanceSquared = np.maximum(
+        tanSunPrime * tanSunPrime
+        + tanViewPrime * tanViewPrime
+        - 2 * tanProduct * cosAz,
+        0,
+    )
+    temp = secSunPrime + secViewPrime
+    cosT = np.clip(
+        hb * np.sqrt(distanceSquared + (tanProduct * sinAz) ** 2) / temp, -1, 1
+    )
+    t = np.arccos(cosT)
+    overlap = np.maximum((t - np.sin(t) * cosT) * temp / np.pi, 0)
+
+    return overlap - temp + 0.5 * (1 + cosPhasePrime) * secSunPrime * secViewPrime
+
+
+def cosPhaseAngle(
+    cosSunZen: np.ndarray,
+    cosViewZen: np.ndarray,
+    sinSunZen: np.ndarray,
+    sinViewZen: np.ndarray,
+    relativeSunViewAz: np.ndarray,
+) -> np.ndarray:
+    """Phase angle estimates the relative deviation between sun/sensor geometry"""
+    cosPhase = cosSunZen * cosViewZen + sinSunZen * sinViewZen * np.cos(
+        relativeSunViewAz
+    )
+    return np.clip(cosPhase, -1, 1)
@@ -0,0 +1,113 @@
+"""Routines for brightness masking local arrays.
+
+These mirror earthlib.geelib.BrightMask for (rows, cols, bands) arrays, including
+    numpy memmaps, returning boolean masks that are True for valid pixels.
+"""
+
+from typing import Callable
+
+import numpy as np
+
+from earthlib.errors import SensorError
+from earthlib.nplib.config import TILE_SIZE
+from earthlib.nplib.utils import brightnessMask, reflectanceScale
+from earthlib.sensors import get_bands, supported_sensors
+
+
+def bySensor(sensor: str) -> Callable:
+    """Returns the appropriate brightness mask function to use by sensor type.
+
+    Args:
+        sensor: string with the sensor name to return (e.g. "Landsat8").
+
+    Returns:
+        the mask function associated with a sensor.
+    """
+    lookup = {
+        "Landsat4": Landsat457,
+        "Landsat5": Landsat457,
+        "Landsat7": Landsat457,
+        "Landsat8": Landsat8,
+    }
+    try:
+        function = lookup[sensor]
+        return function
+    except KeyError:
+        supported = ", ".join(lookup.keys())
+        raise SensorError(
+            f"Brightness masking not supported for '{sensor}'. Supported: {supported}"
+        )
+
+
+def brightMask(
+    img: np.ndarray,
+    bands: list,
+    threshold: float,
+    scale: float = 1.0,
+    offset: float = 0.0,
+    out: np.ndarray = None,
+    tile_size: int = TILE_SIZE,
+) -> np.ndarray:
+    """Use brightness normalization to identify and remove bright pixels.
+
+    Args:
+        img: a (rows, cols, bands) float32 reflectance or integer DN array.
+        bands: the indices of the bands to compute brightness from.
+        threshold: the brightness/reflectance value to exclude.
+            pixels above this value are flagged as bright.
+        scale: the scale factor converting `img` values to reflectance.
+        offset: the offset converting `img` values to reflectance.
+        out: a (rows, cols) boolean array to write the mask to.
+        tile_size: the height and width of the blocks to process at once.
+
+    Returns:
+        a (rows, cols) boolean mask, False for bright pixels.
+    """
+    return brightnessMask(
+        img,
+        bands,
+        upper=threshold,
+        scale=scale,
+        offset=offset,
+        out=out,
+        tile_size=tile_size,
+    )
+
+
+def Landsat457(img: np.ndarray, band_names: list, threshold: float = 0.4) -> np.ndarray:
+    """Apply brightness masking to a Landsat 4/5/7 array.
+
+    Args:
+        img: a (rows, cols, bands) float32 reflectance or integer DN array.
+        band_names: the band name of each band in `img`.
+        threshold: the brightness/reflectance value to exclude.
+            pixels above this value are flagged as bright.
+
+    Returns:
+        a (rows, cols) boolean mask, False for bright pixels.
+    """
+    return sensorMask(img, band_names, "Landsat7", threshold)
+
+
+def Landsat8(img: np.ndarray, band_names: list, threshold: float = 0.4) -> np.ndarray:
+    """Apply brightness masking to a Landsat 8 array.
+
+    Args:
+        img: a (rows, cols, bands) float32 reflectance or integer DN array.
+        band_names: the band name of each band in `img`.
+        threshold: the brightness/reflectance value to exclude.
+            pixels above this value are flagged as bright.
+
+    Returns:
+        a (rows, cols) boolean mask, False for bright pixels.
+    """
+    return sensorMask(img, band_names, "Landsat8", threshold)
+
+
+def sensorMask(
+    img: np.ndarray, band_names: list, sensor: str, threshold: float
+) -> np.ndarray:
+    """Applies brightMask() to a sensor's reflectance bands."""
+    bands = [band_names.index(band) for band in get_bands(sensor)]
+    scale, offset = reflectanceScale(img, supported_sensors[sensor])
+    return brightMask(img, bands, threshold, scale, offset)
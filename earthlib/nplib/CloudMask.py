@@ -0,0 +1,305 @@
+"""Routines to cloud-mask local arrays.
+
+These mirror earthlib.geelib.CloudMask for (rows, cols, bands) arrays, returning
+    boolean masks that are True for clear pixels instead of updating image masks.
+    QA flags that must all be unset are tested with a single combined bit mask,
+    and arbitrary combinations of QA field values with a precomputed lookup table.
+"""
+
+from functools import lru_cache
+from typing import Callable
+
+import numpy as np
+
+from earthlib.errors import SensorError
+from earthlib.nplib.utils import dilate, distanceTransform, erode
+from earthlib.profiling import profiled
+
+# sentinel-2 scene classification labels that are masked: saturated or defective,
+# cloud shadow, cloud probability low, medium and high, and cirrus
+SCL_MASKED_CLASSES = (1, 3, 7, 8, 9, 10)
+SCL_BARE_SOIL = 5
+
+
+def bitwiseSelect(qa: np.ndarray, fromBit: int, toBit: int = None) -> np.ndarray:
+    """Filter QA bit masks.
+
+    Args:
+        qa: the QA band array.
+        fromBit: QA start bit.
+        toBit: QA end bit.
+
+    Returns:
+        the encoded values of the passed QA bits.
+    """
+    toBit = fromBit if toBit is None else toBit
+    return (qa >> fromBit) & ((1 << (toBit - fromBit + 1)) - 1)
+
+
+def fieldMask(fields: list) -> int:
+    """Combines QA bit fields into a single bit mask.
+
+    Args:
+        fields: bit positions or (fromBit, toBit) ranges.
+
+    Returns:
+        an integer with every bit in `fields` set.
+    """
+    mask = 0
+    for field in fields:
+        fromBit, toBit = field if isinstance(field, tuple) else (field, field)
+        mask |= ((1 << (toBit - fromBit + 1)) - 1) << fromBit
+    return mask
+
+
+@profiled()
+def clearMask(qa: np.ndarray, fields: list) -> np.ndarray:
+    """Finds pixels with all of the passed QA fields unset.
+
+    Args:
+        qa: the QA band array.
+        fields: bit positions or (fromBit, toBit) ranges that must be zero.
+
+    Returns:
+        a boolean array, True where every field is zero.
+    """
+    return (qa & qa.dtype.type(fieldMask(fields))) == 0
+
+
+@lru_cache(maxsize=None)
+def qaLookup(conditions: tuple, bits: int = 16) -> np.ndarray:
+    """Builds a lookup table from QA values to masks for any combination of fields.
+
+    Args:
+        conditions: (fromBit, toBit, values) tuples. a QA value passes when each
+            field's value is one of the field's `values`.
+        bits: the bit depth of the QA band.
+
+    Returns:
+        a read-only boolean array with an entry for every QA value.
+    """
+    codes = np.arange(1 << bits, dtype=np.uint32)
+    lookup = np.ones(codes.shape, dtype=bool)
+    for fromBit, toBit, values in conditions:
+        lookup &= np.isin(bitwiseSelect(codes, fromBit, toBit), values)
+
+    lookup.flags.writeable = False
+    return lookup
+
+
+@profiled()
+def lookupMask(qa: np.ndarray, conditions: tuple) -> np.ndarray:
+    """Masks a QA band with a lookup table, with one gather per pixel.
+
+    Tables are only built for unsigned 8- and 16-bit QA bands. Other integer
+        types are masked field by field, without a table.
+
+    Args:
+        qa: an integer QA band array.
+        conditions: (fromBit, toBit, values) tuples. see qaLookup().
+
+    Returns:
+        a boolean array, True where the QA value meets every condition.
+    """
+    if qa.dtype in (np.uint8, np.uint16):
+        lookup = qaLookup(conditions, bits=qa.dtype.itemsize * 8)
+        return np.take(lookup, qa)
+
+    if not np.issubdtype(qa.dtype, np.integer):
+        raise TypeError(f"QA bands must have an integer dtype, not {qa.dtype}")
+
+    mask = np.ones(qa.shape, dtype=bool)
+    for fromBit, toBit, values in conditions:
+        mask &= np.isin(bitwiseSelect(qa, fromBit, toBit), values)
+    return mask
+
+
+def qaBand(img: np.ndarray, band_names: list, name: str) -> np.ndarray:
+    """Selects a QA band as unsigned integers, e.g. from a float array stack.
+
+    Args:
+        img: a (rows, cols, bands) array.
+        band_names: the band name of each band in `img`.
+        name: the QA band name.
+
+    Returns:
+        a (rows, cols) uint16 array. not copied if `img` is already uint16.
+    """
+    return img[:, :, band_names.index(name)].astype(np.uint16, copy=False)
+
+
+def bySensor(sensor: str) -> Callable:
+    """Returns the appropriate cloud mask function to use by sensor type.
+
+    Args:
+        sensor: string with the sensor name to return (e.g. "Landsat8", "Sentinel2").
+
+    Returns:
+        the mask function associated with a sensor.
+    """
+    lookup = {
+        "Landsat4": Landsat4578,
+        "Landsat5": Landsat4578,
+        "Landsat7": Landsat4578,
+        "Landsat8": Landsat4578,
+        "Sentinel2": Sentinel2,
+        "MODIS": MODIS,
+        "VIIRS": VIIRS,
+    }
+    try:
+        function = lookup[sensor]
+        return function
+    except KeyError:
+        supported = ", ".join(lookup.keys())
+        raise SensorError(
+            f"Cloud masking not supported for '{sensor}'. Supported: {supported}"
+        )
+
+
+def Landsat4578(img: np.ndarray, band_names: list) -> np.ndarray:
+    """Cloud-masks Landsat arrays.
+
+    Args:
+        img: a (rows, cols, bands) array with Landsat "QA_PIXEL" and "QA_RADSAT" bands.
+        band_names: the band name of each band in `img`.
+
+    Returns:
+        a (rows, cols) boolean mask, True for clear pixels.
+    """
+    qa = qaBand(img, band_names, "QA_PIXEL")
+    sat = qaBand(img, band_names, "QA_RADSAT")
+
+    # dilated cloud, cirrus, cloud, cloud shadow and snow
+    mask = clearMask(qa, [(1, 5)])
+    mask &= sat == 0
+    return mask
+
+
+def Sentinel2QA(img: np.ndarray, band_names: list) -> np.ndarray:
+    """Masks Sentinel2 arrays using the QA band.
+
+    Args:
+        img: a (rows, cols, bands) array with a Sentinel "QA60" band.
+        band_names: the band name of each band in `img`.
+
+    Returns:
+        a (rows, cols) boolean mask, True for clear pixels.
+    """
+    qa = qaBand(img, band_names, "QA60")
+
+    # opaque clouds and cirrus
+    return clearMask(qa, [10, 11])
+
+
+def Sentinel2SCL(
+    img: np.ndarray, band_names: list, pixelSize: float = 20
+) -> np.ndarray:
+    """Masks Sentinel2 arrays using scene classification labels.
+
+    Matches earthlib.geelib.CloudMask.Sentinel2SCL, with the focal operations and
+        distance to clouds computed from distance transforms, so the cost doesn't
+        grow with the kernel radius.
+
+    Args:
+        img: a (rows, cols, bands) array with a Sentinel "SCL" class band.
+        band_names: the band name of each band in `img`.
+        pixelSize: the pixel size of `img` in meters.
+
+    Returns:
+        a (rows, cols) boolean mask, True for clear pixels.
+    """
+    scl = img[:, :, band_names.index("SCL")].astype(np.uint8, copy=False)
+    baseMask = ~lookupMask(scl, ((0, 7, SCL_MASKED_CLASSES),))
+
+    # apply morphological closing to clean up one/two pixel cloud predictions
+    erodedMask = erode(dilate(baseMask, 2), 2)
+
+    # mask bare soil predictions near clouds. as in earth engine, distances beyond
+    # the 1000m search radius are unmasked to zero, so they're masked too
+    distToCloud = distanceTransform(~erodedMask) * pixelSize
+    nearCloud = (distToCloud <= 100) | (distToCloud > 1000)
+    bareSoil = scl == SCL_BARE_SOIL
+
+    return erodedMask & ~(bareSoil & nearCloud)
+
+
+def Sentinel2(
+    img: np.ndarray,
+    band_names: list,
+    use_qa: bool = True,
+    use_scl: bool = True,
+    pixelSize: float = 20,
+) -> np.ndarray:
+    """Mask Sentinel2 arrays using multiple masking approaches.
+
+    Args:
+        img: a (rows, cols, bands) array.
+        band_names: the band name of each band in `img`.
+        use_qa: apply QA band cloud masking. img must have a "QA60" band.
+        use_scl: apply SCL band cloud masking. img must have a "SCL" band.
+        pixelSize: the pixel size of `img` in meters, for SCL masking.
+
+    Returns:
+        a (rows, cols) boolean mask, True for clear pixels.
+    """
+    mask = np.ones(img.shape[:2], dtype=bool)
+    if use_qa:
+        mask &= Sentinel2QA(img, band_names)
+
+    if use_scl:
+        mask &= Sentinel2SCL(img, band_names, pixelSize)
+
+    return mask
+
+
+def MODIS(img: np.ndarray, band_names: list) -> np.ndarray:
+    """Dummy function for MODIS arrays.
+
+    MODIS surface reflectance products are already cloud-masked, so every pixel
+        is clear. It only exists so as to not break other processing chains that
+        use .bySensor() methods.
+
+    Args:
+        img: a (rows, cols, bands) array.
+        band_names: the band name of each band in `img`.
+
+    Returns:
+        a (rows, cols) boolean mask of all True values.
+    """
+    return np.ones(img.shape[:2], dtype=bool)
+
+
+def VIIRS(img: np.ndarray, band_names: list) -> np.ndarray:
+    """Masks VIIRS arrays.
+
+    Args:
+        img: a (rows, cols, bands) array with "QF1", "QF2" and "QF7" bands.
+        band_names: the band name of each band in `img`.
+
+    Returns:
+        a (rows, cols) boolean mask, True for clear pixels.
+    """
+    qf1 = qaBand(img, band_names, "QF1")
+    qf2 = qaBand(img, band_names, "QF2")
+    qf7 = qaBand(img, band_names, "QF7")
+
+    # cloud state, day/night, shadow, snow, cirrus, adjacent cloud and thin cirrus
+    mask = clearMask(qf1, [(2, 3), 4])
+    mask &= clearMask(qf2, [3, 5, 6, 7])
+    mask &= clearMask(qf7, [1, 4])
+    return mask
+
+
+def Opening(mask: np.ndarray, iterations: int = 3) -> np.ndarray:
+    """Apply a morphological opening filter to a mask.
+
+    Args:
+        mask: a (rows, cols) boolean mask, True for valid pixels.
+        iterations: the number of sequential erode/dilate operations, and the
+            radius of the circular kernel in pixels.
+
+    Returns:
+        the opened mask.
+    """
+    eroded = erode(mask, iterations, iterations)
+    return dilate(eroded, iterations, iterations)
@@ -0,0 +1,125 @@
+"""Routines to cloud, shade and brightness mask local arrays at once.
+
+These mirror earthlib.geelib.CombinedMask for (rows, cols, bands) arrays, returning
+    boolean masks that are True for valid pixels.
+"""
+
+from typing import Callable
+
+import numpy as np
+
+from earthlib.errors import SensorError
+from earthlib.nplib import CloudMask
+from earthlib.nplib.utils import brightnessMask, reflectanceScale
+from earthlib.profiling import profiled
+from earthlib.sensors import get_bands, supported_sensors
+
+
+def bySensor(sensor: str) -> Callable:
+    """Returns the appropriate combined mask function to use by sensor type.
+
+    Args:
+        sensor: string with the sensor name to return (e.g. "Landsat8").
+
+    Returns:
+        the mask function associated with a sensor.
+    """
+    lookup = {
+        "Landsat4": Landsat457,
+        "Landsat5": Landsat457,
+        "Landsat7": Landsat457,
+        "Landsat8": Landsat8,
+    }
+    try:
+        function = lookup[sensor]
+        return function
+    except KeyError:
+        supported = ", ".join(lookup.keys())
+        raise SensorError(
+            f"Combined masking not supported for '{sensor}'. Supported: {supported}"
+        )
+
+
+@profiled()
+def combinedMask(
+    img: np.ndarray,
+    bands: list,
+    cloudMask: np.ndarray,
+    shadeThreshold: float = 0.03,
+    brightThreshold: float = 0.4,
+    scale: float = 1.0,
+    offset: float = 0.0,
+) -> np.ndarray:
+    """Combine a cloud mask with shade and bright pixel masks.
+
+    The mean brightness is computed once and shared by both thresholds.
+
+    Args:
+        img: a (rows, cols, bands) float32 reflectance or integer DN array.
+        bands: the indices of the bands to compute brightness from.
+        cloudMask: a (rows, cols) boolean mask, True for clear pixels.
+        shadeThreshold: pixels with mean brightness below this value are masked.
+        brightThreshold: pixels with mean brightness above this value are masked.
+        scale: the scale factor converting `img` values to reflectance.
+        offset: the offset converting `img` values to reflectance.
+
+    Returns:
+        a (rows, cols) boolean mask, True for valid pixels.
+    """
+    mask = brightnessMask(
+        img, bands, shadeThreshold, brightThreshold, scale=scale, offset=offset
+    )
+    mask &= cloudMask
+    return mask
+
+
+def Landsat457(
+    img: np.ndarray,
+    band_names: list,
+    shadeThreshold: float = 0.03,
+    brightThreshold: float = 0.4,
+) -> np.ndarray:
+    """Apply cloud, shade and bright pixel masking to a Landsat 4/5/7 array.
+
+    Args:
+        img: a (rows, cols, bands) array with reflectance or DN, "QA_PIXEL"
+            and "QA_RADSAT" bands.
+        band_names: the band name of each band in `img`.
+        shadeThreshold: pixels with mean brightness below this value are masked.
+        brightThreshold: pixels with mean brightness above this value are masked.
+
+    Returns:
+        a (rows, cols) boolean mask, True for valid pixels.
+    """
+    bands = [band_names.index(band) for band in get_bands("Landsat7")]
+    scale, offset = reflectanceScale(img, supported_sensors["Landsat7"])
+    cloudMask = CloudMask.Landsat4578(img, band_names)
+    return combinedMask(
+        img, bands, cloudMask, shadeThreshold, brightThreshold, scale, offset
+    )
+
+
+def Landsat8(
+    img: np.ndarray,
+    band_names: list,
+    shadeThreshold: float = 0.03,
+    brightThreshold: float = 0.4,
+) -> np.ndarray:
+    """Apply cloud, shade and bright pixel masking to a Landsat 8 array.
+
+    Args:
+        img: a (rows, cols, bands) array with reflectance or DN, "QA_PIXEL"
+            and "QA_RADSAT" bands.
+        band_names: the band name of each band in `img`.
+        shadeThreshold: pixels with mean brightness below this value are masked.
+        brightThreshold: pixels with mean brightness above this value are masked.
+
+    Returns:
+        a (rows, cols) boolean mask, True for valid pixels.
+    """
+    bands = [band_names.index(band) for band in get_bands("Landsat8")]
+    scale, offset = reflectanceScale(img, supported_sensors["Landsat8"])
+    cloudMask = CloudMask.Landsat4578(img, band_names)
+    return combinedMask(
+        img, bands, cloudMask, shadeThreshold, brightThreshold, scale, offset
+    )
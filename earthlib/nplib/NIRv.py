@@ -0,0 +1,116 @@
+"""Routines for computing NIRv (near infrared reflectance of vegetation) from arrays.
+
+These mirror earthlib.geelib.NIRv for (rows, cols, bands) arrays, including numpy
+    memmaps of large rasters. Images are processed in tiles with float32 buffers
+    that are reused between tiles, so no full-size or float64 copies are made.
+"""
+
+from typing import Callable
+
+import numpy as np
+
+from earthlib.errors import SensorError
+from earthlib.nplib.config import TILE_SIZE
+from earthlib.nplib.utils import reflectanceScale, tiles
+from earthlib.profiling import profiled
+from earthlib.sensors import supported_sensors
+
+
+def bySensor(sensor: str) -> Callable:
+    """Returns a NIRv function with a sensor's band indices and scaling resolved.
+
+    Args:
+        sensor: string with the sensor name (e.g. "Landsat8", "Sentinel2").
+
+    Returns:
+        a function that takes a (rows, cols, bands) array with the sensor's bands,
+            plus optional `out` and `tile_size` arguments, and returns NIRv.
+            integer arrays are converted from DN with the sensor scale and offset.
+    """
+    red, nir = getNIRvBands(sensor)
+    params = supported_sensors[sensor]
+
+    def NIRv(
+        img: np.ndarray, out: np.ndarray = None, tile_size: int = TILE_SIZE
+    ) -> np.ndarray:
+        scale, offset = reflectanceScale(img, params)
+        return NIRvWrapper(img, red, nir, scale, offset, out, tile_size)
+
+    NIRv.__doc__ = f"Computes NIRv from a {sensor} array."
+    return NIRv
+
+
+def getNIRvBands(sensor: str) -> tuple:
+    """Look-up the red and near infrared band indices for NIRv calculation.
+
+    Args:
+        sensor: string with the sensor name.
+
+    Returns:
+        (red, nir) tuple of band indices.
+    """
+    descriptions = supported_sensors[sensor].band_descriptions or []
+    try:
+        return descriptions.index("red"), descriptions.index("near infrared")
+    except ValueError:
+        raise SensorError(
+            f"NIRv calculation not supported for '{sensor}': no red and NIR bands"
+        )
+
+
+@profiled()
+def NIRvWrapper(
+    img: np.ndarray,
+    red: int,
+    nir: int,
+    scale: float = 1.0,
+    offset: float = 0.0,
+    out: np.ndarray = None,
+    tile_size: int = TILE_SIZE,
+) -> np.ndarray:
+    """Compute NIRv for an array.
+
+    Args:
+        img: a (rows, cols, bands) float32 reflectance or integer DN array.
+        red: the index of the red band.
+        nir: the index of the near infrared band.
+        scale: the scale factor converting `img` values to reflectance.
+        offset: the offset converting `img` values to reflectance.
+        out: a (rows, cols) float32 array to write NIRv to, e.g. a np.memmap.
+        tile_size: the height and width of the blocks to process at once.
+
+    Returns:
+        a (rows, cols) float32 NIRv array.
+    """
+    rows, cols = img.shape[:2]
+    if out is None:
+        out = np.empty((rows, cols), dtype=np.float32)
+
+    buffers = np.empty((3, min(tile_size, rows), min(tile_size, cols)), np.float32)
+    for window in tiles((rows, cols), tile_size):
+        height = window[0].stop - window[0].start
+        width = window[1].stop - window[1].start
+        r, n, total = buffers[:, :height, :width]
+
+        # convert to reflectance in float32
+        r[...] = img[window[0], window[1], red]
+        n[...] = img[window[0], window[1], nir]
+        if scale != 1 or offset != 0:
+            for band in (r, n):
+                band *= np.float32(scale)
+                band += np.float32(offset)
+
+        # ndvi = (n - r) / (n + r), written over the red band
+        np.add(n, r, out=total)
+        np.subtract(n, r, out=r)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(r, total, out=r)
+
+        # nirv = (ndvi - 0.08) * nir
+        r -= np.float32(0.08)
+        np.multiply(r, n, out=out[window])
+
+    if isinstance(out, np.memmap):
+        out.flush()
+
+    return out
@@ -0,0 +1,353 @@
+"""Routines to scale, cloud mask, BRDF-correct and unmix local arrays in one pass.
+
+Running Scale, CloudMask, BRDFCorrect and Unmix on a full scene one after another
+    reads and writes a scene-sized array (and its float64 temporaries) at every step.
+    A Pipeline instead runs each stage on one tile at a time, passing the tile's
+    reflectance and mask buffers from stage to stage while they are in cache. The
+    buffers are allocated once and reused for every tile.
+
+Stages that need scene-level information, like the BRDF footprint or the SCL
+    morphology, compute it once in a `prepare` step before the tiles are processed.
+"""
+
+import time as timer
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+
+from earthlib.nplib import CloudMask
+from earthlib.nplib.BRDFCorrect import cFactorGrid, getCoefficients
+from earthlib.nplib.config import GEOMETRY_STEP, TILE_SIZE
+from earthlib.nplib.Scale import scaleBlock
+from earthlib.nplib.Unmix import computeOperators, fractionalCover
+from earthlib.nplib.utils import reflectanceScale, tiles, upsampleWindow
+from earthlib.profiling import profiled
+from earthlib.sensors import get_bands, supported_sensors
+
+# cloud masks that use neighbourhood operations, computed for the whole scene
+SCENE_MASKS = ("Sentinel2",)
+
+
+@dataclass
+class Tile:
+    """The buffers the stages of a Pipeline read and write for one tile.
+
+    Attributes:
+        window: the (row slice, column slice) of the tile in the scene.
+        block: the (rows, cols, bands) input values of the tile.
+        reflectance: a (rows, cols, n_bands) float32 reflectance buffer.
+        mask: a (rows, cols) boolean mask, True for clear pixels.
+        result: the (rows, cols, n_outputs) values to write to the output, which
+            defaults to the reflectance buffer unless a stage sets it.
+    """
+
+    window: tuple
+    block: np.ndarray
+    reflectance: np.ndarray
+    mask: np.ndarray
+    result: np.ndarray = None
+
+
+@dataclass
+class Stage:
+    """A step of a Pipeline.
+
+    Attributes:
+        name: the name to report the stage timing under.
+        apply: a function that updates a Tile in place.
+        prepare: a function run once per scene, before the tiles, that takes the
+            (rows, cols, bands) input array.
+        n_outputs: the number of bands the stage sets `Tile.result` to, if any.
+    """
+
+    name: str
+    apply: Callable
+    prepare: Callable = None
+    n_outputs: int = None
+
+
+@dataclass
+class Pipeline:
+    """Runs a sequence of stages over an array one tile at a time.
+
+    The first stage fills the tile's reflectance buffer from its input block. The
+        result of the last stage is written to the output, with masked pixels set
+        to NaN.
+
+    Attributes:
+        stages: the stages to run on each tile, in order.
+        n_bands: the number of reflectance bands in the tile buffer.
+        tile_size: the height and width of the tiles.
+        timings: {stage name: seconds} spent in each stage during the last run,
+            including its prepare step, plus the time spent writing the output.
+    """
+
+    stages: list
+    n_bands: int
+    tile_size: int = TILE_SIZE
+    timings: dict = field(default_factory=dict)
+
+    @property
+    def n_outputs(self) -> int:
+        """The number of bands in the pipeline output."""
+        n_outputs = self.n_bands
+        for stage in self.stages:
+            n_outputs = stage.n_outputs or n_outputs
+        return n_outputs
+
+    @profiled()
+    def run(self, img: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """Runs the pipeline over an array.
+
+        Args:
+            img: a (rows, cols, bands) array, e.g. a np.memmap of a large scene.
+            out: a (rows, cols, n_outputs) float32 array to write to.
+
+        Returns:
+            a (rows, cols, n_outputs) float32 array, NaN for masked pixels.
+        """
+        rows, cols = img.shape[:2]
+        if out is None:
+            out = np.empty((rows, cols, self.n_outputs), dtype=np.float32)
+
+        self.timings = {stage.name: 0.0 for stage in self.stages}
+        self.timings["write"] = 0.0
+        for stage in self.stages:
+            if stage.prepare is not None:
+                start = timer.perf_counter()
+                stage.prepare(img)
+                self.timings[stage.name] += timer.perf_counter() - start
+
+        height, width = min(self.tile_size, rows), min(self.tile_size, cols)
+        reflectance = np.empty((height, width, self.n_bands), dtype=np.float32)
+        mask = np.empty((height, width), dtype=bool)
+
+        for window in tiles((rows, cols), self.tile_size):
+            shape = (window[0].stop - window[0].start, window[1].stop - window[1].start)
+            tile = Tile(
+                window,
+                img[window],
+                reflectance[: shape[0], : shape[1]],
+                mask[: shape[0], : shape[1]],
+            )
+            tile.mask[...] = True
+            tile.result = tile.reflectance
+
+            for stage in self.stages:
+                start = timer.perf_counter()
+                stage.apply(tile)
+                self.timings[stage.name] += timer.perf_counter() - start
+
+            start = timer.perf_counter()
+            block = out[window]
+            block[...] = tile.result
+            block[~tile.mask] = np.nan
+            self.timings["write"] += timer.perf_counter() - start
+
+        if isinstance(out, np.memmap):
+            out.flush()
+
+        return out
+
+
+def bySensor(
+    sensor: str,
+    band_names: list,
+    endmembers: list = None,
+    time: datetime | float = None,
+    corners: dict = None,
+    cloudMask: bool = True,
+    shade_normalize: bool = True,
+    scaleFactor: float = 1,
+    valid: np.ndarray = None,
+    step: int = GEOMETRY_STEP,
+    tile_size: int = TILE_SIZE,
+) -> Pipeline:
+    """Builds the scale, cloud mask, BRDF and unmixing pipeline for a sensor.
+
+    Args:
+        sensor: string with the sensor name (e.g. "Landsat8", "Sentinel2").
+        band_names: the band name of each band in the input arrays, including the
+            sensor's reflectance bands and any QA bands used for cloud masking.
+        endmembers: lists of spectra to unmix with, each with shape
+            (n_iterations, n_bands). the output is reflectance if not set.
+        time: the acquisition time, for BRDF correction. see brdfCorrect().
+        corners: the (lon, lat) coordinates of the array corners. BRDF correction
+            is only applied if set. see brdfCorrect().
+        cloudMask: apply the sensor's cloud mask.
+        shade_normalize: apply shade normalization during unmixing.
+        scaleFactor: a scaling factor to tune the volumetric scattering adjustment.
+        valid: a (rows, cols) mask of pixels inside the scene footprint, for BRDF
+            correction. computed from the first reflectance band if not set,
+            which reads that band for the whole scene before the tiles are run.
+        step: the pixel spacing of the grid to compute the sun/view geometry on.
+        tile_size: the height and width of the tiles.
+
+    Returns:
+        a Pipeline with the stages for the sensor.
+    """
+    bands = [band_names.index(band) for band in get_bands(sensor)]
+    stages = [scaleStage(sensor, bands)]
+    if cloudMask:
+        stages.append(cloudMaskStage(sensor, band_names))
+    if corners is not None:
+        stages.append(
+            brdfStage(
+                sensor, bands, band_names, time, corners, scaleFactor, valid, step
+            )
+        )
+    if endmembers is not None:
+        stages.append(unmixStage(endmembers, shade_normalize))
+
+    return Pipeline(stages, len(bands), tile_size)
+
+
+def scaleStage(sensor: str, bands: list) -> Stage:
+    """Builds the stage that converts a tile's reflectance bands to float32.
+
+    Args:
+        sensor: string with the sensor name, for the DN scale and offset.
+        bands: the indices of the reflectance bands in the input arrays.
+
+    Returns:
+        a Stage that fills the tile reflectance buffer.
+    """
+    params = supported_sensors[sensor]
+
+    def apply(tile: Tile) -> None:
+        scale, offset = reflectanceScale(tile.block, params)
+        for idx, band in enumerate(bands):
+            scaleBlock(
+                tile.block[:, :, band], scale, offset, tile.reflectance[:, :, idx]
+            )
+
+    return Stage("scale", apply)
+
+
+def cloudMaskStage(sensor: str, band_names: list) -> Stage:
+    """Builds the stage that masks a tile's cloudy pixels.
+
+    Args:
+        sensor: string with the sensor name. see CloudMask.bySensor().
+        band_names: the band name of each band in the input arrays.
+
+    Returns:
+        a Stage that updates the tile mask.
+    """
+    maskFunction = CloudMask.bySensor(sensor)
+    if sensor not in SCENE_MASKS:
+
+        def apply(tile: Tile) -> None:
+            tile.mask &= maskFunction(tile.block, band_names)
+
+        return Stage("cloudMask", apply)
+
+    # neighbourhood masks are computed from the QA bands of the whole scene
+    qaBands = [idx for idx, name in enumerate(band_names) if name in ("QA60", "SCL")]
+    qaNames = [band_names[idx] for idx in qaBands]
+    sceneMask = dict()
+
+    def prepare(img: np.ndarray) -> None:
+        sceneMask["mask"] = maskFunction(img[:, :, qaBands], qaNames)
+
+    def apply(tile: Tile) -> None:
+        tile.mask &= sceneMask["mask"][tile.window]
+
+    return Stage("cloudMask", apply, prepare)
+
+
+def brdfStage(
+    sensor: str,
+    bands: list,
+    band_names: list,
+    time: datetime | float,
+    corners: dict,
+    scaleFactor: float = 1,
+    valid: np.ndarray = None,
+    step: int = GEOMETRY_STEP,
+) -> Stage:
+    """Builds the stage that BRDF-corrects a tile's reflectance.
+
+    The c-factors are computed on a coarse grid for the whole scene, then
+        interpolated to each tile.
+
+    Args:
+        sensor: string with the sensor name, for the BRDF coefficients.
+        bands: the indices of the reflectance bands in the input arrays.
+        band_names: the band name of each band in the input arrays.
+        time: the acquisition time. see brdfCorrect().
+        corners: the (lon, lat) coordinates of the array corners. see brdfCorrect().
+        scaleFactor: a scaling factor to tune the volumetric scattering adjustment.
+        valid: a (rows, cols) mask of pixels inside the scene footprint.
+        step: the pixel spacing of the grid to compute the sun/view geometry on.
+
+    Returns:
+        a Stage that updates the tile reflectance buffer.
+    """
+    coefficients = getCoefficients(sensor)
+    names = [band_names[band] for band in bands]
+    grid = dict()
+
+    def prepare(img: np.ndarray) -> None:
+        footprint = valid
+        if footprint is None:
+            footprint = np.empty(img.shape[:2], dtype=bool)
+            for window in tiles(img.shape, TILE_SIZE):
+                first = img[window[0], window[1], bands[0]]
+                np.isfinite(first, out=footprint[window])
+                footprint[window] &= first != 0
+        grid["cFactors"] = cFactorGrid(
+            img.shape[:2],
+            names,
+            coefficients,
+            time,
+            corners,
+            footprint,
+            scaleFactor,
+            step,
+        )
+
+    def apply(tile: Tile) -> None:
+        cFactors, rowIdx, colIdx, corrected = grid["cFactors"]
+        factors = upsampleWindow(cFactors, rowIdx, colIdx, tile.window)
+        if len(corrected) == tile.reflectance.shape[-1]:
+            tile.reflectance *= factors
+        else:
+            tile.reflectance[:, :, corrected] *= factors
+
+    return Stage("brdf", apply, prepare)
+
+
+def unmixStage(endmembers: list, shade_normalize: bool = True) -> Stage:
+    """Builds the stage that unmixes a tile's clear pixels.
+
+    Masked pixels are not unmixed.
+
+    Args:
+        endmembers: lists of spectra, each with shape (n_iterations, n_bands).
+        shade_normalize: apply shade normalization during unmixing.
+
+    Returns:
+        a Stage that sets the tile result to a (rows, cols, n_classes) array.
+    """
+    operators = computeOperators(endmembers, shade_normalize)
+    n_classes = len(endmembers)
+    buffer = dict()
+
+    def apply(tile: Tile) -> None:
+        rows, cols = tile.mask.shape
+        unmixed = buffer.get("unmixed")
+        if unmixed is None or unmixed.shape[0] < rows or unmixed.shape[1] < cols:
+            unmixed = buffer["unmixed"] = np.empty((rows, cols, n_classes), np.float32)
+        tile.result = unmixed[:rows, :cols]
+
+        # masked pixels are set to NaN when the result is written
+        if tile.mask.any():
+            pixels = tile.reflectance[tile.mask][np.newaxis]
+            tile.result[tile.mask] = fractionalCover(
+                pixels, endmembers, shade_normalize=shade_normalize, operators=operators
+            )[0]
+
+    return Stage("unmix", apply, n_outputs=n_classes)
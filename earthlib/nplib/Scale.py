@@ -0,0 +1,104 @@
+"""Routines for scaling local arrays to normalized reflectance values (0-1 float).
+
+These mirror earthlib.geelib.Scale for (rows, cols, bands) arrays, including numpy
+    memmaps. Integer DN are converted straight to float32 in the output buffer,
+    without float64 temporaries or per-tile allocations. Routines in
+    earthlib.nplib that read integer arrays as DN apply the scale themselves, so
+    arrays can also be kept as DN with a deferred scale.
+"""
+
+from typing import Callable
+
+import numpy as np
+
+from earthlib.nplib.config import TILE_SIZE
+from earthlib.nplib.utils import tiles
+from earthlib.profiling import profiled
+from earthlib.sensors import supported_sensors
+
+
+def bySensor(sensor: str) -> Callable:
+    """Returns a scaling function with a sensor's scale and offset resolved.
+
+    Args:
+        sensor: string with the sensor name (e.g. "Landsat8", "Sentinel2").
+
+    Returns:
+        a function that takes a (rows, cols, bands) DN array, plus optional `out`
+            and `tile_size` arguments, and returns float32 reflectance.
+    """
+    scale, offset = getScaleParams(sensor)
+
+    def Scale(
+        img: np.ndarray, out: np.ndarray = None, tile_size: int = TILE_SIZE
+    ) -> np.ndarray:
+        return scaleWrapper(img, scale, offset, out, tile_size)
+
+    Scale.__doc__ = f"Scales a {sensor} DN array to float32 reflectance."
+    return Scale
+
+
+def getScaleParams(sensor: str) -> tuple:
+    """Look-up the scale and offset for a sensor.
+
+    Args:
+        sensor: string with the sensor name.
+
+    Returns:
+        (scale, offset) tuple.
+    """
+    params = supported_sensors[sensor]
+    return params.scale, params.offset
+
+
+@profiled()
+def scaleWrapper(
+    img: np.ndarray,
+    scale: float,
+    offset: float,
+    out: np.ndarray = None,
+    tile_size: int = TILE_SIZE,
+) -> np.ndarray:
+    """Scale an array to reflectance values, tile by tile.
+
+    Args:
+        img: a (rows, cols, ...) DN array.
+        scale: the scale factor to multiply.
+        offset: the offset to add after scaling.
+        out: a float32 array with the shape of `img` to write to. may be `img`
+            itself for float32 arrays, e.g. a np.memmap.
+        tile_size: the height and width of the blocks to process at once.
+
+    Returns:
+        a float32 array of reflectance values.
+    """
+    if out is None:
+        out = np.empty(img.shape, dtype=np.float32)
+
+    for window in tiles(img.shape, tile_size):
+        scaleBlock(img[window], scale, offset, out=out[window])
+
+    if isinstance(out, np.memmap):
+        out.flush()
+
+    return out
+
+
+def scaleBlock(
+    block: np.ndarray, scale: float, offset: float, out: np.ndarray
+) -> np.ndarray:
+    """Scale a block of DN to reflectance in the output buffer.
+
+    Args:
+        block: a DN array.
+        scale: the scale factor to multiply.
+        offset: the offset to add after scaling.
+        out: a float32 array with the shape of `block` to write to.
+
+    Returns:
+        `out`, with the scaled values.
+    """
+    np.multiply(block, np.float32(scale), out=out, dtype=np.float32)
+    if offset != 0:
+        out += np.float32(offset)
+    return out
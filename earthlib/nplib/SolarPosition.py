@@ -0,0 +1,177 @@
+"""Routines to compute solar geometry for local arrays.
+
+The solar declination and equation of time depend only on the acquisition time, so
+    they are computed once per scene. Only the hour angle varies with longitude.
+    The series coefficients are shared with earthlib.geelib.BRDFCorrect.
+"""
+
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+
+from earthlib.nplib.utils import gridIndex, upsample
+
+# fourier series coefficients in the fraction of the year, from
+# https://www.pythonfmask.org/en/latest/_modules/fmask/landsatangles.html
+# (cos coefficients for k = 0, 1, ..., sin coefficients for k = 1, 2, ...)
+EQUATION_OF_TIME = (
+    (0.000075, 0.001868, -0.014615),
+    (-0.032077, -0.040849),
+)
+DECLINATION = (
+    (0.006918, -0.399912, -0.006758, -0.002697),
+    (0.070257, 0.000907, 0.001480),
+)
+
+# converts the equation of time series from radians to minutes
+MINUTES_PER_RADIAN = 12 * 60 / math.pi
+
+
+def fourierSeries(jdpr: float, coefficients: tuple) -> float:
+    """Evaluates a fourier series in the fraction of the year.
+
+    Args:
+        jdpr: the julian date proportion in radians.
+        coefficients: (cos, sin) coefficients, e.g. DECLINATION.
+
+    Returns:
+        the value of the series.
+    """
+    cosTerms, sinTerms = coefficients
+    total = sum(a * math.cos(k * jdpr) for k, a in enumerate(cosTerms))
+    total += sum(b * math.sin(k * jdpr) for k, b in enumerate(sinTerms, start=1))
+    return total
+
+
+def fourierExpression(coefficients: tuple, variable: str = "jdpr") -> str:
+    """Writes a fourier series in the fraction of the year as an expression.
+
+    Args:
+        coefficients: (cos, sin) coefficients, e.g. DECLINATION.
+        variable: the name of the julian date proportion variable.
+
+    Returns:
+        an expression string, e.g. for ee.Number.expression().
+    """
+    cosTerms, sinTerms = coefficients
+
+    def angle(k: int) -> str:
+        return variable if k == 1 else f"{k} * {variable}"
+
+    terms = [(a, f"cos({angle(k)})") for k, a in enumerate(cosTerms) if k > 0]
+    terms += [(b, f"sin({angle(k)})") for k, b in enumerate(sinTerms, start=1)]
+
+    expression = f"{cosTerms[0]:g}"
+    for value, term in terms:
+        sign = "-" if value < 0 else "+"
+        expression += f" {sign} {abs(value):g} * {term}"
+    return expression
+
+
+def solarTerms(time: datetime | float) -> tuple:
+    """Computes the scene-level terms of the solar position.
+
+    From https://www.pythonfmask.org/en/latest/_modules/fmask/landsatangles.html
+
+    Args:
+        time: the acquisition time, as a datetime (naive times are read as UTC)
+            or as milliseconds since the unix epoch.
+
+    Returns:
+        (hourGMT, localSolarDiff, delta) tuple with the hour of the day, the
+            equation of time in minutes and the solar declination in radians.
+    """
+    if not isinstance(time, datetime):
+        time = datetime.fromtimestamp(time / 1000, tz=timezone.utc)
+    elif time.tzinfo is None:
+        time = time.replace(tzinfo=timezone.utc)
+    time = time.astimezone(timezone.utc)
+
+    midnight = time.replace(hour=0, minute=0, second=0, microsecond=0)
+    hourGMT = (time - midnight).total_seconds() / 3600
+
+    # julian date proportion in radians
+    year = datetime(time.year, 1, 1, tzinfo=timezone.utc)
+    days = (datetime(time.year + 1, 1, 1, tzinfo=timezone.utc) - year).days
+    jdpr = (time - year).total_seconds() / (days * 86400) * 2 * math.pi
+
+    localSolarDiff = fourierSeries(jdpr, EQUATION_OF_TIME) * MINUTES_PER_RADIAN
+    delta = fourierSeries(jdpr, DECLINATION)
+
+    return hourGMT, localSolarDiff, delta
+
+
+def solarPosition(
+    lon: np.ndarray, lat: np.ndarray, time: datetime | float, step: int = 1
+) -> tuple:
+    """Computes the solar zenith and azimuth angles for each pixel.
+
+    Args:
+        lon: pixel longitudes in degrees.
+        lat: pixel latitudes in degrees.
+        time: the acquisition time. see solarTerms().
+        step: compute the angles every `step` pixels of 2d inputs and bilinearly
+            interpolate the rest. the default computes every pixel.
+
+    Returns:
+        (sunZen, sunAz) tuple of angles in radians. azimuth is clockwise from north.
+    """
+    terms = solarTerms(time)
+    if step <= 1 or np.ndim(lon) != 2:
+        return _solarAngles(lon, lat, *terms)
+
+    shape = np.shape(lon)
+    rowIdx = gridIndex(shape[0], step)
+    colIdx = gridIndex(shape[1], step)
+    grid = np.ix_(rowIdx, colIdx)
+    sunZen, sunAz = _solarAngles(lon[grid], lat[grid], *terms)
+
+    # rotate the azimuths away from the 0/2pi wrap before interpolating
+    center = sunAz[len(rowIdx) // 2, len(colIdx) // 2]
+    rotation = np.pi - center
+    sunAz = np.mod(sunAz + rotation, 2 * np.pi)
+    angles = upsample(np.stack([sunZen, sunAz], axis=-1), rowIdx, colIdx, shape)
+    sunZen, sunAz = angles[..., 0], angles[..., 1]
+    sunAz = np.mod(sunAz - rotation, 2 * np.pi).astype(sunZen.dtype)
+
+    return sunZen, sunAz
+
+
+def _solarAngles(
+    lon: np.ndarray,
+    lat: np.ndarray,
+    hourGMT: float,
+    localSolarDiff: float,
+    delta: float,
+) -> tuple:
+    """Computes solar zenith and azimuth angles from the scene-level terms."""
+    # only the hour angle varies with longitude
+    trueSolarTime = (
+        hourGMT + lon / np.float32(15) + np.float32(localSolarDiff / 60 - 12)
+    )
+    angleHour = np.radians(trueSolarTime * np.float32(15))
+    cosAngleHour = np.cos(angleHour)
+    latRad = np.radians(lat)
+    sinLat = np.sin(latRad)
+    cosLat = np.cos(latRad)
+    sinDelta = np.float32(math.sin(delta))
+    cosDelta = np.float32(math.cos(delta))
+
+    cosSunZen = sinLat * sinDelta + cosLat * cosDelta * cosAngleHour
+    sunZen = np.arccos(np.clip(cosSunZen, -1, 1))
+    sinSunZen = np.sin(sunZen)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sinSunAzSW = np.clip(cosDelta * np.sin(angleHour) / sinSunZen, -1, 1)
+        cosSunAzSW = (-cosLat * sinDelta + sinLat * cosDelta * cosAngleHour) / sinSunZen
+
+    sunAzSW = np.arcsin(sinSunAzSW)
+    sunAzSW = np.where(cosSunAzSW <= 0, np.pi - sunAzSW, sunAzSW)
+    sunAzSW = np.where(
+        (cosSunAzSW > 0) & (sinSunAzSW <= 0), 2 * np.pi + sunAzSW, sunAzSW
+    )
+    sunAz = sunAzSW + np.pi
+    sunAz = np.where(sunAz > 2 * np.pi, sunAz - 2 * np.pi, sunAz)
+
+    return sunZen, sunAz.astype(sunZen.dtype)
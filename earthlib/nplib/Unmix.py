@@ -0,0 +1,561 @@
+"""Routines for performing spectral unmixing on numpy arrays.
+
+These mirror earthlib.geelib.Unmix for local (rows, cols, bands) reflectance
+    arrays, solving each endmember bundle for every pixel at once.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import combinations
+
+import numpy as np
+
+from earthlib import config
+from earthlib.nplib.config import TILE_SIZE
+from earthlib.nplib.utils import attachArray, shareArray, tiles
+from earthlib.profiling import profiled
+
+# bundle operators keyed by a digest of the endmembers, in LRU order
+_operator_cache = OrderedDict()
+_operator_cache_lock = threading.Lock()
+
+# arrays attached by each fractionalCoverParallel worker process
+_worker_state = dict()
+
+
+@profiled()
+def fractionalCover(
+    img: np.ndarray,
+    endmembers: list = None,
+    n_bands: int = None,
+    shade_normalize: bool = True,
+    operators: list = None,
+) -> np.ndarray:
+    """Computes the percent cover of each endmember spectra.
+
+    Args:
+        img: the (rows, cols, bands) reflectance array to unmix.
+        endmembers: lists of spectra, each element corresponding to a subType.
+            each should have shape (n_iterations, n_bands). not used if
+            `operators` are set.
+        n_bands: number of reflectance bands used for unmixing.
+            defaults to the number of bands in `img`.
+        shade_normalize: flag to apply shade normalization during unmixing.
+        operators: precomputed operators from computeOperators(). computed
+            (or read from the operator cache) from `endmembers` if not set.
+
+    Returns:
+        unmixed: a (rows, cols, n_classes) float32 array with one band per subType.
+    """
+    if n_bands is None:
+        n_bands = img.shape[-1]
+    if operators is None:
+        operators = computeOperators(endmembers, shade_normalize)
+    n_classes = classCount(operators, shade_normalize)
+    rows, cols = img.shape[:2]
+
+    # unmix all pixels at once, as a (n_pixels, n_bands) array
+    pixels = img[:, :, :n_bands].reshape(rows * cols, n_bands).astype(np.float64)
+
+    # track running sums to compute the rmse-weighted average in a single pass
+    fraction_sum = np.zeros((rows * cols, n_classes))
+    weighted_sum = np.zeros((rows * cols, n_classes))
+    rmse_sum = np.zeros(rows * cols)
+
+    # loop through each iteration and unmix each
+    for operator in operators:
+        spectra = operator.spectra
+        fractions = operator.unmix(pixels)
+
+        # run the forward model to evaluate the fractional cover fit
+        modeled_reflectance = computeModeledSpectra(spectra, fractions)
+        rmse = computeSpectralRMSE(pixels, modeled_reflectance)
+
+        # normalize by the observed shade fraction
+        if shade_normalize:
+            shade_fraction = np.abs(fractions[:, [n_classes]] - 1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                fractions = fractions / shade_fraction
+
+        fractions = fractions[:, :n_classes]
+        fraction_sum += fractions
+        weighted_sum += fractions * rmse[:, np.newaxis]
+        rmse_sum += rmse
+
+    # reduce it to a single array and return
+    unmixed = weightedAverage(fraction_sum, weighted_sum, rmse_sum, len(operators))
+    unmixed = unmixed.astype(np.float32)
+
+    return unmixed.reshape(rows, cols, n_classes)
+
+
+@profiled()
+def fractionalCoverTiled(
+    img: np.ndarray,
+    endmembers: list = None,
+    out: np.ndarray = None,
+    n_bands: int = None,
+    shade_normalize: bool = True,
+    operators: list = None,
+    tile_size: int = TILE_SIZE,
+) -> np.ndarray:
+    """Computes the percent cover of each endmember spectra one tile at a time.
+
+    Peak memory is set by `tile_size` instead of the scene size. Use memory-mapped
+        (or any sliceable, on-disk) input and output arrays to unmix scenes larger
+        than memory.
+
+    Args:
+        img: the (rows, cols, bands) reflectance array to unmix.
+        endmembers: lists of spectra, each element corresponding to a subType.
+            each should have shape (n_iterations, n_bands). not used if
+            `operators` are set.
+        out: a (rows, cols, n_classes) array to write the results to.
+            a float32 array is allocated if not set.
+        n_bands: number of reflectance bands used for unmixing.
+            defaults to the number of bands in `img`.
+        shade_normalize: flag to apply shade normalization during unmixing.
+        operators: precomputed operators from computeOperators().
+        tile_size: the height and width of the tiles to unmix.
+
+    Returns:
+        unmixed: the `out` array with one band per subType.
+    """
+    rows, cols = img.shape[:2]
+    if operators is None:
+        operators = computeOperators(endmembers, shade_normalize)
+    if out is None:
+        n_classes = classCount(operators, shade_normalize)
+        out = np.empty((rows, cols, n_classes), dtype=np.float32)
+
+    for window in tiles((rows, cols), tile_size):
+        block = np.asarray(img[window])
+        out[window] = fractionalCover(
+            block,
+            endmembers,
+            n_bands=n_bands,
+            shade_normalize=shade_normalize,
+            operators=operators,
+        )
+
+    if isinstance(out, np.memmap):
+        out.flush()
+
+    return out
+
+
+@profiled()
+def fractionalCoverParallel(
+    img: np.ndarray,
+    endmembers: list = None,
+    out: np.ndarray = None,
+    n_bands: int = None,
+    shade_normalize: bool = True,
+    tile_size: int = TILE_SIZE,
+    n_workers: int = None,
+    operators: list = None,
+) -> np.ndarray:
+    """Computes the percent cover of each endmember spectra across worker processes.
+
+    Tiles are dispatched to a process pool. The bundle operators, the input and the
+        output are shared with the workers through shared memory (or by path for
+        np.memmap arrays) once per worker, so each task only pickles a tile window.
+
+    Args:
+        img: the (rows, cols, bands) reflectance array to unmix.
+        endmembers: lists of spectra, each element corresponding to a subType.
+            each should have shape (n_iterations, n_bands). not used if
+            `operators` are set.
+        out: a (rows, cols, n_classes) array to write the results to.
+            a float32 array is allocated if not set.
+        n_bands: number of reflectance bands used for unmixing.
+            defaults to the number of bands in `img`.
+        shade_normalize: flag to apply shade normalization during unmixing.
+        tile_size: the height and width of the tiles to unmix.
+        n_workers: number of worker processes. defaults to the cpu count.
+        operators: precomputed operators from computeOperators().
+
+    Returns:
+        unmixed: the `out` array with one band per subType.
+    """
+    rows, cols = img.shape[:2]
+    if operators is None:
+        operators = computeOperators(endmembers, shade_normalize)
+    if out is None:
+        n_classes = classCount(operators, shade_normalize)
+        out = np.empty((rows, cols, n_classes), dtype=np.float32)
+
+    packed = {
+        field: np.stack([getattr(operator, field) for operator in operators])
+        for field in ("spectra", "weights", "offsets", "gram")
+    }
+
+    blocks = list()
+    try:
+        descriptors = dict()
+        for field, array in packed.items():
+            shm, descriptors[field] = shareArray(array)
+            blocks.append(shm)
+
+        shm, img_descriptor = shareArray(img)
+        blocks.append(shm)
+
+        # write straight to memory-mapped outputs, otherwise to a shared block
+        if isinstance(out, np.memmap):
+            out.flush()
+        shm, out_descriptor = shareArray(out, copy=False, writable=True)
+        blocks.append(shm)
+        shared_out = shm is None
+
+        initargs = (
+            descriptors,
+            img_descriptor,
+            out_descriptor,
+            n_bands,
+            shade_normalize,
+        )
+        with ProcessPoolExecutor(
+            max_workers=n_workers, initializer=_initWorker, initargs=initargs
+        ) as executor:
+            for _ in executor.map(_unmixWindow, tiles((rows, cols), tile_size)):
+                pass
+
+        if not shared_out:
+            _, unmixed = attachArray(out_descriptor)
+            out[:] = unmixed
+            del unmixed
+
+    finally:
+        for shm in blocks:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    return out
+
+
+def _initWorker(
+    descriptors: dict,
+    img_descriptor: dict,
+    out_descriptor: dict,
+    n_bands: int,
+    shade_normalize: bool,
+) -> None:
+    """Attaches a worker process to the arrays shared by fractionalCoverParallel."""
+    blocks = list()
+    packed = dict()
+    for field, descriptor in descriptors.items():
+        shm, packed[field] = attachArray(descriptor)
+        blocks.append(shm)
+
+    subsets = subsetWindows(packed["spectra"].shape[1])
+    operators = [
+        BundleOperator(
+            spectra=packed["spectra"][idx],
+            weights=packed["weights"][idx],
+            offsets=packed["offsets"][idx],
+            gram=packed["gram"][idx],
+            subsets=subsets,
+        )
+        for idx in range(len(packed["spectra"]))
+    ]
+
+    img_shm, img = attachArray(img_descriptor)
+    out_shm, out = attachArray(out_descriptor)
+    blocks.extend([img_shm, out_shm])
+
+    _worker_state.update(
+        blocks=blocks,
+        operators=operators,
+        img=img,
+        out=out,
+        n_bands=n_bands,
+        shade_normalize=shade_normalize,
+    )
+
+
+def _unmixWindow(window: tuple) -> None:
+    """Unmixes one tile in a worker process, writing to the shared output."""
+    out = _worker_state["out"]
+    out[window] = fractionalCover(
+        np.asarray(_worker_state["img"][window]),
+        n_bands=_worker_state["n_bands"],
+        shade_normalize=_worker_state["shade_normalize"],
+        operators=_worker_state["operators"],
+    )
+    if isinstance(out, np.memmap):
+        out.flush()
+
+
+@dataclass
+class BundleOperator:
+    """Precomputed constrained least squares operators for one endmember bundle.
+
+    Holds the sum-to-one solution for every subset of endmembers, stacked with the
+        endmember spectra so a batch of pixels is unmixed with one matrix product.
+    """
+
+    spectra: np.ndarray
+    weights: np.ndarray
+    offsets: np.ndarray
+    gram: np.ndarray
+    subsets: list
+
+    @classmethod
+    def from_spectra(cls, spectra: np.ndarray) -> "BundleOperator":
+        """Builds the operators for a bundle of endmember spectra.
+
+        Args:
+            spectra: a (n_endmembers, n_bands) array of spectra.
+
+        Returns:
+            the precomputed bundle operators.
+        """
+        spectra = np.array(spectra, dtype=np.float64)
+        n_endmembers = len(spectra)
+        subsets = subsetWindows(n_endmembers)
+        weights = list()
+        offsets = list()
+
+        for active, rows in subsets:
+            operator, offset = sumToOneOperator(spectra[active])
+            weights.append(operator)
+            offsets.append(offset)
+
+        # append the spectra to also project each pixel onto the endmembers
+        weights.append(spectra)
+        offsets.append(np.zeros(n_endmembers))
+
+        return cls(
+            spectra=spectra,
+            weights=np.concatenate(weights),
+            offsets=np.concatenate(offsets),
+            gram=spectra @ spectra.T,
+            subsets=subsets,
+        )
+
+    def unmix(self, pixels: np.ndarray) -> np.ndarray:
+        """Fully-constrained least squares unmixing for a batch of pixels.
+
+        Args:
+            pixels: a (n_pixels, n_bands) array of reflectance values.
+
+        Returns:
+            a (n_pixels, n_endmembers) array of fractions. pixels with missing
+                values are NaN.
+        """
+        n_endmembers = len(self.spectra)
+
+        # work band-major so each subset reads contiguous rows
+        projected = self.weights @ np.ascontiguousarray(pixels.T)
+        projected += self.offsets[:, np.newaxis]
+        endmember_products = projected[-n_endmembers:]
+        squared_norm = np.einsum("ij,ij->i", pixels, pixels)
+
+        fractions = np.full((n_endmembers, len(pixels)), np.nan)
+        best_error = np.full(len(pixels), np.inf)
+
+        for active, rows in self.subsets:
+            estimate = projected[rows]
+
+            # expand ||x - f'E||^2 to reuse the precomputed products
+            gram = self.gram[np.ix_(active, active)]
+            error = (
+                squared_norm
+                - 2 * np.einsum("ij,ij->j", estimate, endmember_products[active])
+                + np.einsum("ij,ij->j", gram @ estimate, estimate)
+            )
+
+            update = (estimate >= 0).all(axis=0) & (error < best_error)
+            np.copyto(best_error, error, where=update)
+            for idx in range(n_endmembers):
+                value = estimate[active.index(idx)] if idx in active else 0
+                np.copyto(fractions[idx], value, where=update)
+
+        return fractions.T
+
+
+def subsetWindows(n_endmembers: int) -> list:
+    """Lists the endmember subsets solved for each bundle.
+
+    Larger subsets come first so they win ties with their sub-subsets.
+
+    Args:
+        n_endmembers: the number of endmembers in the bundle.
+
+    Returns:
+        (active endmember indices, operator row slice) tuples.
+    """
+    subsets = list()
+    start = 0
+    for n_active in range(n_endmembers, 0, -1):
+        for subset in combinations(range(n_endmembers), n_active):
+            subsets.append((list(subset), slice(start, start + n_active)))
+            start += n_active
+
+    return subsets
+
+
+def computeOperators(endmembers: list, shade_normalize: bool = True) -> list:
+    """Precomputes the unmixing operators for each endmember bundle.
+
+    Operators are memoized by the content of the endmember bundles, keeping the
+        config.operator_cache_size most recently used sets, so tiles and scenes
+        unmixed with the same endmembers reuse them.
+
+    Args:
+        endmembers: lists of spectra, each element corresponding to a subType.
+            each should have shape (n_iterations, n_bands).
+        shade_normalize: include a shade endmember in each bundle.
+
+    Returns:
+        a list with one BundleOperator per iteration.
+    """
+    bundles = np.array(
+        [np.asarray(spectra) for spectra in endmembers], dtype=np.float64
+    )
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str((bundles.shape, shade_normalize)).encode())
+    digest.update(np.ascontiguousarray(bundles).data)
+    key = digest.hexdigest()
+
+    with _operator_cache_lock:
+        operators = _operator_cache.get(key)
+        if operators is not None:
+            _operator_cache.move_to_end(key)
+            return operators
+
+    n_bands = bundles.shape[-1]
+    operators = list()
+    for spectra in zip(*bundles):
+        if shade_normalize:
+            spectra += (np.zeros(n_bands),)
+        operators.append(BundleOperator.from_spectra(np.array(spectra)))
+
+    with _operator_cache_lock:
+        _operator_cache[key] = operators
+        while len(_operator_cache) > config.operator_cache_size:
+            _operator_cache.popitem(last=False)
+
+    return operators
+
+
+def classCount(operators: list, shade_normalize: bool = True) -> int:
+    """Returns the number of endmember classes unmixed by a set of operators.
+
+    Args:
+        operators: operators from computeOperators().
+        shade_normalize: whether the operators include a shade endmember.
+
+    Returns:
+        the number of classes, excluding shade.
+    """
+    return len(operators[0].spectra) - int(shade_normalize)
+
+
+def clearOperatorCache() -> None:
+    """Removes all memoized unmixing operators."""
+    with _operator_cache_lock:
+        _operator_cache.clear()
+
+
+def unmix(pixels: np.ndarray, endmembers: np.ndarray) -> np.ndarray:
+    """Fully-constrained least squares unmixing for a batch of pixels.
+
+    Equivalent to ee.Image.unmix(endmembers, sumToOne=True, nonNegative=True).
+        The optimum lies on the subset of endmembers with non-zero fractions,
+        so the sum-to-one solution is computed for every subset and each pixel
+        keeps the non-negative solution with the lowest residual. This is
+        tractable for the small number of endmembers used per bundle.
+
+    Args:
+        pixels: a (n_pixels, n_bands) array of reflectance values.
+        endmembers: a (n_endmembers, n_bands) array of spectra.
+
+    Returns:
+        a (n_pixels, n_endmembers) array of fractions. pixels with missing
+            values are NaN.
+    """
+    return BundleOperator.from_spectra(endmembers).unmix(pixels)
+
+
+def sumToOneOperator(endmembers: np.ndarray) -> tuple:
+    """Computes the affine least squares solution with fractions summing to one.
+
+    Solves the Karush-Kuhn-Tucker system for min ||E'f - x|| where sum(f) = 1,
+        which remains well-posed with an all-zero shade endmember.
+
+    Args:
+        endmembers: a (n_endmembers, n_bands) array of spectra.
+
+    Returns:
+        (operator, offset) arrays with shapes (n_endmembers, n_bands) and
+            (n_endmembers,) so that fractions = operator @ spectrum + offset.
+    """
+    n_endmembers = len(endmembers)
+    kkt = np.zeros((n_endmembers + 1, n_endmembers + 1))
+    kkt[:n_endmembers, :n_endmembers] = endmembers @ endmembers.T
+    kkt[:n_endmembers, n_endmembers] = 1
+    kkt[n_endmembers, :n_endmembers] = 1
+    inverse = np.linalg.pinv(kkt)
+    operator = inverse[:n_endmembers, :n_endmembers] @ endmembers
+    offset = inverse[:n_endmembers, n_endmembers]
+    return operator, offset
+
+
+def computeModeledSpectra(endmembers: np.ndarray, fractions: np.ndarray) -> np.ndarray:
+    """Constructs a modeled spectrum for each pixel based on endmember fractions.
+
+    Args:
+        endmembers: a (n_endmembers, n_bands) array of spectra.
+        fractions: a (n_pixels, n_endmembers) array output from unmix().
+
+    Returns:
+        a (n_pixels, n_bands) array of modeled reflectance.
+    """
+    return fractions @ endmembers
+
+
+def computeSpectralRMSE(measured: np.ndarray, modeled: np.ndarray) -> np.ndarray:
+    """Computes root mean squared error between measured and modeled spectra.
+
+    Matches earthlib.geelib.Unmix, which reports the root of the summed squared error.
+
+    Args:
+        measured: a (n_pixels, n_bands) array of measured reflectance.
+        modeled: a (n_pixels, n_bands) array of modeled reflectance.
+
+    Returns:
+        rmse: a (n_pixels,) array of pixel-wise RMSE values.
+    """
+    return np.sqrt(np.sum((measured - modeled) ** 2, axis=1))
+
+
+def weightedAverage(
+    fraction_sum: np.ndarray,
+    weighted_sum: np.ndarray,
+    rmse_sum: np.ndarray,
+    n_estimates: int,
+) -> np.ndarray:
+    """Computes an RMSE-weighted fractional cover estimate from running sums.
+
+    Each estimate is weighted by w = 1 - rmse / sum(rmse), as in earthlib.geelib.Unmix.
+        Expanding sum(w * f) / sum(w) gives an expression of three sums that can be
+        accumulated one estimate at a time, so estimates do not need to be stored.
+
+    Args:
+        fraction_sum: a (n_pixels, n_classes) array with the sum of the fractions.
+        weighted_sum: a (n_pixels, n_classes) array with the sum of fractions * rmse.
+        rmse_sum: a (n_pixels,) array with the sum of the rmse values.
+        n_estimates: the number of estimates summed.
+
+    Returns:
+        a (n_pixels, n_classes) array with the weighted average fractional cover.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rmse_sum = rmse_sum[:, np.newaxis]
+        weight_sum = n_estimates - rmse_sum / rmse_sum
+        return (fraction_sum - weighted_sum / rmse_sum) / weight_sum
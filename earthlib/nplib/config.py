@@ -0,0 +1,7 @@
+"""Default configuration for local array routines"""
+
+# height and width of the blocks processed by tiled routines
+TILE_SIZE = 512
+
+# pixel spacing of the grid that smoothly-varying sun/view geometry is computed on
+GEOMETRY_STEP = 16
@@ -0,0 +1,385 @@
+"""Utility functions for working with local image arrays."""
+
+import mmap
+from multiprocessing import shared_memory
+from typing import Iterator
+
+import numpy as np
+
+from earthlib.nplib.config import TILE_SIZE
+from earthlib.profiling import profiled
+from earthlib.sensors import Sensor
+
+
+def tiles(shape: tuple, tile_size: int) -> Iterator[tuple]:
+    """Generates the windows that split an image into square tiles.
+
+    Args:
+        shape: the (rows, cols) shape of the image.
+        tile_size: the height and width of each tile. edge tiles may be smaller.
+
+    Yields:
+        (row slice, column slice) tuples to index the image with.
+    """
+    rows, cols = shape[:2]
+    for row in range(0, rows, tile_size):
+        for col in range(0, cols, tile_size):
+            yield (
+                slice(row, min(row + tile_size, rows)),
+                slice(col, min(col + tile_size, cols)),
+            )
+
+
+def meanBrightness(img: np.ndarray, bands: list, out: np.ndarray = None) -> np.ndarray:
+    """Computes the mean of a subset of bands, one band at a time.
+
+    Bands are accumulated in float32, without float64 or per-band copies.
+
+    Args:
+        img: a (rows, cols, bands) array.
+        bands: the indices of the bands to average.
+        out: a (rows, cols) float32 array to write the mean to.
+
+    Returns:
+        a (rows, cols) float32 array.
+    """
+    if out is None:
+        out = np.empty(img.shape[:2], dtype=np.float32)
+    out[...] = img[:, :, bands[0]]
+    for band in bands[1:]:
+        out += img[:, :, band]
+    out *= np.float32(1 / len(bands))
+    return out
+
+
+@profiled()
+def brightnessMask(
+    img: np.ndarray,
+    bands: list,
+    lower: float = None,
+    upper: float = None,
+    scale: float = 1.0,
+    offset: float = 0.0,
+    out: np.ndarray = None,
+    tile_size: int = TILE_SIZE,
+) -> np.ndarray:
+    """Finds pixels with a mean reflectance between two thresholds, tile by tile.
+
+    Thresholds are converted to the units of `img`, so DN arrays aren't rescaled.
+
+    Args:
+        img: a (rows, cols, bands) array, e.g. a np.memmap.
+        bands: the indices of the bands to average.
+        lower: pixels with mean reflectance at or below this value are masked.
+        upper: pixels with mean reflectance at or above this value are masked.
+        scale: the scale factor converting `img` values to reflectance.
+        offset: the offset converting `img` values to reflectance.
+        out: a (rows, cols) boolean array to write the mask to.
+        tile_size: the height and width of the blocks to process at once.
+
+    Returns:
+        a (rows, cols) boolean mask, True for pixels between the thresholds.
+    """
+    rows, cols = img.shape[:2]
+    if out is None:
+        out = np.empty((rows, cols), dtype=bool)
+
+    buffer = np.empty((min(tile_size, rows), min(tile_size, cols)), np.float32)
+    for window in tiles((rows, cols), tile_size):
+        height = window[0].stop - window[0].start
+        width = window[1].stop - window[1].start
+        brightness = meanBrightness(img[window], bands, buffer[:height, :width])
+        mask = out[window]
+        mask[...] = True
+        if lower is not None:
+            mask &= brightness > np.float32((lower - offset) / scale)
+        if upper is not None:
+            mask &= brightness < np.float32((upper - offset) / scale)
+
+    return out
+
+
+def reflectanceScale(img: np.ndarray, sensor: Sensor) -> tuple:
+    """Gets the scale and offset that convert an array to reflectance.
+
+    Integer arrays are read as sensor DN, float arrays as scaled reflectance.
+
+    Args:
+        img: the image array.
+        sensor: the sensor the image was collected with.
+
+    Returns:
+        (scale, offset) tuple.
+    """
+    if np.issubdtype(img.dtype, np.integer):
+        return sensor.scale, sensor.offset
+    return 1.0, 0.0
+
+
+def shareArray(array: np.ndarray, copy: bool = True, writable: bool = False) -> tuple:
+    """Makes an array available to other processes without pickling it.
+
+    Memory-mapped arrays are shared by file path. Other arrays, and copy-on-write
+        memory maps whose in-memory edits aren't in the file, are copied into a new
+        shared memory block, which the caller must close and unlink.
+
+    Args:
+        array: the array to share.
+        copy: copy the array values into shared memory. set to False
+            to only allocate a block with the same shape and dtype.
+        writable: other processes write to the array. memory-mapped arrays are
+            otherwise opened read-only.
+
+    Returns:
+        (shm, descriptor) tuple with the shared memory block (None for
+            memory-mapped arrays) and a picklable descriptor for attachArray().
+    """
+    modes = ("r+", "w+") if writable else ("r", "r+", "w+")
+    if (
+        isinstance(array, np.memmap)
+        and isinstance(array.base, mmap.mmap)
+        and array.mode in modes
+    ):
+        descriptor = {
+            "filename": array.filename,
+            "offset": array.offset,
+            "shape": array.shape,
+            "dtype": array.dtype.str,
+            "mode": "r+" if writable else "r",
+        }
+        return None, descriptor
+
+    array = np.asarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    if copy:
+        shared[:] = array
+    descriptor = {"name": shm.name, "shape": array.shape, "dtype": array.dtype.str}
+    return shm, descriptor
+
+
+def attachArray(descriptor: dict) -> tuple:
+    """Opens an array shared by another process with shareArray().
+
+    Args:
+        descriptor: the descriptor returned by shareArray().
+
+    Returns:
+        (shm, array) tuple with the attached shared memory block (None for
+            memory-mapped arrays), which must stay open while `array` is used.
+    """
+    if "filename" in descriptor:
+        array = np.memmap(
+            descriptor["filename"],
+            dtype=descriptor["dtype"],
+            mode=descriptor["mode"],
+            offset=descriptor["offset"],
+            shape=descriptor["shape"],
+        )
+        return None, array
+
+    # the creating process owns the block. before python 3.13, attaching registers
+    #   it again with the resource tracker that pool workers share with it
+    try:
+        shm = shared_memory.SharedMemory(name=descriptor["name"], track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=descriptor["name"])
+
+    array = np.ndarray(descriptor["shape"], dtype=descriptor["dtype"], buffer=shm.buf)
+    return shm, array
+
+
+def gridIndex(size: int, step: int) -> np.ndarray:
+    """Returns the pixel positions of a grid sampled every `step` pixels.
+
+    Args:
+        size: the number of pixels along the axis.
+        step: the spacing between samples.
+
+    Returns:
+        the sampled positions, always including the first and last pixels.
+    """
+    index = np.arange(0, size, max(step, 1))
+    if index[-1] != size - 1:
+        index = np.append(index, size - 1)
+    return index
+
+
+def upsample(
+    coarse: np.ndarray, rowIdx: np.ndarray, colIdx: np.ndarray, shape: tuple
+) -> np.ndarray:
+    """Bilinearly interpolates values sampled on a grid to every pixel.
+
+    Args:
+        coarse: a (len(rowIdx), len(colIdx), ...) array of sampled values.
+        rowIdx: the row positions of the samples, from gridIndex().
+        colIdx: the column positions of the samples, from gridIndex().
+        shape: the (rows, cols) shape to interpolate to.
+
+    Returns:
+        a (rows, cols, ...) array of interpolated values.
+    """
+    # interpolate the short axis first, then fill full-size rows between samples
+    cols = _interpolateAxis(coarse, colIdx, shape[1], axis=1)
+    if len(rowIdx) == 1:
+        return np.repeat(cols, shape[0], axis=0)
+
+    out = np.empty((shape[0],) + cols.shape[1:], dtype=cols.dtype)
+    for lower, upper in zip(range(len(rowIdx) - 1), range(1, len(rowIdx))):
+        start, stop = rowIdx[lower], rowIdx[upper]
+        weight = np.arange(stop - start + 1, dtype=cols.dtype) / (stop - start)
+        weight = weight.reshape((-1,) + (1,) * (cols.ndim - 1))
+        block = out[start : stop + 1]
+        np.multiply(weight, cols[upper] - cols[lower], out=block)
+        block += cols[lower]
+
+    return out
+
+
+def upsampleWindow(
+    coarse: np.ndarray, rowIdx: np.ndarray, colIdx: np.ndarray, window: tuple
+) -> np.ndarray:
+    """Bilinearly interpolates values sampled on a grid to the pixels in a window.
+
+    Matches the window of upsample() on the full shape, without interpolating the
+        pixels outside it.
+
+    Args:
+        coarse: a (len(rowIdx), len(colIdx), ...) array of sampled values.
+        rowIdx: the row positions of the samples, from gridIndex().
+        colIdx: the column positions of the samples, from gridIndex().
+        window: the (row slice, column slice) window to interpolate, from tiles().
+
+    Returns:
+        a (window rows, window cols, ...) array of interpolated values.
+    """
+    rows, cols = window
+    interpolated = _interpolateAxis(
+        coarse, rowIdx, rows.stop - rows.start, 0, rows.start
+    )
+    return _interpolateAxis(interpolated, colIdx, cols.stop - cols.start, 1, cols.start)
+
+
+def _interpolateAxis(
+    values: np.ndarray, index: np.ndarray, size: int, axis: int, start: int = 0
+) -> np.ndarray:
+    """Linearly interpolates values sampled at `index` positions along one axis."""
+    if len(index) == 1:
+        return np.repeat(values, size, axis=axis)
+
+    position = np.arange(start, start + size)
+    upper = np.clip(np.searchsorted(index, position, side="right"), 1, len(index) - 1)
+    lower = upper - 1
+    weight = (position - index[lower]) / (index[upper] - index[lower])
+
+    shape = [1] * values.ndim
+    shape[axis] = size
+    weight = weight.astype(values.dtype).reshape(shape)
+
+    low = np.take(values, lower, axis=axis)
+    high = np.take(values, upper, axis=axis)
+    high -= low
+    high *= weight
+    high += low
+    return high
+
+
+@profiled()
+def distanceTransform(mask: np.ndarray) -> np.ndarray:
+    """Computes the exact euclidean distance from each pixel to the nearest True pixel.
+
+    Uses the separable algorithm from Felzenszwalb & Huttenlocher (2012), "Distance
+        Transforms of Sampled Functions": column distances first, then the lower
+        envelope of parabolas along each row. Each pass is linear in the number of
+        pixels, for any distance.
+
+    Args:
+        mask: a (rows, cols) boolean array.
+
+    Returns:
+        a float32 array of distances in pixels. inf where `mask` has no True pixels.
+    """
+    rows, cols = mask.shape
+    far = rows + cols
+
+    # distance to the nearest True pixel in the same column
+    index = np.arange(rows)[:, np.newaxis]
+    before = np.maximum.accumulate(np.where(mask, index, -far), axis=0)
+    after = np.minimum.accumulate(np.where(mask, index, 2 * far)[::-1], axis=0)[::-1]
+    columnDistance = np.minimum(np.minimum(index - before, after - index), far)
+    f = columnDistance.astype(np.float64) ** 2
+
+    # lower envelope of the parabolas rooted in each column, for every row at once.
+    # envelopes are stored by (position in envelope, row) in flat arrays
+    f = np.ascontiguousarray(f.T).ravel()
+    allRows = np.arange(rows)
+    vertex = np.zeros(cols * rows, dtype=np.intp)
+    bound = np.full((cols + 1) * rows, np.inf)
+    bound[:rows] = -np.inf
+    k = np.zeros(rows, dtype=np.intp)
+
+    for q in range(1, cols):
+        fq = f[q * rows : (q + 1) * rows] + q * q
+        slot = k * rows + allRows
+        v = vertex[slot]
+        s = (fq - (f[v * rows + allRows] + v * v)) / (2 * (q - v))
+        pop = np.flatnonzero(s <= bound[slot])
+        while len(pop):
+            k[pop] -= 1
+            slot = k[pop] * rows + pop
+            v = vertex[slot]
+            s[pop] = (fq[pop] - (f[v * rows + pop] + v * v)) / (2 * (q - v))
+            pop = pop[s[pop] <= bound[slot]]
+        k += 1
+        slot = k * rows + allRows
+        vertex[slot] = q
+        bound[slot] = s
+        bound[slot + rows] = np.inf
+
+    # count the envelope boundaries left of each pixel to find its parabola
+    bound = bound.reshape(cols + 1, rows)[1:].T
+    bound = np.where(np.arange(1, cols + 1) > k[:, np.newaxis], np.inf, bound)
+    start = np.floor(np.clip(bound, -1, cols)).astype(np.intp) + 1
+    start += allRows[:, np.newaxis] * (cols + 2)
+    counts = np.bincount(start.ravel(), minlength=rows * (cols + 2))
+    segment = np.cumsum(counts.reshape(rows, cols + 2)[:, :cols], axis=1)
+    v = vertex[segment * rows + allRows[:, np.newaxis]]
+    distance = (np.arange(cols) - v) ** 2 + f[v * rows + allRows[:, np.newaxis]]
+    distance = distance.astype(np.float32)
+
+    np.sqrt(distance, out=distance)
+    distance[distance >= far] = np.inf
+    return distance
+
+
+def dilate(mask: np.ndarray, radius: float, iterations: int = 1) -> np.ndarray:
+    """Dilates a boolean mask with a circular kernel, like ee.Image.focalMax().
+
+    Args:
+        mask: a (rows, cols) boolean array.
+        radius: the kernel radius in pixels. pixels within this distance of a
+            True pixel are set, as with ee.Kernel.circle().
+        iterations: the number of times to apply the kernel.
+
+    Returns:
+        the dilated mask.
+    """
+    for _ in range(iterations):
+        mask = distanceTransform(mask) <= radius
+    return mask
+
+
+def erode(mask: np.ndarray, radius: float, iterations: int = 1) -> np.ndarray:
+    """Erodes a boolean mask with a circular kernel, like ee.Image.focalMin().
+
+    Pixels outside the array are ignored, as with masked pixels in earth engine.
+
+    Args:
+        mask: a (rows, cols) boolean array.
+        radius: the kernel radius in pixels.
+        iterations: the number of times to apply the kernel.
+
+    Returns:
+        the eroded mask.
+    """
+    return ~dilate(~mask, radius, iterations)
@@ -6,7 +6,7 @@ import numpy as np
 import pandas as pd
 import spectral.io.envi as envi
 
-from earthlib.endmembers import Spectra
+from earthlib.endmembers import Spectra, memmap_sli
 from earthlib.sensors import ASD, Sensor
 
 
@@ -32,6 +32,7 @@ def spectral_library(
     path: str,
     sensor: Sensor | None = None,
     metadata: pd.DataFrame | None = None,
+    mmap: bool = False,
 ) -> Spectra:
     """Reads an ENVI-format spectral library into memory.
 
@@ -40,6 +41,8 @@ def spectral_library(
             Searches for a .hdr sidecar file.
         sensor: an earthlib.sensors.Sensor object specifying
             sensor information not included in the .hdr file.
+        mmap: read the spectra through a read-only memory map instead
+            of loading them into memory. See Spectra.from_sli().
 
     Returns:
         endmembers from the spectral library
@@ -47,25 +50,57 @@ def spectral_library(
     # get the header file path
     hdr = find_envi_header(path)
 
-    sli = envi.open(hdr)
+    if mmap:
+        data, header = memmap_sli(hdr, find_envi_data(path, hdr))
+        band_centers = [float(wl) for wl in header["wavelength"]]
+        band_unit = header["wavelength units"]
+        names = header["spectra names"]
+    else:
+        sli = envi.open(hdr)
+        data = sli.spectra
+        band_centers = sli.bands.centers
+        band_unit = sli.bands.band_unit
+        names = sli.names
 
     if sensor is None:
         sensor = Sensor(
             name=os.path.basename(path),
-            band_centers=sli.bands.centers,
-            wavelength_unit=sli.bands.band_unit,
+            band_centers=band_centers,
+            wavelength_unit=band_unit,
         )
 
     endmembers = Spectra(
-        data=sli.spectra,
+        data=data,
         sensor=sensor,
-        names=sli.names,
+        names=names,
         metadata=metadata,
+        copy=not mmap,
     )
 
     return endmembers
 
 
+def find_envi_data(path: str, hdr: str) -> str:
+    """Finds the data file that accompanies an ENVI header file.
+
+    Args:
+        path: the file path passed by the user (data or header file).
+        hdr: the header file path (from find_envi_header()).
+
+    Returns:
+        the path to the data file.
+    """
+    if path != hdr and check_file(path):
+        return path
+
+    base = os.path.splitext(hdr)[0]
+    for candidate in (base, base + ".sli"):
+        if check_file(candidate):
+            return candidate
+
+    raise FileNotFoundError(f"No data file found for {hdr}")
+
+
 def jfsp(path: str) -> Spectra:
     """Reads JFSP-formatted ASCII files.
 
@@ -0,0 +1,102 @@
+"""Sensor-specialized operations, built once per (operation, sensor).
+
+Operations are registered as factories that take a sensor name, plus optional
+    keyword parameters, and return a function with the sensor's scale factors, band
+    names and endmembers already resolved. The built functions are cached, so mapping
+    them over many images skips the per-call sensor lookups, and every operation
+    defined from sensor metadata works for any sensor in `supported_sensors`.
+"""
+
+import importlib
+from functools import lru_cache
+from typing import Callable, Union
+
+from earthlib.sensors import validate_sensor
+
+# operation name -> factory, or a "module:function" path to a factory. paths are
+# imported on first use, so earthengine-api is only needed for the ee operations.
+_factories = {
+    "BRDFCorrect": "earthlib.geelib.BRDFCorrect:bySensor",
+    "BrightMask": "earthlib.geelib.BrightMask:bySensor",
+    "BurnPVSoil": "earthlib.geelib.BurnPVSoil:forSensor",
+    "CloudMask": "earthlib.geelib.CloudMask:bySensor",
+    "CombinedMask": "earthlib.geelib.CombinedMask:bySensor",
+    "NIRv": "earthlib.geelib.NIRv:forSensor",
+    "Scale": "earthlib.geelib.Scale:forSensor",
+    "ShadeMask": "earthlib.geelib.ShadeMask:bySensor",
+    "SoilPVNPV": "earthlib.geelib.SoilPVNPV:forSensor",
+    "VegImperviousSoil": "earthlib.geelib.VegImperviousSoil:forSensor",
+    "nplib.BRDFCorrect": "earthlib.nplib.BRDFCorrect:bySensor",
+    "nplib.BrightMask": "earthlib.nplib.BrightMask:bySensor",
+    "nplib.CloudMask": "earthlib.nplib.CloudMask:bySensor",
+    "nplib.CombinedMask": "earthlib.nplib.CombinedMask:bySensor",
+    "nplib.NIRv": "earthlib.nplib.NIRv:bySensor",
+    "nplib.Scale": "earthlib.nplib.Scale:bySensor",
+    "nplib.ShadeMask": "earthlib.nplib.ShadeMask:bySensor",
+}
+
+
+def list_operations() -> list:
+    """Returns the names of the registered operations.
+
+    Returns:
+        a sorted list of operation names to pass to `get_operation()`.
+    """
+    return sorted(_factories)
+
+
+def register_operation(name: str, factory: Union[Callable, str]) -> None:
+    """Adds an operation to the registry, or replaces an existing one.
+
+    Args:
+        name: the name to look the operation up by.
+        factory: a function that takes a sensor name, plus optional keyword
+            parameters, and returns the operation for that sensor. may also be a
+            "module:function" path, imported on first use.
+    """
+    _factories[name] = factory
+    clear_cache()
+
+
+def get_operation(name: str, sensor: str, **params) -> Callable:
+    """Returns an operation specialized for a sensor, building it on first use.
+
+    Args:
+        name: the operation name (from `list_operations()`), e.g. "Scale".
+        sensor: the name of the sensor (from earthlib.list_sensors()).
+        **params: keyword parameters to resolve when building the operation, e.g.
+            `n` or `bands` for the unmixing operations. lists are passed as tuples.
+
+    Returns:
+        the operation for the sensor. repeated calls with the same arguments
+            return the same function.
+    """
+    validate_sensor(sensor)
+    if name not in _factories:
+        supported = ", ".join(list_operations())
+        raise ValueError(f"Unknown operation '{name}'. Supported: {supported}")
+
+    frozen = tuple(sorted((key, _freeze(value)) for key, value in params.items()))
+    return _build(name, sensor, frozen)
+
+
+def clear_cache() -> None:
+    """Discards the built operations, e.g. after changing sensor definitions."""
+    _build.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _build(name: str, sensor: str, params: tuple) -> Callable:
+    """Builds and caches an operation for a sensor and hashable parameters."""
+    factory = _factories[name]
+    if isinstance(factory, str):
+        module, function = factory.split(":")
+        factory = getattr(importlib.import_module(module), function)
+    return factory(sensor, **dict(params))
+
+
+def _freeze(value):
+    """Converts lists to tuples so parameters can be used as cache keys."""
+    if isinstance(value, list):
+        return tuple(value)
+    return value
@@ -0,0 +1,90 @@
+"""Spectral resampling between sensor band definitions."""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import spectral
+
+from earthlib import config
+from earthlib.sensors import Sensor
+
+# response matrices keyed by (source, target) sensor fingerprints, in LRU order
+_matrix_cache = OrderedDict()
+_matrix_cache_lock = threading.Lock()
+
+
+def response_matrix(source: Sensor, target: Sensor) -> np.ndarray:
+    """Returns the spectral response matrix to resample between two sensors.
+
+    Matrices are memoized by sensor fingerprint, keeping the config.matrix_cache_size
+        most recently used. Cached matrices are read-only.
+
+    Args:
+        source: the sensor the spectra were measured with.
+        target: the sensor to resample the spectra to.
+
+    Returns:
+        a (n_target_bands, n_source_bands) array of band weights.
+    """
+    key = (source.fingerprint(), target.fingerprint())
+    with _matrix_cache_lock:
+        matrix = _matrix_cache.get(key)
+        if matrix is not None:
+            _matrix_cache.move_to_end(key)
+            return matrix
+
+    matrix = build_response_matrix(source, target)
+    matrix.setflags(write=False)
+
+    with _matrix_cache_lock:
+        _matrix_cache[key] = matrix
+        while len(_matrix_cache) > config.matrix_cache_size:
+            _matrix_cache.popitem(last=False)
+
+    return matrix
+
+
+def clear_matrix_cache() -> None:
+    """Removes all memoized response matrices."""
+    with _matrix_cache_lock:
+        _matrix_cache.clear()
+
+
+def build_response_matrix(source: Sensor, target: Sensor) -> np.ndarray:
+    """Computes the spectral response matrix to resample between two sensors.
+
+    Uses the Gaussian band response model from spectral.BandResampler.
+        Rows for target bands with no overlapping source bands contain NaN.
+
+    Args:
+        source: the sensor the spectra were measured with.
+        target: the sensor to resample the spectra to.
+
+    Returns:
+        a (n_target_bands, n_source_bands) array of band weights.
+    """
+    resampler = spectral.BandResampler(
+        source.band_centers,
+        target.band_centers,
+        fwhm1=source.band_widths,
+        fwhm2=target.band_widths,
+    )
+    return resampler.matrix
+
+
+def resample(data: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Resamples a batch of spectra with a single matrix product.
+
+    Matches calling spectral.BandResampler once per spectrum, including NaN
+        propagation from missing source values or non-overlapping target bands.
+
+    Args:
+        data: an array of shape (n_spectra, n_source_bands).
+        matrix: the response matrix from response_matrix().
+
+    Returns:
+        a float32 array of shape (n_spectra, n_target_bands).
+    """
+    resampled = np.dot(data, matrix.T)
+    return resampled.astype(np.float32, copy=False)
@@ -1,6 +1,9 @@
 """Sensor definitions for common earth observing instruments."""
 
+import hashlib
+from collections.abc import MutableMapping
 from dataclasses import asdict, dataclass
+from functools import lru_cache
 from typing import Literal
 
 import numpy as np
@@ -9,9 +12,6 @@ import spectral.io.envi as envi
 from earthlib.config import header_path
 from earthlib.errors import SensorError
 
-# get earthlib sensor spec from the header file
-_eli_data = envi.open(header_path)
-
 
 @dataclass
 class Sensor:
@@ -44,6 +44,25 @@ class Sensor:
         """Returns a copy of the sensor object."""
         return Sensor(**asdict(self))
 
+    def fingerprint(self) -> str:
+        """Returns a digest of the spectral response attributes of the sensor.
+
+        Sensors with the same band centers, band widths and wavelength unit share
+            a fingerprint. It is recomputed on each call since these can change in-place.
+
+        Returns:
+            a hex digest string.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.asarray(self.band_centers, dtype=np.float64).tobytes())
+        if self.band_widths is None:
+            digest.update(b"|none|")
+        else:
+            digest.update(b"|widths|")
+            digest.update(np.asarray(self.band_widths, dtype=np.float64).tobytes())
+        digest.update(self.wavelength_unit.lower().encode())
+        return digest.hexdigest()
+
 
 Landsat4 = Sensor(
     name="Landsat4",
@@ -1615,16 +1634,29 @@ NEON = Sensor(
     scale=0.0001,
 )
 
-Earthlib = Sensor(
-    name="Earthlib",
-    collection=None,
-    band_names=[f"band_{i+1}" for i in range(_eli_data.params.ncols)],
-    band_centers=_eli_data.bands.centers,
-    wavelength_unit=_eli_data.bands.band_unit.lower(),
-    measurement_unit="reflectance",
-    scale=1,
-    offset=0,
-)
+
+@lru_cache(maxsize=None)
+def load_earthlib() -> Sensor:
+    """Reads the earthlib sensor spec from the spectral library header file.
+
+    The header is parsed on first call and cached for the lifetime of the process.
+
+    Returns:
+        the sensor definition for the package spectral library.
+    """
+    header = envi.read_envi_header(header_path)
+    n_bands = int(header["samples"])
+    return Sensor(
+        name="Earthlib",
+        collection=None,
+        band_names=[f"band_{i+1}" for i in range(n_bands)],
+        band_centers=[float(center) for center in header["wavelength"]],
+        wavelength_unit=header["wavelength units"].lower(),
+        measurement_unit="reflectance",
+        scale=1,
+        offset=0,
+    )
+
 
 asd_centers = np.arange(350, 2501, 1, dtype=np.float32)
 asd_band_count = len(asd_centers)
@@ -1640,25 +1672,73 @@ ASD = Sensor(
     offset=0,
 )
 
-supported_sensors = {
-    "AVNIR2": AVNIR2,
-    "ASD": ASD,
-    "ASTER": ASTER,
-    "DoveR": DoveR,
-    "Earthlib": Earthlib,
-    "Landsat4": Landsat4,
-    "Landsat5": Landsat5,
-    "Landsat7": Landsat7,
-    "Landsat8": Landsat8,
-    "Landsat9": Landsat9,
-    "MODIS": MODIS,
-    "NEON": NEON,
-    "PlanetScope": PlanetScope,
-    "Sentinel2": Sentinel2,
-    "SkySat": SkySat,
-    "SuperDove": SuperDove,
-    "VIIRS": VIIRS,
-}
+
+class SensorDict(MutableMapping):
+    """Sensor lookup table that supports deferring construction until first access.
+
+    Values may be Sensor objects or zero-argument functions that return one.
+        Functions are called the first time the key is read and replaced by the
+        result. Every read, including iteration over values and items, copies and
+        unpacking, goes through __getitem__.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._sensors = dict(*args, **kwargs)
+
+    def __getitem__(self, key: str) -> Sensor:
+        value = self._sensors[key]
+        if callable(value):
+            value = self._sensors[key] = value()
+        return value
+
+    def __setitem__(self, key: str, value: Sensor) -> None:
+        self._sensors[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._sensors[key]
+
+    def __iter__(self):
+        return iter(self._sensors)
+
+    def __len__(self) -> int:
+        return len(self._sensors)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._sensors)})"
+
+    def copy(self) -> "SensorDict":
+        """Returns a shallow copy, keeping deferred sensors deferred."""
+        return type(self)(self._sensors)
+
+
+supported_sensors = SensorDict(
+    {
+        "AVNIR2": AVNIR2,
+        "ASD": ASD,
+        "ASTER": ASTER,
+        "DoveR": DoveR,
+        "Earthlib": load_earthlib,
+        "Landsat4": Landsat4,
+        "Landsat5": Landsat5,
+        "Landsat7": Landsat7,
+        "Landsat8": Landsat8,
+        "Landsat9": Landsat9,
+        "MODIS": MODIS,
+        "NEON": NEON,
+        "PlanetScope": PlanetScope,
+        "Sentinel2": Sentinel2,
+        "SkySat": SkySat,
+        "SuperDove": SuperDove,
+        "VIIRS": VIIRS,
+    }
+)
+
+
+def __getattr__(name: str):
+    """Builds sensors that depend on package data on first access."""
+    if name == "Earthlib":
+        return supported_sensors["Earthlib"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def list_sensors() -> list:
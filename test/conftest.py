@@ -0,0 +1,135 @@
+import sys
+import types
+
+import pytest
+
+from earthlib import registry
+
+
+class Node:
+    """A node in a mock earth engine computation graph.
+
+    Records the function that created it and its arguments. Any method call
+        returns a new node with this node as its first argument.
+    """
+
+    def __init__(self, func: str, args: tuple = (), kwargs: dict = None):
+        # ee captures containers when the call is made, so later edits don't apply
+        self.func = func
+        self.args = tuple(_capture(arg) for arg in args)
+        self.kwargs = {key: _capture(value) for key, value in (kwargs or {}).items()}
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            return Node(name, (self,) + args, kwargs)
+
+        return method
+
+    def getInfo(self):
+        raise AssertionError(f"getInfo() called on {self.func}")
+
+    def __repr__(self) -> str:
+        return f"Node({self.func})"
+
+
+def _capture(value):
+    """Copies list and dict arguments at call time."""
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, (list, tuple)):
+        return type(value)(value)
+    return value
+
+
+class Constructor:
+    """A mock earth engine class, e.g. ee.Image, with static methods."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, *args, **kwargs) -> Node:
+        return Node(self.name, args, kwargs)
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            return Node(f"{self.name}.{name}", args, kwargs)
+
+        return method
+
+
+class MockEE(types.ModuleType):
+    """A stand-in for the `ee` module that builds inspectable graphs."""
+
+    def __init__(self):
+        super().__init__("ee")
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        constructor = Constructor(name)
+        setattr(self, name, constructor)
+        return constructor
+
+    @staticmethod
+    def count_nodes(root: Node) -> int:
+        """Counts the unique nodes in the graph that computes `root`."""
+        seen = set()
+        stack = [root]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Node):
+                if id(item) in seen:
+                    continue
+                seen.add(id(item))
+                stack.extend(item.args)
+                stack.extend(item.kwargs.values())
+            elif isinstance(item, (list, tuple)):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                stack.extend(item.values())
+
+        return len(seen)
+
+    @staticmethod
+    def find(root: Node, func: str) -> list:
+        """Returns the nodes in the graph created by the function `func`."""
+        found = dict()
+        stack = [root]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, Node):
+                if id(item) in found:
+                    continue
+                found[id(item)] = item
+                stack.extend(item.args)
+                stack.extend(item.kwargs.values())
+            elif isinstance(item, (list, tuple)):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                stack.extend(item.values())
+
+        return [node for node in found.values() if node.func == func]
+
+
+@pytest.fixture
+def mock_ee(monkeypatch):
+    """Imports earthlib.geelib against a graph-recording `ee` stand-in."""
+    geelib = [name for name in sys.modules if name.startswith("earthlib.geelib")]
+    for name in geelib:
+        monkeypatch.delitem(sys.modules, name)
+    monkeypatch.setitem(sys.modules, "ee", MockEE())
+    registry.clear_cache()
+
+    yield sys.modules["ee"]
+
+    # drop modules imported against the mock before the originals are restored
+    for name in list(sys.modules):
+        if name.startswith("earthlib.geelib"):
+            del sys.modules[name]
+    registry.clear_cache()
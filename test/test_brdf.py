@@ -0,0 +1,107 @@
+import math
+from datetime import datetime
+
+import numpy as np
+
+from earthlib.geelib.config import BRDF_COEFFICIENTS_L8
+from earthlib.nplib import BRDFCorrect
+from earthlib.nplib.utils import gridIndex, upsample
+
+corners = {
+    "upperLeft": (-120.5, 38.5),
+    "upperRight": (-118.0, 38.5),
+    "lowerRight": (-118.0, 36.5),
+    "lowerLeft": (-120.5, 36.5),
+}
+band_names = list(BRDF_COEFFICIENTS_L8) + ["QA_PIXEL"]
+time = datetime(2020, 6, 21, 18, 30)
+
+
+def footprint(rows: int, cols: int) -> np.ndarray:
+    """A tilted, landsat-like valid data footprint."""
+    y, x = np.mgrid[:rows, :cols]
+    u = (x - cols / 2) * math.cos(0.2) + (y - rows / 2) * math.sin(0.2)
+    v = -(x - cols / 2) * math.sin(0.2) + (y - rows / 2) * math.cos(0.2)
+    return (np.abs(u) < cols * 0.4) & (np.abs(v) < rows * 0.4)
+
+
+def test_kernels():
+    # both kernels are zero at nadir view with the sun overhead
+    assert math.isclose(BRDFCorrect.rossThick(0.0, 0.0, 0.0), 0, abs_tol=1e-12)
+    assert math.isclose(BRDFCorrect.liThin(0.0, 0.0, 0.0), 0, abs_tol=1e-12)
+
+    # sun and view angles are interchangeable
+    sun, view, az = np.radians([35.0, 5.0, 120.0])
+    assert math.isclose(
+        BRDFCorrect.rossThick(sun, view, az), BRDFCorrect.rossThick(view, sun, az)
+    )
+    assert math.isclose(
+        BRDFCorrect.liThin(sun, view, az), BRDFCorrect.liThin(view, sun, az)
+    )
+
+
+def test_solarPosition():
+    # solar noon at the june solstice
+    lon = np.array([[0.0]], dtype=np.float32)
+    lat = np.array([[40.0]], dtype=np.float32)
+    sunZen, sunAz = BRDFCorrect.solarPosition(lon, lat, datetime(2021, 6, 21, 12, 2))
+    assert abs(math.degrees(sunZen[0, 0]) - (40 - 23.44)) < 0.5
+    assert abs(math.degrees(sunAz[0, 0]) - 180) < 2
+
+    # morning sun in the east, timestamps in milliseconds
+    ms = datetime(2021, 6, 21, 8, 0).timestamp() * 1000
+    hourGMT, _, _ = BRDFCorrect.solarTerms(ms)
+    _, sunAz = BRDFCorrect.solarPosition(lon, lat, datetime(2021, 6, 21, 8, 0))
+    assert 0 < math.degrees(sunAz[0, 0]) < 180
+    assert 0 <= hourGMT < 24
+
+
+def test_viewAngles():
+    valid = footprint(200, 300)
+    found = BRDFCorrect.findCorners(valid)
+    ul, ur = found["upperLeft"], found["upperRight"]
+    assert ul[1] > found["lowerRight"][1]
+    assert ur[0] > found["lowerLeft"][0]
+
+    viewZen, viewAz = BRDFCorrect.viewAngles(found, np.arange(200), np.arange(300))
+    assert viewZen.shape == valid.shape
+    assert abs(viewZen[100, 150]) < math.radians(0.5)
+    assert np.abs(viewZen[valid]).max() <= math.radians(7.5) + 1e-6
+    assert 0 <= viewAz <= 2 * math.pi
+
+
+def test_upsample():
+    rows, cols = 45, 70
+    rowIdx, colIdx = gridIndex(rows, 8), gridIndex(cols, 8)
+    assert rowIdx[-1] == rows - 1 and colIdx[-1] == cols - 1
+
+    # bilinear interpolation is exact for bilinear functions
+    y, x = np.mgrid[:rows, :cols].astype(np.float32)
+    plane = np.stack([2 * x + 3 * y, x - y], axis=-1)
+    coarse = plane[np.ix_(rowIdx, colIdx)]
+    assert np.allclose(upsample(coarse, rowIdx, colIdx, (rows, cols)), plane)
+
+
+def test_brdfCorrect():
+    rows, cols = 120, 150
+    rng = np.random.default_rng(14)
+    valid = footprint(rows, cols)
+    img = rng.uniform(0.05, 0.4, (rows, cols, len(band_names))).astype(np.float32)
+    img[~valid] = 0
+
+    corrected = BRDFCorrect.Landsat8(img, band_names, time, corners)
+    assert corrected.dtype == img.dtype
+    assert np.array_equal(corrected[:, :, -1], img[:, :, -1])
+    ratio = corrected[valid, :-1] / img[valid, :-1]
+    assert (ratio > 0.8).all() and (ratio < 1.2).all()
+
+    # grid-sampled geometry matches computing it for every pixel
+    exact = BRDFCorrect.Landsat8(img, band_names, time, corners, valid=valid, step=1)
+    error = np.abs(corrected[valid] / exact[valid] - 1)
+    assert error.max() < 1e-2
+    assert error.mean() < 1e-3
+
+    # integer arrays keep their dtype
+    scaled = (img * 10000).astype(np.int16)
+    corrected = BRDFCorrect.bySensor("Landsat8")(scaled, band_names, time, corners)
+    assert corrected.dtype == np.int16
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+
+from earthlib import cache, config, endmembers, sensors
+
+n_spectra = 10
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "cache_dir", str(tmp_path))
+    return os.path.join(str(tmp_path), cache.RESAMPLED_DIR)
+
+
+def test_resample_key():
+    data = np.ones((n_spectra, sensors.Earthlib.band_count), dtype=np.float32)
+    key = cache.resample_key(data, sensors.Earthlib, sensors.Landsat8)
+    assert key == cache.resample_key(data.copy(), sensors.Earthlib, sensors.Landsat8)
+    assert key != cache.resample_key(data, sensors.Earthlib, sensors.Sentinel2)
+    assert key != cache.resample_key(data * 2, sensors.Earthlib, sensors.Landsat8)
+
+    modified = sensors.Landsat8.copy()
+    modified.band_widths = modified.band_widths * 2
+    assert key != cache.resample_key(data, sensors.Earthlib, modified)
+
+
+def test_load_save(cache_dir, monkeypatch):
+    key = "test"
+    array = np.arange(12, dtype=np.float32).reshape(3, 4)
+    assert cache.load(key) is None
+
+    cache.save(key, array)
+    assert os.path.isfile(os.path.join(cache_dir, f"{key}.npy"))
+    assert np.array_equal(cache.load(key), array)
+    assert cache.size() > array.nbytes
+
+    cache.invalidate(key)
+    assert cache.load(key) is None
+
+    # entries evicted by another process between reading and touching are returned
+    cache.save(key, array)
+    load = np.load
+    monkeypatch.setattr(np, "load", lambda path: (load(path), os.remove(path))[0])
+    assert np.array_equal(cache.load(key), array)
+    monkeypatch.setattr(np, "load", load)
+
+    cache.save("a", array)
+    cache.save("b", array)
+    cache.invalidate()
+    assert cache.list_entries() == []
+
+
+def test_evict(cache_dir):
+    array = np.zeros(100, dtype=np.float64)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.save(key, array)
+        os.utime(cache.get_path(key), (i, i))
+
+    # reading an entry marks it as recently used
+    assert cache.load("a") is not None
+
+    entry_size = os.path.getsize(cache.get_path("a"))
+    cache.evict(max_bytes=2 * entry_size)
+    assert cache.load("b") is None
+    assert cache.load("a") is not None
+    assert cache.load("c") is not None
+
+
+def test_to_sensor_cache(cache_dir):
+    data = np.random.uniform(0, 1, (n_spectra, sensors.Earthlib.band_count))
+    s = endmembers.Spectra(data=data.astype(np.float32), sensor=sensors.Earthlib)
+
+    uncached = s.to_sensor(sensors.Landsat8)
+    first = s.to_sensor(sensors.Landsat8, cache=True)
+    assert len(cache.list_entries()) == 1
+
+    second = s.to_sensor(sensors.Landsat8, cache=True)
+    assert len(cache.list_entries()) == 1
+    assert np.array_equal(first.data, uncached.data)
+    assert np.array_equal(second.data, uncached.data)
+    assert second.sensor.name == sensors.Landsat8.name
@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+
+from earthlib.errors import SensorError
+from earthlib.nplib import CloudMask, CombinedMask
+from earthlib.nplib.utils import dilate, erode
+from earthlib.sensors import get_bands
+
+rng = np.random.default_rng(18)
+qa = rng.integers(0, 2**16, (40, 50), dtype=np.uint16)
+
+
+def test_bitwiseSelect():
+    assert CloudMask.bitwiseSelect(np.uint16(0b1011000), 3, 4) == 0b11
+    assert CloudMask.bitwiseSelect(np.uint16(0b1011000), 5) == 0
+    assert CloudMask.fieldMask([(1, 3), 5]) == 0b101110
+
+
+def test_clearMask():
+    fields = [(1, 2), 4, 10]
+    expected = np.ones(qa.shape, dtype=bool)
+    expected &= CloudMask.bitwiseSelect(qa, 1, 2) == 0
+    expected &= CloudMask.bitwiseSelect(qa, 4) == 0
+    expected &= CloudMask.bitwiseSelect(qa, 10) == 0
+    assert np.array_equal(CloudMask.clearMask(qa, fields), expected)
+
+
+def test_lookupMask():
+    # medium or high cloud confidence, with the fill bit unset
+    conditions = ((8, 9, (2, 3)), (0, 0, (0,)))
+    expected = np.isin(CloudMask.bitwiseSelect(qa, 8, 9), (2, 3))
+    expected &= CloudMask.bitwiseSelect(qa, 0) == 0
+    assert np.array_equal(CloudMask.lookupMask(qa, conditions), expected)
+
+    # tables are built once and can't be modified
+    lookup = CloudMask.qaLookup(conditions)
+    assert lookup is CloudMask.qaLookup(conditions)
+    assert not lookup.flags.writeable
+
+    # wider and signed QA bands are masked without a table
+    for dtype in (np.int16, np.int32, np.uint32, np.int64):
+        masked = CloudMask.lookupMask(qa.astype(dtype), conditions)
+        assert np.array_equal(masked, expected)
+    with pytest.raises(TypeError):
+        CloudMask.lookupMask(qa.astype(np.float32), conditions)
+
+    classes = rng.integers(0, 12, qa.shape, dtype=np.uint8)
+    masked = CloudMask.lookupMask(classes, ((0, 7, (3, 8, 9)),))
+    assert np.array_equal(masked, np.isin(classes, (3, 8, 9)))
+
+
+def test_Landsat4578():
+    sat = np.where(rng.random(qa.shape) < 0.1, 2, 0).astype(np.uint16)
+    img = np.stack([qa, sat], axis=-1)
+    mask = CloudMask.bySensor("Landsat8")(img, ["QA_PIXEL", "QA_RADSAT"])
+
+    expected = sat == 0
+    for bit in range(1, 6):
+        expected &= CloudMask.bitwiseSelect(qa, bit) == 0
+    assert np.array_equal(mask, expected)
+
+    with pytest.raises(SensorError):
+        CloudMask.bySensor("AVHRR")
+
+
+def circle_dilate(mask: np.ndarray, radius: int) -> np.ndarray:
+    """Dilates a mask by shifting it to each offset in a circular kernel."""
+    rows, cols = mask.shape
+    padded = np.pad(mask, radius)
+    dilated = np.zeros_like(mask)
+    for dy in range(-radius, radius + 1):
+        for dx in range(-radius, radius + 1):
+            if dy * dy + dx * dx <= radius * radius:
+                dilated |= padded[
+                    radius + dy : radius + dy + rows, radius + dx : radius + dx + cols
+                ]
+    return dilated
+
+
+def test_morphology():
+    mask = rng.random((60, 70)) < 0.02
+    for radius in [1, 2, 5]:
+        assert np.array_equal(dilate(mask, radius), circle_dilate(mask, radius))
+        eroded = ~circle_dilate(~mask, radius)
+        assert np.array_equal(erode(mask, radius), eroded)
+
+    twice = circle_dilate(circle_dilate(mask, 2), 2)
+    assert np.array_equal(dilate(mask, 2, iterations=2), twice)
+
+    # opening removes specks smaller than the kernel and keeps larger regions
+    speckled = np.zeros((60, 70), dtype=bool)
+    speckled[20:50, 20:50] = True
+    speckled[5, 5] = True
+    speckled[10, 60] = True
+    opened = CloudMask.Opening(speckled, 1)
+    assert not opened[5, 5] and not opened[10, 60]
+    assert opened[21:49, 20:50].all()
+    assert opened.sum() == 30 * 30 - 4
+
+
+def test_Sentinel2SCL():
+    scl = np.full((120, 120), 4, dtype=np.uint16)
+    scl[10:40, 10:40] = 8
+    scl[100, 100] = 9
+    scl[20:30, 40:100] = 5
+    img = np.stack([scl, np.zeros_like(scl)], axis=-1)
+    mask = CloudMask.bySensor("Sentinel2")(img, ["SCL", "QA60"])
+
+    # clouds are closed with a circular kernel, cleaning up isolated cloud pixels
+    clear = ~np.isin(scl, CloudMask.SCL_MASKED_CLASSES)
+    closed = ~circle_dilate(~circle_dilate(clear, 2), 2)
+    assert np.array_equal(mask[:, :40], closed[:, :40])
+    assert not mask[12:38, 12:38].any()
+    assert mask[100, 100]
+
+    # bare soil is masked within 100m of clouds, or beyond the 1000m search radius
+    assert not mask[20:30, 40:45].any()
+    assert mask[20:30, 45:90].all()
+    assert not mask[20:30, 90:100].any()
+
+
+def test_combinedMask():
+    band_names = get_bands("Landsat8") + ["QA_PIXEL", "QA_RADSAT"]
+    reflectance = rng.uniform(0, 0.6, qa.shape + (6,)).astype(np.float32)
+    img = np.concatenate(
+        [reflectance, qa[:, :, np.newaxis], np.zeros(qa.shape + (1,))], axis=-1
+    )
+    mask = CombinedMask.bySensor("Landsat8")(img, band_names)
+
+    # the same as the cloud, shade and bright masks in sequence
+    brightness = reflectance.mean(axis=-1)
+    expected = CloudMask.Landsat4578(img, band_names)
+    expected &= brightness > 0.03
+    expected &= brightness < 0.4
+    assert np.array_equal(mask, expected)
+    assert 0 < mask.sum() < mask.size
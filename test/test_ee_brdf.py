@@ -0,0 +1,229 @@
+import numpy as np
+import pytest
+from conftest import Node
+
+from earthlib import config
+from earthlib.nplib import BRDFCorrect as LocalBRDFCorrect
+
+# numpy stand-ins for the functions used in the kernel expressions
+functions = {
+    "acos": np.arccos,
+    "cos": np.cos,
+    "max": np.maximum,
+    "min": np.minimum,
+    "pow": np.power,
+    "sin": np.sin,
+    "sqrt": np.sqrt,
+}
+
+
+def evaluate(node, inputs: dict):
+    """Evaluates a mock ee graph of single-band images as numpy arrays."""
+    if not isinstance(node, Node):
+        return node
+    args = [evaluate(arg, inputs) for arg in node.args]
+
+    if node.func == "Image":
+        return inputs[args[0]]
+    if node.func == "expression":
+        variables = {key: evaluate(value, inputs) for key, value in args[2].items()}
+        return eval(args[1], dict(functions), variables)
+
+    methods = {
+        "Image.constant": np.asarray,
+        "add": np.add,
+        "cos": np.cos,
+        "max": np.maximum,
+        "pow": np.power,
+        "rename": lambda image, names: image,
+        # band indices select from stacked inputs, band names select everything
+        "select": lambda image, bands: (
+            image[bands[0]] if isinstance(bands[0], int) else image
+        ),
+        "sin": np.sin,
+        "sqrt": np.sqrt,
+        "tan": np.tan,
+    }
+    return methods[node.func](*args)
+
+
+@pytest.fixture
+def BRDFCorrect(mock_ee, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "cache_dir", str(tmp_path))
+    from earthlib.geelib import BRDFCorrect
+
+    return BRDFCorrect
+
+
+def test_brdfKernels(mock_ee, BRDFCorrect):
+    rng = np.random.default_rng(15)
+    inputs = {
+        "sunZen": rng.uniform(0, 1.2, 100),
+        "viewZen": rng.uniform(-0.13, 0.13, 100),
+        "relativeSunViewAz": rng.uniform(-np.pi, 2 * np.pi, 100),
+    }
+    kvol, kgeo = BRDFCorrect.brdfKernels(*[mock_ee.Image(name) for name in inputs])
+
+    # the fused expressions match the local kernels
+    expected = LocalBRDFCorrect.rossThick(*inputs.values())
+    assert np.allclose(evaluate(kvol, inputs), expected)
+    expected = LocalBRDFCorrect.liThin(*inputs.values())
+    assert np.allclose(evaluate(kgeo, inputs), expected)
+
+
+def test_liThin_regression(mock_ee, BRDFCorrect):
+    # the prime angle and overlap clamps used to zero both terms, so the
+    # geometric kernel was -1 for every pixel
+    rng = np.random.default_rng(15)
+    inputs = {
+        "sunZen": rng.uniform(0.6, 1.2, 100),
+        "viewZen": rng.uniform(0.05, 0.13, 100),
+        "relativeSunViewAz": rng.uniform(-np.pi, 2 * np.pi, 100),
+    }
+    _, kgeo = BRDFCorrect.brdfKernels(*[mock_ee.Image(name) for name in inputs])
+    kgeo = evaluate(kgeo, inputs)
+    assert not np.allclose(kgeo, -1)
+    assert kgeo.std() > 0.1
+
+    # positive angles are clear of the prime angle clamp, and the overlap is kept
+    sunZen, viewZen, relativeSunViewAz = inputs.values()
+    secSunZen, secViewZen = 1 / np.cos(sunZen), 1 / np.cos(viewZen)
+    cosPhase = LocalBRDFCorrect.cosPhaseAngle(
+        np.cos(sunZen),
+        np.cos(viewZen),
+        np.sin(sunZen),
+        np.sin(viewZen),
+        relativeSunViewAz,
+    )
+    withoutOverlap = (
+        -secSunZen - secViewZen + 0.5 * (1 + cosPhase) * secSunZen * secViewZen
+    )
+    assert np.any(kgeo > withoutOverlap + 0.01)
+    assert np.allclose(kgeo, LocalBRDFCorrect.liThin(*inputs.values()))
+
+
+def test_adjustBands_regression(mock_ee, BRDFCorrect):
+    # the geometric term used to be weighted by the volumetric kernel
+    rng = np.random.default_rng(15)
+    coefficients = {"fiso": 0.169, "fgeo": 0.0227, "fvol": 0.0574}
+    inputs = {
+        "reflectance": rng.uniform(0, 1, 100),
+        "kvol": rng.uniform(-0.1, 0.4, (2, 100)),
+        "kgeo": rng.uniform(-2, -0.5, (2, 100)),
+    }
+    corrected = BRDFCorrect.adjustBands(
+        mock_ee.Image("reflectance"),
+        mock_ee.Image("kvol"),
+        mock_ee.Image("kgeo"),
+        {"SR_B4": coefficients},
+    )
+    corrected = evaluate(corrected, inputs)
+
+    fiso, fgeo, fvol = coefficients["fiso"], coefficients["fgeo"], coefficients["fvol"]
+    kvol, kgeo = inputs["kvol"], inputs["kgeo"]
+    expected = (fiso + fvol * kvol[1] + fgeo * kgeo[1]) / (
+        fiso + fvol * kvol[0] + fgeo * kgeo[0]
+    )
+    previous = (fiso + fvol * kvol[1] + fgeo * kvol[1]) / (
+        fiso + fvol * kvol[0] + fgeo * kvol[0]
+    )
+    assert np.allclose(corrected, inputs["reflectance"] * expected)
+    assert not np.allclose(corrected, inputs["reflectance"] * previous)
+
+
+def test_sunZenOut_regression(mock_ee, BRDFCorrect):
+    # the centroid longitude, in radians, used to be passed as the latitude
+    image = mock_ee.Image("LANDSAT/LC08/C02/T1_L2/LC08_044034_20140318")
+    sunZenOut = BRDFCorrect.sunZenOut(image)
+    assert sunZenOut.func == "Number.expression"
+    expression, variables = sunZenOut.args
+    coordinate = variables["centerLat"].args[0]
+    assert coordinate.func == "get" and coordinate.args[1] == 1
+
+    lon, lat = -122.4, 37.8
+    expected = LocalBRDFCorrect.sunZenOut(lat)
+    previous = LocalBRDFCorrect.sunZenOut(np.radians(lon))
+    assert np.isclose(eval(expression, dict(functions), {"centerLat": lat}), expected)
+    assert not np.isclose(expected, previous, atol=np.radians(1))
+
+
+def test_brdfCorrect_graph_size(mock_ee, BRDFCorrect):
+    image = mock_ee.Image("LANDSAT/LC08/C02/T1_L2/LC08_044034_20140318")
+    landsat = BRDFCorrect.Landsat8(image)
+    sentinel = BRDFCorrect.Sentinel2(image)
+
+    # a handful of expressions, none of them per band
+    n_expressions = len(mock_ee.find(landsat, "expression"))
+    assert n_expressions <= 12
+    assert len(mock_ee.find(sentinel, "expression")) == n_expressions
+    assert mock_ee.count_nodes(sentinel) == mock_ee.count_nodes(landsat)
+    assert mock_ee.count_nodes(landsat) < 150
+
+    # intermediate bands are never added to the image
+    added = [
+        node for node in mock_ee.find(landsat, "addBands") if node.args[0] is image
+    ]
+    assert len(added) == 1
+    assert landsat.func == "toInt16"
+
+
+def test_cornerTable(mock_ee, BRDFCorrect):
+    corners = {"044034": {name: [0.0, 1.0] for name in BRDFCorrect.CORNER_NAMES}}
+    BRDFCorrect.saveCornerTable({"WRS2": corners})
+    assert BRDFCorrect.loadCornerTable()["WRS2"] == corners
+
+    # new entries are merged into the existing table
+    BRDFCorrect.saveCornerTable({"MGRS": {"10SEG": corners["044034"]}})
+    table = BRDFCorrect.loadCornerTable()
+    assert table["WRS2"] == corners
+    assert table["MGRS"] == {"10SEG": corners["044034"]}
+
+
+def test_cachedCorners(mock_ee, BRDFCorrect):
+    image = mock_ee.Image("LANDSAT/LC08/C02/T1_L2/LC08_044034_20140318")
+
+    # without a table entry, corners come from the footprint
+    corners = BRDFCorrect.cachedCorners(image, "WRS2")
+    assert corners.keys() == set(BRDFCorrect.CORNER_NAMES)
+    assert not mock_ee.find(corners["upperLeft"], "Algorithms.If")
+
+    table = {"044034": {name: [0.0, 1.0] for name in BRDFCorrect.CORNER_NAMES}}
+    BRDFCorrect.saveCornerTable({"WRS2": table})
+    corners = BRDFCorrect.cachedCorners(image, "WRS2")
+    (lookup,) = mock_ee.find(corners["upperLeft"], "Algorithms.If")
+    assert lookup.args[0].func == "contains"
+    assert lookup.args[0].args[0].args[0] == table
+
+    # the table is looked up server-side, without getInfo()
+    landsat = BRDFCorrect.Landsat8(image)
+    assert len(mock_ee.find(landsat, "Algorithms.If")) == 1
+    assert not mock_ee.find(BRDFCorrect.Sentinel2(image), "Algorithms.If")
+
+
+def test_deprecated_helpers(mock_ee, BRDFCorrect):
+    image = mock_ee.Image("LANDSAT/LC08/C02/T1_L2/LC08_044034_20140318")
+    angles = ("i.sunZen", "i.viewZen", "i.relativeSunViewAz")
+    coefficients = BRDFCorrect.BRDF_COEFFICIENTS_L8["SR_B4"]
+    calls = {
+        "set": ("kvol", "i.a + i.b"),
+        "setIf": ("kvol", "i.a > 0", 0, "kvol"),
+        "rossThick": ("kvol", *angles),
+        "liThin": ("kgeo", "i.sunZenOut", 0, 0),
+        "anglePrime": ("sunZenPrime", "i.sunZen"),
+        "cosPhaseAngle": ("cosPhaseAngle", *angles),
+        "applyCFactor": ("SR_B4", coefficients, 1),
+        "brdf": ("brdf", "kvol", "kgeo", coefficients, 1),
+    }
+    for name, args in calls.items():
+        with pytest.warns(DeprecationWarning, match=name):
+            updated = getattr(BRDFCorrect, name)(image, *args)
+        assert updated.func == "addBands"
+        assert updated.args[0] is image
+
+    with pytest.warns(DeprecationWarning, match="toImage"):
+        assert BRDFCorrect.toImage(image, 0).func == "Image"
+
+    # the kernel wrappers use the fused expressions, one per angle plus the kernel
+    with pytest.warns(DeprecationWarning):
+        updated = BRDFCorrect.rossThick(image, "kvol", *angles)
+    assert len(mock_ee.find(updated, "expression")) == 2 + len(angles)
@@ -0,0 +1,25 @@
+import pytest
+
+
+@pytest.fixture
+def geelib(mock_ee):
+    from earthlib.geelib import BrightMask, CloudMask, CombinedMask, ShadeMask
+
+    return CloudMask, ShadeMask, BrightMask, CombinedMask
+
+
+def test_combinedMask_graph(mock_ee, geelib):
+    CloudMask, ShadeMask, BrightMask, CombinedMask = geelib
+    image = mock_ee.Image("LANDSAT/LC08/C02/T1_L2/LC08_044034_20140318")
+
+    chained = BrightMask.Landsat8(ShadeMask.Landsat8(CloudMask.Landsat4578(image)))
+    assert len(mock_ee.find(chained, "updateMask")) == 3
+    assert len(mock_ee.find(chained, "reduce")) == 2
+
+    # brightness is computed once and the mask applied once
+    combined = CombinedMask.bySensor("Landsat8")(image)
+    assert combined.func == "updateMask"
+    assert combined.args[0] is image
+    assert len(mock_ee.find(combined, "updateMask")) == 1
+    assert len(mock_ee.find(combined, "reduce")) == 1
+    assert mock_ee.count_nodes(combined) < mock_ee.count_nodes(chained)
@@ -0,0 +1,197 @@
+import numpy as np
+import pytest
+from conftest import Node
+
+
+@pytest.fixture
+def Unmix(mock_ee):
+    from earthlib.geelib import Unmix
+
+    return Unmix
+
+
+def evaluate(node, inputs: dict):
+    """Evaluates a mock ee image graph with numpy, as {band name: array} dicts."""
+    if isinstance(node, list):
+        return [evaluate(item, inputs) for item in node]
+    if not isinstance(node, Node):
+        return node
+    args = [evaluate(arg, inputs) for arg in node.args]
+
+    if node.func == "Image":
+        value = args[0]
+        return dict(inputs[value]) if isinstance(value, str) else {"constant": value}
+    if node.func == "ImageCollection.fromImages":
+        return args[0]
+    if node.func == "sum":
+        return {name: sum(img[name] for img in args[0]) for name in args[0][0]}
+    if node.func == "select":
+        img, bands = args[0], args[1]
+        names = list(img)
+        selected = [names[b] if isinstance(b, int) else b for b in bands]
+        renamed = args[2] if len(args) > 2 else selected
+        return {new: img[old] for old, new in zip(selected, renamed)}
+    if node.func == "addBands":
+        added = args[1] if isinstance(args[1], list) else [args[1]]
+        return {key: value for img in [args[0], *added] for key, value in img.items()}
+    if node.func == "toFloat":
+        return {name: band.astype(np.float32) for name, band in args[0].items()}
+
+    operators = {
+        "add": np.add,
+        "subtract": np.subtract,
+        "multiply": np.multiply,
+        "divide": np.divide,
+    }
+    left, right = args[0], list(args[1].values())
+    if len(right) == 1:
+        right = right * len(left)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            name: operators[node.func](band, other)
+            for (name, band), other in zip(left.items(), right)
+        }
+
+
+def build_modeled_spectra(ee, Unmix, n_bands: int, n_endmembers: int = 4):
+    endmembers = [ee.List([0.1] * n_bands) for _ in range(n_endmembers)]
+    fractions = ee.Image("reflectance").unmix(endmembers, True, True)
+    return Unmix.computeModeledSpectra(endmembers, fractions, n_bands)
+
+
+def test_computeModeledSpectra(mock_ee, Unmix):
+    modeled = build_modeled_spectra(mock_ee, Unmix, n_bands=6)
+    assert modeled.func == "arrayFlatten"
+    assert modeled.args[1] == [[f"M{band:02d}" for band in range(6)]]
+    assert len(mock_ee.find(modeled, "matrixMultiply")) == 1
+
+    # no per-band nodes, so the graph size doesn't depend on the band count
+    assert not mock_ee.find(modeled, "get")
+    n_nodes = mock_ee.count_nodes(modeled)
+    assert n_nodes == mock_ee.count_nodes(build_modeled_spectra(mock_ee, Unmix, 200))
+    assert n_nodes < 20
+
+
+def test_fractionalCover_without_getInfo(mock_ee, Unmix):
+    # the mock raises if getInfo() is called while building the graph
+    endmembers = [[mock_ee.List([0.1] * 7)] * 3 for _ in range(2)]
+    img = mock_ee.Image("reflectance")
+    unmixed = Unmix.fractionalCover(img, endmembers, ["A", "B"], sensor="Landsat8")
+    n_bands = Unmix.getBandCount("Landsat8")
+    assert (
+        mock_ee.find(unmixed, "arrayFlatten")[0].args[1][0][-1] == f"M{n_bands - 1:02d}"
+    )
+
+    with pytest.raises(ValueError):
+        Unmix.fractionalCover(img, endmembers, ["A", "B"])
+
+
+def test_getBandCount(mock_ee, Unmix):
+    # the band count comes from the endmember spectra before the sensor
+    spectra = mock_ee.List([0.1] * 5)
+    spectra._list = [0.1] * 5
+    for endmembers in ([[[0.1] * 5] * 3] * 2, [[spectra] * 3] * 2):
+        assert Unmix.getBandCount(endmembers=endmembers) == 5
+        assert Unmix.getBandCount("Landsat8", endmembers) == 5
+        unmixed = Unmix.fractionalCover(
+            mock_ee.Image("reflectance"), endmembers, ["A", "B"]
+        )
+        assert mock_ee.find(unmixed, "arrayFlatten")[0].args[1][0][-1] == "M04"
+
+    # server-side spectra fall back to the sensor
+    endmembers = [[mock_ee.List([0.1] * 5)] * 3] * 2
+    assert Unmix.spectraLength(endmembers[0][0]) is None
+    n_bands = Unmix.getBandCount("Landsat8", endmembers)
+    assert n_bands == Unmix.getBandCount("Landsat8") != 5
+    with pytest.raises(ValueError):
+        Unmix.getBandCount(endmembers=endmembers)
+
+
+def test_unmix_collection_without_getInfo(mock_ee):
+    from earthlib.geelib import SoilPVNPV
+
+    # map over a mock collection, as ee would when building the graph
+    collection = mock_ee.ImageCollection("LANDSAT/LC08/C02/T1_L2")
+    images = [collection.first() for _ in range(3)]
+    unmixed = [SoilPVNPV.Landsat8(img, n=2) for img in images]
+    assert all(image.func == "toFloat" for image in unmixed)
+
+
+names = ["Soil", "PV", "NPV"]
+
+
+def build_estimates(n_estimates: int = 5):
+    rng = np.random.default_rng(13)
+    fractions = rng.uniform(0, 1, (n_estimates, 3, 20))
+    rmse = rng.uniform(0, 0.1, (n_estimates, 20))
+    rmse[:, 0] = 0
+
+    inputs = {
+        f"estimate{i}": {**dict(zip(names, fractions[i])), "RMSE": rmse[i]}
+        for i in range(n_estimates)
+    }
+    return fractions, rmse, inputs
+
+
+def test_combineEstimates(mock_ee, Unmix):
+    fractions, rmse, inputs = build_estimates()
+    estimates = [mock_ee.Image(name) for name in inputs]
+    combined = Unmix.combineEstimates(estimates, names)
+
+    # a single collection reduction
+    assert len(mock_ee.find(combined, "sum")) == 1
+
+    # matches weighting each estimate by 1 - rmse / sum(rmse)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = 1 - rmse / rmse.sum(axis=0)
+        expected = (fractions * weights[:, np.newaxis]).sum(axis=0) / weights.sum(
+            axis=0
+        )
+    result = evaluate(combined, inputs)
+    assert list(result) == names
+    unmixed = np.array(list(result.values()))
+    assert np.allclose(unmixed[:, 1:], expected[:, 1:])
+
+    # pixels with zero error are masked, as with the per-estimate weights
+    assert np.isnan(unmixed[:, 0]).all()
+    assert np.isnan(expected[:, 0]).all()
+
+
+def test_deprecated_weighting(mock_ee, Unmix):
+    fractions, rmse, inputs = build_estimates()
+    inputs["rmse_sum"] = {"SUM": rmse.sum(axis=0)}
+    estimates = [name for name in inputs if name.startswith("estimate")]
+
+    # the per-estimate weighting still matches combineEstimates()
+    with pytest.warns(DeprecationWarning, match="computeWeight"):
+        weights = [
+            evaluate(
+                Unmix.computeWeight(mock_ee.Image(name), mock_ee.Image("rmse_sum")),
+                inputs,
+            )
+            for name in estimates
+        ]
+    for name, weighted in zip(estimates, weights):
+        inputs[f"{name}_weighted"] = weighted
+    weight_sum = sum(weighted[Unmix.WEIGHT] for weighted in weights)
+    inputs["weight_sum"] = {Unmix.WEIGHT: weight_sum}
+
+    with pytest.warns(DeprecationWarning, match="weightedAverage"):
+        scaled = [
+            evaluate(
+                Unmix.weightedAverage(
+                    mock_ee.Image(f"{name}_weighted"),
+                    mock_ee.Image("weight_sum"),
+                    names,
+                ),
+                inputs,
+            )
+            for name in estimates
+        ]
+    combined = Unmix.combineEstimates(
+        [mock_ee.Image(name) for name in estimates], names
+    )
+    expected = evaluate(combined, inputs)
+    for name in names:
+        unmixed = sum(estimate[name] for estimate in scaled)
+        assert np.allclose(unmixed[1:], expected[name][1:])
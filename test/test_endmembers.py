@@ -93,6 +93,12 @@ def test_Spectra():
         assert len(s_sub) == n_samples
         assert (s_sub.metadata["LEVEL_2"] == t).all()
 
+    # seeded subsampling is reproducible
+    s_a = endmembers.library.subsample(n_samples, by_type=dtype, seed=42)
+    s_b = endmembers.library.subsample(n_samples, by_type=dtype, seed=42)
+    assert s_a.names == s_b.names
+    assert np.array_equal(s_a.data, s_b.data)
+
     # test subsampling with invalid type
     with pytest.raises(EndmemberError):
         endmembers.library.subsample(n_samples, by_type="InvalidType")
@@ -139,6 +145,19 @@ def test_write_read_sli():
         assert (s.data == all_values).all()
         assert (s2.data == all_values).all()
 
+        # memory-mapped reads should match and only copy on in-place updates
+        s3 = endmembers.Spectra.from_sli(out_file, mmap=True)
+        assert isinstance(s3.data, np.memmap)
+        assert not s3.data.flags.writeable
+        assert np.array_equal(s.data, s3.data)
+        assert np.array_equal(s.names, s3.names)
+        assert np.array_equal(s2.sensor.band_centers, s3.sensor.band_centers)
+
+        s3.remove_water_bands(set_nan=False)
+        assert not isinstance(s3.data, np.memmap)
+        assert s3.data.flags.writeable
+        assert (endmembers.Spectra.from_sli(out_file, mmap=True).data == 2).all()
+
 
 def test_listTypes():
     types = endmembers.listTypes()
@@ -152,3 +171,34 @@ def test_getTypeLevel():
 
     invalid_level = endmembers.getTypeLevel(random_str)
     assert invalid_level == 0
+
+
+def test_selectSpectra():
+    sensor = "Landsat8"
+    bands = sensors.get_bands(sensor)[1:4]
+    spectra = endmembers.selectSpectra(dtype, sensor, n=5, bands=bands, seed=1)
+    assert spectra.shape == (5, len(bands))
+    same = endmembers.selectSpectra(dtype, sensor, n=5, bands=bands, seed=1)
+    assert np.array_equal(spectra, same)
+
+    # the library is resampled once per sensor
+    resampled = endmembers.load_resampled_library(sensor)
+    assert endmembers.load_resampled_library(sensor) is resampled
+    assert resampled.data.shape[1] == sensors.supported_sensors[sensor].band_count
+
+
+def test_selectBundles():
+    sensor = "Sentinel2"
+    bands = sensors.get_bands(sensor)
+    types = ["bare", "vegetation", "npv"]
+    bundles = endmembers.selectBundles(types, sensor, n=4, bands=bands, seed=7)
+    assert len(bundles) == len(types)
+    for spectra in bundles:
+        assert spectra.shape == (4, len(bands))
+        assert not spectra.flags.writeable
+
+    # seeded bundles are memoized, unseeded bundles are drawn fresh
+    assert endmembers.selectBundles(types, sensor, 4, list(bands), 7) is bundles
+    assert endmembers.selectBundles(types, sensor, 4, bands, 8) is not bundles
+    fresh = endmembers.selectBundles(types, sensor, n=4, bands=bands)
+    assert fresh is not endmembers.selectBundles(types, sensor, n=4, bands=bands)
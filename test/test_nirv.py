@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from earthlib.errors import SensorError
+from earthlib.nplib import BrightMask, NIRv, ShadeMask
+from earthlib.sensors import get_bands, supported_sensors
+
+rng = np.random.default_rng(21)
+landsat = supported_sensors["Landsat8"]
+dn = rng.integers(7300, 30000, (70, 90, landsat.band_count), dtype=np.uint16)
+reflectance = (dn * landsat.scale + landsat.offset).astype(np.float32)
+
+
+def expected_nirv(img: np.ndarray) -> np.ndarray:
+    red, nir = img[:, :, 2].astype(np.float64), img[:, :, 3].astype(np.float64)
+    return ((nir - red) / (nir + red) - 0.08) * nir
+
+
+def test_NIRv(tmp_path):
+    assert NIRv.getNIRvBands("Landsat8") == (2, 3)
+    nirv = NIRv.bySensor("Landsat8")
+    expected = expected_nirv(reflectance)
+
+    result = nirv(reflectance, tile_size=32)
+    assert result.dtype == np.float32
+    assert np.allclose(result, expected, atol=1e-6)
+
+    # DN arrays are scaled to reflectance, and results written to memmaps
+    out = np.memmap(tmp_path / "nirv.dat", np.float32, "w+", shape=dn.shape[:2])
+    assert nirv(dn, out=out, tile_size=32) is out
+    assert np.allclose(out, expected, atol=1e-5)
+
+    with pytest.raises(SensorError):
+        NIRv.bySensor("NEON")
+
+
+def test_brightnessMasks():
+    band_names = get_bands("Landsat8")
+    brightness = reflectance.mean(axis=-1)
+
+    # thresholds are applied in DN for integer arrays
+    for img in [reflectance, dn]:
+        shade = ShadeMask.bySensor("Landsat8")(img, band_names, threshold=0.1)
+        assert np.array_equal(shade, brightness > 0.1)
+        bright = BrightMask.bySensor("Landsat8")(img, band_names, threshold=0.4)
+        assert np.array_equal(bright, brightness < 0.4)
+        assert 0 < shade.sum() < shade.size and 0 < bright.sum() < bright.size
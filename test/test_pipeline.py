@@ -0,0 +1,91 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from earthlib.errors import SensorError
+from earthlib.nplib import BRDFCorrect, CloudMask, Pipeline, Scale, Unmix
+from earthlib.nplib.utils import gridIndex, tiles, upsample, upsampleWindow
+from earthlib.sensors import get_bands, supported_sensors
+
+corners = {
+    "upperLeft": (-120.5, 38.5),
+    "upperRight": (-118.0, 38.5),
+    "lowerRight": (-118.0, 36.5),
+    "lowerLeft": (-120.5, 36.5),
+}
+time = datetime(2020, 6, 21, 18, 30)
+rng = np.random.default_rng(24)
+
+
+def landsat_scene(rows: int, cols: int) -> tuple:
+    """A Landsat8 DN stack with reflectance and QA bands."""
+    sensor = supported_sensors["Landsat8"]
+    reflectance = rng.uniform(0.02, 0.5, (rows, cols, 6))
+    dn = np.round((reflectance - sensor.offset) / sensor.scale)
+    qa = np.where(rng.random((rows, cols)) < 0.2, 0b1000, 0)
+    img = np.concatenate([dn, qa[:, :, np.newaxis], np.zeros((rows, cols, 1))], -1)
+    img[:3, :] = 0
+    return img.astype(np.uint16), get_bands("Landsat8") + ["QA_PIXEL", "QA_RADSAT"]
+
+
+def test_upsampleWindow():
+    rowIdx, colIdx = gridIndex(83, 16), gridIndex(70, 16)
+    coarse = rng.uniform(0, 1, (len(rowIdx), len(colIdx), 2)).astype(np.float32)
+    full = upsample(coarse, rowIdx, colIdx, (83, 70))
+    for window in tiles((83, 70), 25):
+        assert np.allclose(upsampleWindow(coarse, rowIdx, colIdx, window), full[window])
+
+
+def test_pipeline():
+    img, band_names = landsat_scene(70, 90)
+    endmembers = [
+        rng.uniform(low, high, (3, 6)) for low, high in ((0.2, 0.4), (0, 0.5))
+    ]
+    pipeline = Pipeline.bySensor(
+        "Landsat8", band_names, endmembers, time, corners, tile_size=32
+    )
+    unmixed = pipeline.run(img)
+    assert unmixed.shape == (70, 90, 2)
+    assert set(pipeline.timings) == {"scale", "cloudMask", "brdf", "unmix", "write"}
+
+    # matches running each step on the full scene
+    reflectance = Scale.bySensor("Landsat8")(img[:, :, :6])
+    mask = CloudMask.Landsat4578(img, band_names)
+    valid = img[:, :, 0] != 0
+    corrected = BRDFCorrect.Landsat8(
+        reflectance, band_names[:6], time, corners, valid=valid
+    )
+    expected = Unmix.fractionalCover(corrected, endmembers)
+    expected[~mask] = np.nan
+    assert np.isnan(unmixed[~mask]).all()
+    assert np.allclose(unmixed, expected, equal_nan=True, atol=1e-5)
+
+    # and without unmixing, returns the corrected reflectance
+    corrected[~mask] = np.nan
+    pipeline = Pipeline.bySensor("Landsat8", band_names, time=time, corners=corners)
+    assert np.allclose(pipeline.run(img), corrected, equal_nan=True, atol=1e-6)
+
+
+def test_scene_mask():
+    scl = np.full((60, 60), 4, dtype=np.uint16)
+    scl[10:20, 10:20] = 8
+    reflectance = rng.uniform(0, 1, (60, 60, 10)).astype(np.float32)
+    img = np.concatenate(
+        [reflectance, scl[:, :, None], np.zeros_like(scl)[:, :, None]], -1
+    )
+    band_names = get_bands("Sentinel2") + ["SCL", "QA60"]
+
+    masked = Pipeline.bySensor("Sentinel2", band_names, tile_size=16).run(img)
+    mask = CloudMask.Sentinel2(img, band_names)
+    assert np.array_equal(np.isnan(masked[:, :, 0]), ~mask)
+    assert np.array_equal(masked[mask], reflectance[mask])
+
+
+def test_brdf_sensors():
+    # BRDF stages support the same sensors as BRDFCorrect
+    for sensor in BRDFCorrect.BRDF_COEFFICIENTS:
+        BRDFCorrect.bySensor(sensor)
+        Pipeline.brdfStage(sensor, [], [], time, corners)
+    with pytest.raises(SensorError):
+        Pipeline.brdfStage("MODIS", [], [], time, corners)
@@ -0,0 +1,99 @@
+import json
+import time
+
+import numpy as np
+
+from earthlib import profiling
+from earthlib.endmembers import Spectra
+from earthlib.nplib import Scale
+from earthlib.sensors import supported_sensors
+
+
+def test_profile(tmp_path):
+    dn = np.full((20, 30, 6), 10000, dtype=np.uint16)
+    scale = Scale.bySensor("Landsat8")
+
+    # nothing is recorded outside of the context manager
+    with profiling.profile() as profiler:
+        pass
+    scale(dn)
+    assert profiler.to_dict() == {}
+
+    with profiling.profile() as profiler:
+        scaled = scale(dn)
+        scale(dn, out=scaled)
+    stats = profiler.to_dict()["nplib.Scale.scaleWrapper"]
+    assert stats["calls"] == 2
+    assert stats["seconds"] > 0
+
+    # arrays passed in as `out` aren't counted as allocations
+    assert stats["returned_bytes"] == scaled.nbytes
+
+    path = tmp_path / "profile.json"
+    assert json.loads(profiler.to_json(path)) == profiler.to_dict()
+    assert json.loads(path.read_text()) == profiler.to_dict()
+
+
+def test_profile_nested():
+    dn = np.full((20, 30, 6), 10000, dtype=np.uint16)
+    scale = Scale.bySensor("Landsat8")
+
+    # nested blocks accumulate into the enclosing block's counters
+    with profiling.profile() as outer:
+        scale(dn)
+        with profiling.profile() as inner:
+            scale(dn)
+        assert inner.to_dict()["nplib.Scale.scaleWrapper"]["calls"] == 2
+        assert profiling.profiler.enabled
+        scale(dn)
+    assert outer.to_dict()["nplib.Scale.scaleWrapper"]["calls"] == 3
+    assert not profiling.profiler.enabled
+
+    # the next outermost block starts from zero
+    with profiling.profile() as profiler:
+        scale(dn)
+    assert profiler.to_dict()["nplib.Scale.scaleWrapper"]["calls"] == 1
+
+
+def test_profile_spectra():
+    sensor = supported_sensors["Landsat8"]
+    spectra = Spectra(np.random.default_rng(25).uniform(0, 1, (10, 6)), sensor)
+    with profiling.profile() as profiler:
+        subset = spectra.subsample(4, seed=1)
+        subset.brightness_normalize()
+    stats = profiler.to_dict()
+    assert stats["endmembers.Spectra.subsample"]["returned_bytes"] == subset.nbytes
+    assert stats["endmembers.Spectra.brightness_normalize"]["calls"] == 1
+    assert stats["endmembers.Spectra.brightness_normalize"]["returned_bytes"] == 0
+
+
+def test_profile_graph(mock_ee):
+    from earthlib.geelib import SoilPVNPV
+
+    with profiling.profile() as profiler:
+        for _ in range(3):
+            SoilPVNPV.Landsat8(mock_ee.Image("reflectance"), n=2)
+    stats = profiler.to_dict()
+    assert stats["geelib.SoilPVNPV.getEndmembers"]["calls"] == 3
+    assert stats["geelib.Unmix.fractionalCover"]["calls"] == 3
+    assert stats["geelib.Unmix.fractionalCover"]["returned_bytes"] == 0
+
+
+def test_profile_overhead():
+    @profiling.profiled("overhead")
+    def noop():
+        pass
+
+    def per_call(n: int = 20000) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            noop()
+        return (time.perf_counter() - start) / n
+
+    disabled = per_call()
+    with profiling.profile() as profiler:
+        enabled = per_call()
+    assert profiler.to_dict()["overhead"]["calls"] == 20000
+
+    # a few microseconds at most, for routines that take milliseconds or more
+    assert enabled - disabled < 2e-5
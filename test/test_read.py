@@ -37,6 +37,14 @@ def test_read_sli():
     assert s.sensor.band_count == hdr.params.ncols
     assert (s.data == hdr.spectra).all()
 
+    # memory-mapped reads from either the library or header path
+    for path in (endmember_path, header_path):
+        m = read.spectral_library(path, mmap=True)
+        assert not m.data.flags.writeable
+        assert m.names == s.names
+        assert (m.data == s.data).all()
+        assert (m.sensor.band_centers == s.sensor.band_centers).all()
+
 
 def test_jfsp():
     s = read.jfsp(jfsp_path)
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from earthlib import registry
+from earthlib.errors import SensorError
+from earthlib.nplib import Scale
+from earthlib.sensors import supported_sensors
+
+
+def test_get_operation():
+    scale = registry.get_operation("nplib.Scale", "Landsat8")
+    assert scale is registry.get_operation("nplib.Scale", "Landsat8")
+    assert scale is not registry.get_operation("nplib.Scale", "Sentinel2")
+
+    dn = np.full((4, 5, 6), 10000, dtype=np.uint16)
+    assert np.allclose(scale(dn), Scale.bySensor("Landsat8")(dn))
+
+    with pytest.raises(SensorError):
+        registry.get_operation("nplib.Scale", "AVHRR")
+    with pytest.raises(ValueError):
+        registry.get_operation("Rescale", "Landsat8")
+
+
+def test_register_operation(monkeypatch):
+    monkeypatch.setattr(registry, "_factories", dict(registry._factories))
+    calls = []
+
+    def factory(sensor: str, factor: tuple = (1,)) -> callable:
+        calls.append(sensor)
+        return lambda value: value * supported_sensors[sensor].scale * sum(factor)
+
+    registry.register_operation("scaleTest", factory)
+    assert "scaleTest" in registry.list_operations()
+
+    # built once per sensor and set of parameters, with lists used as tuples
+    for _ in range(3):
+        op = registry.get_operation("scaleTest", "Landsat8", factor=[1, 1])
+    assert op(1) == pytest.approx(2 * supported_sensors["Landsat8"].scale)
+    assert registry.get_operation("scaleTest", "Landsat8") is not op
+    assert calls == ["Landsat8", "Landsat8"]
+
+
+def test_ee_operations(mock_ee):
+    from earthlib.geelib import NIRv, Scale, SoilPVNPV
+
+    # every sensor with scale factors gets the operation
+    for sensor in supported_sensors:
+        assert Scale.bySensor(sensor) is registry.get_operation("Scale", sensor)
+
+    img = mock_ee.Image("reflectance")
+    scaled = Scale.bySensor("Landsat9")(img)
+    assert scaled.func == "toFloat"
+    assert mock_ee.count_nodes(scaled) == mock_ee.count_nodes(Scale.Landsat8(img))
+
+    nirv = NIRv.bySensor("Landsat8")(img)
+    assert mock_ee.find(nirv, "rename")[0].args[1] == "NIRv"
+    for sensor in ["ASD", "Earthlib", "NEON"]:
+        with pytest.raises(SensorError):
+            NIRv.bySensor(sensor)
+
+    # endmembers are resolved once and shared between mapped images
+    unmix = registry.get_operation("SoilPVNPV", "Landsat8", n=2)
+    unmixed = [unmix(mock_ee.Image(f"image{i}")) for i in range(3)]
+    endmembers = [mock_ee.find(image, "unmix")[0].args[1] for image in unmixed]
+    assert all(spectra[0] is endmembers[0][0] for spectra in endmembers)
+    expected = SoilPVNPV.Landsat8(img, n=2)
+    assert mock_ee.count_nodes(unmixed[0]) == mock_ee.count_nodes(expected)
+
+
+def test_ee_unmixing_bySensor(mock_ee):
+    from earthlib.geelib import BurnPVSoil, SoilPVNPV, VegImperviousSoil
+
+    img = mock_ee.Image("reflectance")
+    for module in (SoilPVNPV, BurnPVSoil, VegImperviousSoil):
+        name = module.__name__.split(".")[-1]
+        unmix = module.bySensor("Landsat9")
+        assert unmix is registry.get_operation(name, "Landsat9")
+        assert module.bySensor("Landsat9") is unmix
+
+        # per-call parameters, as the per-sensor functions take them
+        unmixed = unmix(img, n=2)
+        assert len(mock_ee.find(unmixed, "unmix")) == 2
+        assert mock_ee.count_nodes(unmixed) == mock_ee.count_nodes(
+            module.Landsat8(img, n=2)
+        )
+
+        with pytest.raises(SensorError):
+            module.bySensor("AVHRR")
@@ -0,0 +1,54 @@
+import numpy as np
+import spectral
+
+from earthlib import resample, sensors
+
+n_spectra = 25
+
+
+def test_resample():
+    source = sensors.Earthlib
+    data = np.random.uniform(0, 1, (n_spectra, source.band_count)).astype(np.float32)
+
+    # missing values should propagate like they do with BandResampler
+    data[0, 100] = np.nan
+
+    for target in sensors.supported_sensors.values():
+        matrix = resample.response_matrix(source, target)
+        assert matrix.shape == (target.band_count, source.band_count)
+
+        resampled = resample.resample(data, matrix)
+        assert resampled.dtype == np.float32
+        assert resampled.shape == (n_spectra, target.band_count)
+
+        resampler = spectral.BandResampler(
+            source.band_centers,
+            target.band_centers,
+            fwhm1=source.band_widths,
+            fwhm2=target.band_widths,
+        )
+        expected = np.array(
+            [resampler(spectrum) for spectrum in data], dtype=np.float32
+        )
+        assert np.array_equal(np.isnan(resampled), np.isnan(expected))
+        assert np.allclose(resampled, expected, equal_nan=True)
+
+
+def test_response_matrix_cache():
+    resample.clear_matrix_cache()
+    source = sensors.Earthlib
+    first = resample.response_matrix(source, sensors.Landsat8)
+    assert not first.flags.writeable
+
+    # equivalent sensors share a fingerprint, and the cached matrix
+    assert resample.response_matrix(source.copy(), sensors.Landsat8.copy()) is first
+    assert resample.response_matrix(source, sensors.Sentinel2) is not first
+
+    # in-place changes to a sensor should not return stale matrices
+    modified = source.copy()
+    modified.band_centers = modified.band_centers * 1000
+    modified.wavelength_unit = "nanometers"
+    assert resample.response_matrix(modified, sensors.Landsat8) is not first
+
+    resample.clear_matrix_cache()
+    assert resample.response_matrix(source, sensors.Landsat8) is not first
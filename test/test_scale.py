@@ -0,0 +1,32 @@
+import tracemalloc
+
+import numpy as np
+
+from earthlib.nplib import Scale
+from earthlib.sensors import supported_sensors
+
+rng = np.random.default_rng(22)
+dn = rng.integers(7300, 30000, (256, 200, 6), dtype=np.uint16)
+
+
+def test_scale(tmp_path):
+    landsat = supported_sensors["Landsat8"]
+    scale = Scale.bySensor("Landsat8")
+    expected = dn * landsat.scale + landsat.offset
+
+    result = scale(dn, tile_size=64)
+    assert result.dtype == np.float32
+    assert np.allclose(result, expected, atol=1e-6)
+
+    # output buffers are filled in place, e.g. memmaps
+    out = np.memmap(tmp_path / "scaled.dat", np.float32, "w+", shape=dn.shape)
+    assert scale(dn, out=out, tile_size=64) is out
+    assert np.allclose(out, expected, atol=1e-6)
+
+    # without float64 temporaries or allocations per tile
+    out = np.empty(dn.shape, dtype=np.float32)
+    tracemalloc.start()
+    scale(dn, out=out, tile_size=64)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < 64 * 64 * 6 * 4
@@ -63,3 +63,52 @@ def test_get_band_descriptions():
     descriptions = sensors.get_band_descriptions(sensor)
     print(descriptions)
     assert band_description in descriptions
+
+
+def test_Earthlib():
+    # built lazily from the spectral library header on first access
+    eli = sensors.supported_sensors["Earthlib"]
+    assert isinstance(eli, sensors.Sensor)
+    assert eli is sensors.Earthlib
+    assert eli.band_count == len(eli.band_names)
+    assert eli.wavelength_unit == "micrometers"
+    assert eli in sensors.supported_sensors.values()
+
+
+def test_SensorDict():
+    # every access path resolves deferred sensors, not just indexing
+    for name in ("copy", "dict", "unpack"):
+        lookup = sensors.SensorDict(
+            {"Landsat8": sensors.Landsat8, "Earthlib": lambda: sensors.Sentinel2}
+        )
+        if name == "copy":
+            copied = lookup.copy()
+            assert isinstance(copied, sensors.SensorDict)
+        elif name == "dict":
+            copied = dict(lookup)
+        else:
+            copied = {**lookup}
+        assert copied["Earthlib"] is sensors.Sentinel2
+
+    lookup = sensors.SensorDict({"Earthlib": lambda: sensors.Sentinel2})
+    assert list(lookup.values()) == [sensors.Sentinel2]
+    assert dict(lookup.items()) == {"Earthlib": sensors.Sentinel2}
+    assert lookup.get("Earthlib") is sensors.Sentinel2
+    assert lookup.setdefault("Earthlib") is sensors.Sentinel2
+    assert lookup.pop("Earthlib") is sensors.Sentinel2
+    assert len(lookup) == 0
+
+
+def test_fingerprint():
+    s2 = sensors.Sentinel2
+    assert s2.fingerprint() == s2.copy().fingerprint()
+    assert s2.fingerprint() != sensors.Landsat8.fingerprint()
+
+    # only the spectral response attributes are included
+    renamed = s2.copy()
+    renamed.name = random_str
+    assert renamed.fingerprint() == s2.fingerprint()
+
+    widened = s2.copy()
+    widened.band_widths = None
+    assert widened.fingerprint() != s2.fingerprint()
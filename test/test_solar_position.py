@@ -0,0 +1,101 @@
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+
+from earthlib.nplib import SolarPosition
+from earthlib.nplib.BRDFCorrect import cornerGrid
+
+functions = {"cos": math.cos, "sin": math.sin}
+times = [datetime(2020, 6, 21, 18, 30), datetime(2021, 1, 3, 10), 1.6e12]
+
+
+def expected_terms(jdpr: float) -> tuple:
+    """The equation of time and declination as written out in fmask."""
+    localSolarDiff = (
+        (
+            0.000075
+            + 0.001868 * math.cos(jdpr)
+            - 0.032077 * math.sin(jdpr)
+            - 0.014615 * math.cos(2 * jdpr)
+            - 0.040849 * math.sin(2 * jdpr)
+        )
+        * 12
+        * 60
+        / math.pi
+    )
+    delta = (
+        0.006918
+        - 0.399912 * math.cos(jdpr)
+        + 0.070257 * math.sin(jdpr)
+        - 0.006758 * math.cos(2 * jdpr)
+        + 0.000907 * math.sin(2 * jdpr)
+        - 0.002697 * math.cos(3 * jdpr)
+        + 0.001480 * math.sin(3 * jdpr)
+    )
+    return localSolarDiff, delta
+
+
+def test_solarTerms():
+    for time in times:
+        hourGMT, localSolarDiff, delta = SolarPosition.solarTerms(time)
+        if not isinstance(time, datetime):
+            time = datetime.fromtimestamp(time / 1000, tz=timezone.utc)
+        seconds = time.hour * 3600 + time.minute * 60 + time.second
+        assert math.isclose(hourGMT, seconds / 3600)
+
+        year = datetime(time.year, 1, 1, tzinfo=time.tzinfo)
+        days = (datetime(time.year + 1, 1, 1, tzinfo=time.tzinfo) - year).days
+        jdpr = (time - year).total_seconds() / (days * 86400) * 2 * math.pi
+        assert np.allclose((localSolarDiff, delta), expected_terms(jdpr))
+
+
+def test_fourierExpression():
+    for jdpr in np.linspace(0, 2 * math.pi, 9):
+        variables = dict(functions, jdpr=jdpr)
+        for coefficients in [SolarPosition.DECLINATION, SolarPosition.EQUATION_OF_TIME]:
+            expression = SolarPosition.fourierExpression(coefficients)
+            assert math.isclose(
+                eval(expression, variables),
+                SolarPosition.fourierSeries(jdpr, coefficients),
+                abs_tol=1e-12,
+            )
+
+
+def test_solarPosition_step():
+    # a mid-latitude scene, and a polar scene with the sun near north at midnight
+    scenes = [
+        ((-120.5, 38.5), (-118.0, 36.5), datetime(2020, 6, 21, 18, 30)),
+        ((-2.0, 78.5), (4.0, 76.5), datetime(2020, 6, 21, 0, 0)),
+    ]
+    for (west, north), (east, south), time in scenes:
+        corners = {
+            "upperLeft": (west, north),
+            "upperRight": (east, north),
+            "lowerRight": (east, south),
+            "lowerLeft": (west, south),
+        }
+        lon, lat = cornerGrid(corners, (150, 170))
+        sunZen, sunAz = SolarPosition.solarPosition(lon, lat, time)
+        coarseZen, coarseAz = SolarPosition.solarPosition(lon, lat, time, step=16)
+
+        assert coarseZen.shape == sunZen.shape
+        assert np.abs(coarseZen - sunZen).max() < 1e-4
+        difference = np.angle(np.exp(1j * (coarseAz - sunAz)))
+        assert np.abs(difference).max() < 1e-4
+        assert coarseAz.min() >= 0 and coarseAz.max() < 2 * math.pi
+
+
+def test_geelib_solarPosition(mock_ee):
+    from earthlib.geelib import BRDFCorrect
+
+    image = mock_ee.Image("LANDSAT/LC08/C02/T1_L2/LC08_044034_20140318")
+    sunZen, _ = BRDFCorrect.solarPosition(image)
+
+    # the scene terms use the same series as the local solar position
+    jdpr = 1.3
+    values = [
+        eval(node.args[0], dict(functions, jdpr=jdpr))
+        for node in mock_ee.find(sunZen, "Number.expression")
+    ]
+    assert np.allclose(sorted(values), sorted(expected_terms(jdpr)))
@@ -0,0 +1,183 @@
+import os
+import stat
+
+import numpy as np
+
+from earthlib.nplib import Unmix
+from earthlib.nplib.utils import shareArray
+
+n_bands = 6
+n_iterations = 5
+rows, cols = 4, 5
+
+rng = np.random.default_rng(0)
+soil = rng.uniform(0.2, 0.4, (n_iterations, n_bands))
+veg = rng.uniform(0.0, 0.5, (n_iterations, n_bands))
+npv = rng.uniform(0.3, 0.6, (n_iterations, n_bands))
+
+
+def test_unmix():
+    endmembers = np.array([soil[0], veg[0], npv[0]])
+    true_fractions = rng.dirichlet([1, 1, 1], size=50)
+    pixels = true_fractions @ endmembers
+
+    # mixtures inside the simplex are recovered exactly
+    fractions = Unmix.unmix(pixels, endmembers)
+    assert np.allclose(fractions, true_fractions)
+
+    # outside of it, fractions are non-negative and sum to one
+    pixels = rng.uniform(0, 1, (50, n_bands))
+    fractions = Unmix.unmix(pixels, endmembers)
+    assert (fractions >= 0).all()
+    assert np.allclose(fractions.sum(axis=1), 1)
+
+    # and no feasible point fits better
+    error = np.sum((pixels - fractions @ endmembers) ** 2, axis=1)
+    for candidate in rng.dirichlet([1, 1, 1], size=500):
+        candidate_error = np.sum((pixels - candidate @ endmembers) ** 2, axis=1)
+        assert (error <= candidate_error + 1e-12).all()
+
+    # missing values stay missing
+    pixels[0, 0] = np.nan
+    assert np.isnan(Unmix.unmix(pixels, endmembers)[0]).all()
+
+
+def test_fractionalCover():
+    # repeat one bundle so each iteration has the same weight
+    bundle = [np.tile(em[0], (n_iterations, 1)) for em in (soil, veg, npv)]
+    true_fractions = rng.dirichlet([1, 1, 1], size=rows * cols)
+    endmembers = np.array([em[0] for em in bundle])
+    img = (true_fractions @ endmembers).reshape(rows, cols, n_bands)
+
+    unmixed = Unmix.fractionalCover(img, bundle, shade_normalize=False)
+    assert unmixed.shape == (rows, cols, 3)
+    assert unmixed.dtype == np.float32
+    assert np.allclose(unmixed.reshape(-1, 3), true_fractions, atol=1e-5)
+
+    # darkened pixels are restored by shade normalization
+    shaded = Unmix.fractionalCover(img * 0.5, bundle, shade_normalize=True)
+    assert np.allclose(shaded, unmixed, atol=1e-5)
+
+    # the class count is read from precomputed operators
+    operators = Unmix.computeOperators(bundle, shade_normalize=True)
+    precomputed = Unmix.fractionalCover(img * 0.5, operators=operators)
+    assert np.array_equal(precomputed, shaded)
+
+    # varied bundles still produce bounded, weighted estimates
+    unmixed = Unmix.fractionalCover(img, [soil, veg, npv], shade_normalize=False)
+    assert (unmixed >= 0).all()
+    assert np.allclose(unmixed.sum(axis=-1), 1, atol=1e-5)
+
+
+def test_weightedAverage():
+    fractions = rng.uniform(0, 1, (n_iterations, 10, 3))
+    rmse = rng.uniform(0, 0.1, (n_iterations, 10))
+
+    # running sums match weighting each stored estimate
+    unmixed = Unmix.weightedAverage(
+        fractions.sum(axis=0),
+        (fractions * rmse[:, :, np.newaxis]).sum(axis=0),
+        rmse.sum(axis=0),
+        n_iterations,
+    )
+    weights = 1 - rmse / rmse.sum(axis=0)
+    expected = (fractions * weights[:, :, np.newaxis]).sum(axis=0) / weights.sum(
+        axis=0
+    )[:, np.newaxis]
+    assert np.allclose(unmixed, expected)
+
+
+def test_fractionalCoverTiled(tmp_path):
+    img = rng.uniform(0, 0.6, (37, 23, n_bands)).astype(np.float32)
+    endmembers = [soil, veg, npv]
+    expected = Unmix.fractionalCover(img, endmembers)
+
+    tiled = Unmix.fractionalCoverTiled(img, endmembers, tile_size=8)
+    assert np.allclose(tiled, expected, equal_nan=True)
+
+    # the output is sized from precomputed operators without endmembers
+    operators = Unmix.computeOperators(endmembers)
+    tiled = Unmix.fractionalCoverTiled(img, operators=operators, tile_size=8)
+    assert np.allclose(tiled, expected, equal_nan=True)
+
+    # stream from and to memory-mapped arrays
+    src = np.memmap(tmp_path / "img.dat", dtype=np.float32, mode="w+", shape=img.shape)
+    src[:] = img
+    dst = np.memmap(
+        tmp_path / "out.dat", dtype=np.float32, mode="w+", shape=expected.shape
+    )
+    out = Unmix.fractionalCoverTiled(src, endmembers, out=dst, tile_size=16)
+    assert out is dst
+    assert np.allclose(dst, expected, equal_nan=True)
+
+
+def test_fractionalCoverParallel(tmp_path):
+    img = rng.uniform(0, 0.6, (37, 23, n_bands)).astype(np.float32)
+    endmembers = [soil, veg, npv]
+    expected = Unmix.fractionalCover(img, endmembers)
+
+    parallel = Unmix.fractionalCoverParallel(img, endmembers, tile_size=8, n_workers=2)
+    assert np.allclose(parallel, expected, equal_nan=True)
+
+    operators = Unmix.computeOperators(endmembers)
+    parallel = Unmix.fractionalCoverParallel(
+        img, operators=operators, tile_size=8, n_workers=2
+    )
+    assert np.allclose(parallel, expected, equal_nan=True)
+
+    # memory-mapped arrays are shared by path
+    src = np.memmap(tmp_path / "img.dat", dtype=np.float32, mode="w+", shape=img.shape)
+    src[:] = img
+    dst = np.memmap(
+        tmp_path / "out.dat", dtype=np.float32, mode="w+", shape=expected.shape
+    )
+    out = Unmix.fractionalCoverParallel(
+        src, endmembers, out=dst, tile_size=16, n_workers=2
+    )
+    assert out is dst
+    assert np.allclose(dst, expected, equal_nan=True)
+
+    # inputs are opened read-only, so read-only archives can be unmixed
+    src.flush()
+    os.chmod(tmp_path / "img.dat", stat.S_IRUSR)
+    readonly = np.memmap(
+        tmp_path / "img.dat", dtype=np.float32, mode="r", shape=img.shape
+    )
+    assert shareArray(readonly)[1]["mode"] == "r"
+    out = Unmix.fractionalCoverParallel(readonly, endmembers, tile_size=16, n_workers=2)
+    assert np.allclose(out, expected, equal_nan=True)
+
+    # copy-on-write edits aren't in the file, so the array is copied to workers
+    edited = np.memmap(
+        tmp_path / "img.dat", dtype=np.float32, mode="c", shape=img.shape
+    )
+    edited[:10] = 0.1
+    shm, descriptor = shareArray(edited)
+    assert "filename" not in descriptor
+    shm.close()
+    shm.unlink()
+    out = Unmix.fractionalCoverParallel(edited, endmembers, tile_size=16, n_workers=2)
+    serial = Unmix.fractionalCover(np.asarray(edited), endmembers)
+    assert np.allclose(out, serial, equal_nan=True)
+
+
+def test_computeOperators():
+    Unmix.clearOperatorCache()
+    endmembers = [soil, veg, npv]
+    operators = Unmix.computeOperators(endmembers)
+    assert len(operators) == n_iterations
+    assert operators[0].spectra.shape == (4, n_bands)
+    assert not operators[0].spectra[-1].any()
+
+    # reused for identical endmembers, rebuilt for new ones
+    assert Unmix.computeOperators([soil.copy(), veg, npv]) is operators
+    assert Unmix.computeOperators(endmembers, shade_normalize=False) is not operators
+
+    # unmixing with precomputed operators matches solving each subset directly
+    pixels = rng.uniform(0, 1, (50, n_bands))
+    spectra = operators[0].spectra
+    assert np.allclose(operators[0].unmix(pixels), Unmix.unmix(pixels, spectra))
+
+    img = pixels.reshape(5, 10, n_bands)
+    unmixed = Unmix.fractionalCover(img, endmembers, operators=operators)
+    assert np.array_equal(unmixed, Unmix.fractionalCover(img, endmembers))